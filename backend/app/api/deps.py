@@ -1,9 +1,16 @@
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+import math
+from http.cookies import SimpleCookie
+from typing import AsyncGenerator, Generator, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
-from app.core.security import decode_token
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import (
+    SessionLocal, AsyncSessionLocal, AsyncReadSessionLocal,
+    replica_async_engine, current_user_id, recent_writers, request_writers
+)
+from app.core.security import create_write_marker, decode_token, is_write_marker_for
 from app.models import User
 
 security = HTTPBearer()
@@ -17,9 +24,14 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     token = credentials.credentials
     payload = decode_token(token)
@@ -44,11 +56,104 @@ def get_current_user(
             detail="Invalid token payload",
         )
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = (await db.execute(select(User).where(User.id == int(user_id)))).scalars().first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
+    # Lets commits in this request open the user's read-your-writes window
+    current_user_id.set(user.id)
     return user
+
+
+# Which engine read-only handlers were routed to
+read_routing = {"primary": 0, "replica": 0}
+
+
+def reads_primary(user_id: int, request: Optional[Request] = None) -> bool:
+    """Whether `user_id` wrote within READ_YOUR_WRITES_SECONDS, through this
+    worker or (per the request's write marker cookie) any other"""
+    if recent_writers.get(user_id):
+        return True
+    return request is not None and is_write_marker_for(
+        request.cookies.get(settings.READ_YOUR_WRITES_COOKIE), user_id
+    )
+
+
+async def get_read_db(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only handlers.
+
+    Uses the read replica when one is configured, except for a user who has
+    written within READ_YOUR_WRITES_SECONDS: replication lag could hide their
+    own change, so they keep reading the primary (the request's own session).
+    The user lookup itself always goes to the primary; when the handler reads
+    from the replica, that lookup's primary connection is handed back first
+    instead of being held for the rest of the request.
+    """
+    if replica_async_engine is None or reads_primary(current_user.id, request):
+        read_routing["primary"] += 1
+        yield db
+        return
+
+    read_routing["replica"] += 1
+    # Nothing else runs on the primary session now; a later use would just check
+    # out a connection again
+    await db.close()
+    async with AsyncReadSessionLocal() as read_db:
+        yield read_db
+
+
+def read_sessionmaker(user_id: int, request: Optional[Request] = None):
+    """Session factory for reads that outlive the request's session, e.g. streamed
+    responses; routed like get_read_db"""
+    if replica_async_engine is None or reads_primary(user_id, request):
+        read_routing["primary"] += 1
+        return AsyncSessionLocal
+    read_routing["replica"] += 1
+    return AsyncReadSessionLocal
+
+
+class ReadYourWritesMiddleware:
+    """Sets a signed write marker cookie on responses to requests that
+    committed a write, so get_read_db keeps the user on the primary even
+    when their next read lands on another worker.
+
+    The cookie goes out with the response headers: writes committed after
+    a streamed response has started only reach this worker's recent_writers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writers = set()
+        token = request_writers.set(writers)
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start" and writers and replica_async_engine is not None:
+                cookie = SimpleCookie()
+                name = settings.READ_YOUR_WRITES_COOKIE
+                cookie[name] = create_write_marker(next(iter(writers)))
+                cookie[name]["max-age"] = math.ceil(settings.READ_YOUR_WRITES_SECONDS)
+                cookie[name]["path"] = "/"
+                cookie[name]["httponly"] = True
+                cookie[name]["samesite"] = "lax"
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.output(header="").strip().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            request_writers.reset(token)
@@ -1,115 +1,411 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
-from app.api.deps import get_db, get_current_user
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update, delete, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from typing import List, Optional, Tuple
+from app.api.deps import get_async_db, get_read_db, get_current_user
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
 from app.models import User, Kid, ChatSession, ChatMessage, AIMode, SenderTypeEnum
 from app.schemas.chat import (
-    ChatSessionCreate, ChatSessionResponse,
-    ChatMessageCreate, ChatMessageResponse
+    ChatSessionCreate, ChatSessionResponse, ChatSessionDetailResponse, ChatSessionListItem,
+    ChatMessageCreate, ChatMessageResponse, ChatMessagePage, ChatPanelCreate,
+    ChatSearchHit, ChatSearchResponse
 )
-from app.services.ai_service import ai_service
+from app.services.ai_service import ai_service, AIServiceError
+from app.services.chat_search import chat_search, search_terms, make_snippet
+from app.services.coalescer import chat_coalescer
+from app.services.llm_scheduler import QueueFullError
+from app.services.history_service import history_manager
+from app.utils.pagination import encode_cursor, keyset_before
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+PREVIEW_LENGTH = 100
 
-def get_kid_or_404(kid_id: int, user_id: int, db: Session) -> Kid:
-    kid = db.query(Kid).filter(Kid.id == kid_id, Kid.user_id == user_id).first()
+
+async def run_until_disconnected(request: Request, coro):
+    """Await `coro`, cancelling it if the client disconnects first"""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=0.5)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client closed request")
+    except asyncio.CancelledError:
+        # The handler itself was cancelled (e.g. shutdown): don't leave the work running
+        task.cancel()
+        raise
+
+
+async def get_kid_or_404(kid_id: int, user_id: int, db: AsyncSession) -> Kid:
+    kid = (await db.execute(
+        select(Kid).where(Kid.id == kid_id, Kid.user_id == user_id)
+    )).scalars().first()
     if not kid:
         raise HTTPException(status_code=404, detail="Kid not found")
     return kid
 
 
-@router.get("/sessions", response_model=List[ChatSessionResponse])
-def get_sessions(
+async def get_owned_session_or_404(session_id: int, user_id: int, db: AsyncSession) -> ChatSession:
+    session = (await db.execute(select(ChatSession).options(
+        joinedload(ChatSession.kid)
+    ).where(ChatSession.id == session_id))).scalars().first()
+
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    if session.kid.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    return session
+
+
+async def touch_session(db: AsyncSession, session_id: int) -> None:
+    """Bump the session's last-activity time; committed with the caller's message"""
+    await db.execute(
+        update(ChatSession).where(ChatSession.id == session_id).values(updated_at=func.now()),
+        execution_options={"synchronize_session": False}
+    )
+
+
+async def load_message_page(
+    db: AsyncSession, session_id: int, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[ChatMessage], Optional[str]]:
+    """Return up to `limit` messages older than `cursor` (oldest first) and the next cursor.
+
+    Walks backwards from the newest message using keyset pagination on
+    (created_at, id), served by ix_chat_messages_session_id_created_at.
+    """
+    query = select(ChatMessage).where(ChatMessage.session_id == session_id)
+    if cursor:
+        try:
+            query = query.where(keyset_before(ChatMessage.created_at, ChatMessage.id, cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = (await db.execute(query.order_by(
+        ChatMessage.created_at.desc(), ChatMessage.id.desc()
+    ).limit(limit + 1))).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return list(reversed(rows)), next_cursor
+
+
+@router.get("/sessions", response_model=List[ChatSessionListItem])
+async def get_sessions(
     kid_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
-    
-    sessions = db.query(ChatSession).filter(
+    await get_kid_or_404(kid_id, current_user.id, db)
+
+    # Rank each session's messages newest first and count them in the same pass,
+    # so the whole list (preview, count, activity) comes from one statement
+    ranked = select(
+        ChatMessage.session_id,
+        func.substr(ChatMessage.content, 1, PREVIEW_LENGTH).label("preview"),
+        ChatMessage.created_at,
+        func.row_number().over(
+            partition_by=ChatMessage.session_id,
+            order_by=(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        ).label("rn"),
+        func.count().over(partition_by=ChatMessage.session_id).label("message_count")
+    ).join(ChatSession, ChatSession.id == ChatMessage.session_id).where(
         ChatSession.kid_id == kid_id
-    ).order_by(ChatSession.created_at.desc()).all()
+    ).subquery()
 
-    return sessions
+    last_activity_at = func.coalesce(ranked.c.created_at, ChatSession.updated_at, ChatSession.created_at)
+
+    rows = (await db.execute(
+        select(
+            ChatSession,
+            ranked.c.preview,
+            ranked.c.message_count,
+            last_activity_at.label("last_activity_at")
+        ).outerjoin(
+            ranked, and_(ranked.c.session_id == ChatSession.id, ranked.c.rn == 1)
+        ).where(
+            ChatSession.kid_id == kid_id
+        ).order_by(last_activity_at.desc(), ChatSession.id.desc())
+    )).all()
+
+    return [
+        ChatSessionListItem(
+            id=session.id,
+            kid_id=session.kid_id,
+            created_at=session.created_at,
+            updated_at=session.updated_at,
+            last_message_preview=preview,
+            message_count=message_count or 0,
+            last_activity_at=activity
+        )
+        for session, preview, message_count, activity in rows
+    ]
+
+
+@router.get("/search", response_model=ChatSearchResponse)
+async def search_messages(
+    q: str = Query(..., min_length=1, max_length=200),
+    kid_id: Optional[int] = None,
+    sender: Optional[SenderTypeEnum] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Search the content of every chat message across the user's kids, best match first"""
+    if kid_id is not None:
+        await get_kid_or_404(kid_id, current_user.id, db)
+
+    terms = search_terms(q)[:10]
+    if not terms:
+        raise HTTPException(status_code=400, detail="Empty search query")
+
+    user_id = current_user.id
+    hits, total = await db.run_sync(lambda sync_db: chat_search.search(
+        sync_db, user_id, terms,
+        kid_id=kid_id,
+        sender=sender,
+        offset=(page - 1) * limit,
+        limit=limit
+    ))
+
+    return ChatSearchResponse(
+        results=[
+            ChatSearchHit(
+                message_id=hit.message_id,
+                session_id=hit.session_id,
+                kid_id=hit.kid_id,
+                sender=hit.sender,
+                ai_mode_id=hit.ai_mode_id,
+                snippet=make_snippet(hit.content, terms),
+                created_at=hit.created_at,
+                score=round(hit.score, 4)
+            )
+            for hit in hits
+        ],
+        total=total,
+        page=page,
+        limit=limit
+    )
 
 
 @router.post("/sessions", response_model=ChatSessionResponse, status_code=201)
-def create_session(
+async def create_session(
     data: ChatSessionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    get_kid_or_404(data.kid_id, current_user.id, db)
+    await get_kid_or_404(data.kid_id, current_user.id, db)
 
     session = ChatSession(kid_id=data.kid_id)
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
 
-    return session
+    return ChatSessionResponse(
+        id=session.id,
+        kid_id=session.kid_id,
+        created_at=session.created_at,
+        updated_at=session.updated_at,
+        messages=[]
+    )
 
 
-@router.get("/sessions/{session_id}", response_model=ChatSessionResponse)
-def get_session(
+@router.get("/sessions/{session_id}", response_model=ChatSessionDetailResponse)
+async def get_session(
     session_id: int,
+    message_limit: int = Query(settings.CHAT_SESSION_RECENT_MESSAGES, ge=0, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    session = db.query(ChatSession).options(
-        joinedload(ChatSession.messages),
-        joinedload(ChatSession.kid)
-    ).filter(ChatSession.id == session_id).first()
+    session = await get_owned_session_or_404(session_id, current_user.id, db)
 
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    # Only the latest messages; older ones are paged via /messages
+    messages, next_cursor = [], None
+    if message_limit:
+        messages, next_cursor = await load_message_page(db, session_id, message_limit)
 
-    # Verify ownership
-    if session.kid.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    return session
+    return ChatSessionDetailResponse(
+        id=session.id,
+        kid_id=session.kid_id,
+        created_at=session.created_at,
+        updated_at=session.updated_at,
+        messages=messages,
+        next_cursor=next_cursor
+    )
 
 
-@router.delete("/sessions/{session_id}", status_code=204)
-def delete_session(
+@router.get("/sessions/{session_id}/messages", response_model=ChatMessagePage)
+async def get_messages(
     session_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    session = db.query(ChatSession).options(
-        joinedload(ChatSession.kid)
-    ).filter(ChatSession.id == session_id).first()
+    await get_owned_session_or_404(session_id, current_user.id, db)
+    messages, next_cursor = await load_message_page(db, session_id, limit, cursor)
+    return ChatMessagePage(messages=messages, next_cursor=next_cursor)
 
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
 
-    if session.kid.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
+@router.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(
+    session_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    session = await get_owned_session_or_404(session_id, current_user.id, db)
 
-    db.delete(session)
-    db.commit()
+    await db.delete(session)
+    await db.commit()
 
 
 @router.post("/sessions/{session_id}/messages", response_model=ChatMessageResponse)
 async def send_message(
     session_id: int,
     data: ChatMessageCreate,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    session = db.query(ChatSession).options(
-        joinedload(ChatSession.messages),
-        joinedload(ChatSession.kid)
-    ).filter(ChatSession.id == session_id).first()
+    session = await get_owned_session_or_404(session_id, current_user.id, db)
 
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
+    # Double taps and retries of the same message share one model call and one reply
+    key = chat_coalescer.make_key(session_id, data.content, data.ai_mode_id, data.idempotency_key)
 
-    if session.kid.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
+    async def process(context: dict) -> ChatMessageResponse:
+        # `context` carries what an earlier, cancelled copy of this send already
+        # did, so a duplicate taking over neither stores the question twice nor
+        # answers it twice
+        if "reply_id" in context:
+            return ChatMessageResponse.model_validate(await db.get(ChatMessage, context["reply_id"]))
+
+        if "user_message_id" not in context:
+            # Reject before writing anything when the LLM queue is already full
+            ai_service.scheduler.check_admission(current_user.id)
+
+            # Build conversation history (recent window + rolling summary)
+            # before the question is stored, so it isn't replayed as history
+            context["history"] = await history_manager.build_history(session, db)
+
+            # Save user message
+            user_message = ChatMessage(
+                session_id=session_id,
+                sender=SenderTypeEnum.user,
+                ai_mode_id=data.ai_mode_id,
+                content=data.content
+            )
+            db.add(user_message)
+            await touch_session(db, session_id)
+            await db.commit()
+            context["user_message_id"] = user_message.id
+        conversation_history, summary = context["history"]
+
+        # Get AI mode name
+        ai_mode_name = "mom"
+        if data.ai_mode_id:
+            ai_mode = await db.get(AIMode, data.ai_mode_id)
+            if ai_mode:
+                ai_mode_name = ai_mode.name
+
+        kid_context = await ai_service.load_kid_context(session.kid, db, question=data.content)
+        # End the read transaction so the connection goes back to the pool while
+        # the call waits in the LLM queue; otherwise queued chats exhaust the
+        # pool and stall every other endpoint
+        await db.commit()
+
+        # Generate AI response
+        try:
+            ai_response_text = await ai_service.generate_response(
+                message=data.content,
+                ai_mode=ai_mode_name,
+                conversation_history=conversation_history,
+                kid_context=kid_context,
+                summary=summary,
+                user_id=current_user.id
+            )
+        except (QueueFullError, AIServiceError):
+            # No answer: drop the unanswered message so a retry starts clean,
+            # and let the error reach the client instead of storing it as a reply
+            await db.execute(delete(ChatMessage).where(ChatMessage.id == context.pop("user_message_id")))
+            await db.commit()
+            raise
+
+        # Save AI response
+        ai_message = ChatMessage(
+            session_id=session_id,
+            sender=SenderTypeEnum.ai,
+            ai_mode_id=data.ai_mode_id,
+            content=ai_response_text
+        )
+        db.add(ai_message)
+        await touch_session(db, session_id)
+        await db.commit()
+        context["reply_id"] = ai_message.id
+        await db.refresh(ai_message)
+
+        return ChatMessageResponse.model_validate(ai_message)
+
+    async def abandon(context: dict) -> None:
+        # Cancelled with no duplicate left to take over: like a failed send,
+        # leave no unanswered question behind
+        if "user_message_id" in context and "reply_id" not in context:
+            await discard_message(context["user_message_id"])
+
+    # Abandon the model call if the client goes away; a duplicate that is
+    # still waiting then takes over instead of failing with it
+    return await run_until_disconnected(
+        request,
+        chat_coalescer.run(key, process, remember=data.idempotency_key is not None, abandon=abandon)
+    )
+
+
+async def discard_message(message_id: int) -> None:
+    """Delete an unanswered user message from outside the request's DB session"""
+    async with AsyncSessionLocal() as discard_db:
+        await discard_db.execute(delete(ChatMessage).where(ChatMessage.id == message_id))
+        await discard_db.commit()
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/sessions/{session_id}/messages/stream")
+async def send_message_stream(
+    session_id: int,
+    data: ChatMessageCreate,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Same as send_message, but streams the AI reply as Server-Sent Events.
 
-    # Save user message
+    Emits `delta` events with text chunks as the model produces them and a
+    final `done` event carrying the stored AI message.
+    """
+    session = await get_owned_session_or_404(session_id, current_user.id, db)
+
+    # Once the stream starts the status code is sent, so reject overload up front
+    user_id = current_user.id
+    ai_service.scheduler.check_admission(user_id)
+
+    # Build conversation history before the new message is added
+    conversation_history, summary = await history_manager.build_history(session, db)
+
+    # Save user message before streaming starts
     user_message = ChatMessage(
         session_id=session_id,
         sender=SenderTypeEnum.user,
@@ -117,40 +413,170 @@ async def send_message(
         content=data.content
     )
     db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
+    await touch_session(db, session_id)
+    await db.commit()
+    user_message_id = user_message.id
 
-    # Get AI mode name
     ai_mode_name = "mom"
     if data.ai_mode_id:
-        ai_mode = db.query(AIMode).filter(AIMode.id == data.ai_mode_id).first()
+        ai_mode = await db.get(AIMode, data.ai_mode_id)
         if ai_mode:
             ai_mode_name = ai_mode.name
 
-    # Build conversation history
-    conversation_history = [
-        {"sender": msg.sender.value, "message": msg.content}
-        for msg in sorted(session.messages, key=lambda x: x.created_at)
-    ]
+    # The request-scoped session is closed before the response body is sent,
+    # so everything the stream needs from the DB is resolved here.
+    kid_context = await ai_service.load_kid_context(session.kid, db, question=data.content)
+
+    async def event_stream():
+        chunks = []
+        # Set once the user message has its reply stored or has been discarded
+        settled = False
+        try:
+            try:
+                async for delta in ai_service.generate_response_stream(
+                    message=data.content,
+                    ai_mode=ai_mode_name,
+                    conversation_history=conversation_history,
+                    kid_context=kid_context,
+                    summary=summary,
+                    user_id=user_id
+                ):
+                    if await request.is_disconnected():
+                        # Client went away: stop pulling from the model and
+                        # don't store a half-finished answer
+                        return
+                    chunks.append(delta)
+                    yield format_sse("delta", {"content": delta})
+            except (QueueFullError, AIServiceError) as e:
+                await discard_message(user_message_id)
+                settled = True
+                detail = e.message if isinstance(e, AIServiceError) else "AI 상담 요청이 많습니다. 잠시 후 다시 시도해주세요."
+                yield format_sse("error", {"detail": detail, "retry_after": e.retry_after})
+                return
+
+            # Save the assembled AI response once the stream has finished
+            async with AsyncSessionLocal() as stream_db:
+                ai_message = ChatMessage(
+                    session_id=session_id,
+                    sender=SenderTypeEnum.ai,
+                    ai_mode_id=data.ai_mode_id,
+                    content="".join(chunks)
+                )
+                stream_db.add(ai_message)
+                await touch_session(stream_db, session_id)
+                await stream_db.commit()
+                settled = True
+                await stream_db.refresh(ai_message)
+                payload = ChatMessageResponse.model_validate(ai_message).model_dump(mode="json")
+
+            yield format_sse("done", payload)
+        finally:
+            if not settled:
+                # Disconnects and cancellation (GeneratorExit or CancelledError when
+                # the response is torn down) leave the user message unanswered: drop
+                # it like send_message does. Shielded so a second cancellation can't
+                # interrupt the delete.
+                await asyncio.shield(discard_message(user_message_id))
 
-    # Generate AI response
-    ai_response_text = await ai_service.generate_response(
-        message=data.content,
-        ai_mode=ai_mode_name,
-        conversation_history=conversation_history,
-        kid=session.kid,
-        db=db
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
-    # Save AI response
-    ai_message = ChatMessage(
+
+@router.post("/sessions/{session_id}/panel")
+async def send_panel_message(
+    session_id: int,
+    data: ChatPanelCreate,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Ask several AI personas the same question concurrently.
+
+    Streams one `answer` event per persona (as Server-Sent Events) in the
+    order they finish, then a `done` event. Each answer is stored as its own
+    AI message.
+    """
+    session = await get_owned_session_or_404(session_id, current_user.id, db)
+
+    user_id = current_user.id
+    mode_ids = list(dict.fromkeys(data.ai_mode_ids))
+    # Every persona takes its own scheduler slot
+    ai_service.scheduler.check_admission(user_id, slots=len(mode_ids))
+
+    ai_modes = [
+        (ai_mode.id, ai_mode.name)
+        for ai_mode in (await db.execute(select(AIMode).where(AIMode.id.in_(mode_ids)))).scalars().all()
+    ]
+    if len(ai_modes) != len(mode_ids):
+        raise HTTPException(status_code=400, detail="Unknown AI mode")
+
+    # Shared by every persona: history, summary and kid context are built once
+    conversation_history, summary = await history_manager.build_history(session, db)
+    kid_context = await ai_service.load_kid_context(session.kid, db, question=data.content)
+
+    user_message = ChatMessage(
         session_id=session_id,
-        sender=SenderTypeEnum.ai,
-        ai_mode_id=data.ai_mode_id,
-        content=ai_response_text
+        sender=SenderTypeEnum.user,
+        content=data.content
     )
-    db.add(ai_message)
-    db.commit()
-    db.refresh(ai_message)
+    db.add(user_message)
+    await touch_session(db, session_id)
+    await db.commit()
+    user_message_id = user_message.id
 
-    return ai_message
+    async def ask(ai_mode_id: int, ai_mode_name: str):
+        try:
+            answer = await ai_service.generate_response(
+                message=data.content,
+                ai_mode=ai_mode_name,
+                conversation_history=conversation_history,
+                summary=summary,
+                kid_context=kid_context,
+                user_id=user_id
+            )
+        except (QueueFullError, AIServiceError) as e:
+            return ai_mode_id, None, e
+        return ai_mode_id, answer, None
+
+    async def event_stream():
+        tasks = [asyncio.ensure_future(ask(*ai_mode)) for ai_mode in ai_modes]
+        stream_db = AsyncSessionLocal()
+        answered = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                ai_mode_id, answer, error = await next_done
+                if error is not None:
+                    # One persona failing doesn't sink the others; nothing is stored for it
+                    detail = error.message if isinstance(error, AIServiceError) else "AI 상담 요청이 많습니다. 잠시 후 다시 시도해주세요."
+                    yield format_sse("error", {"ai_mode_id": ai_mode_id, "detail": detail, "retry_after": error.retry_after})
+                    continue
+                ai_message = ChatMessage(
+                    session_id=session_id,
+                    sender=SenderTypeEnum.ai,
+                    ai_mode_id=ai_mode_id,
+                    content=answer
+                )
+                stream_db.add(ai_message)
+                await touch_session(stream_db, session_id)
+                await stream_db.commit()
+                await stream_db.refresh(ai_message)
+                answered += 1
+                yield format_sse("answer", ChatMessageResponse.model_validate(ai_message).model_dump(mode="json"))
+            yield format_sse("done", {"answered": answered, "failed": len(tasks) - answered})
+        finally:
+            # Runs on client disconnect too: don't leave persona calls running
+            for task in tasks:
+                task.cancel()
+            await stream_db.close()
+            if not answered:
+                # No persona answered (all failed, or the client left first): drop the question
+                await asyncio.shield(discard_message(user_message_id))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
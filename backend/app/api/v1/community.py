@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List, Optional
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_async_db, get_read_db, get_current_user
 from app.models import User, Post, Comment, PostLike, CommunityCategoryEnum
 from app.schemas.community import (
     PostCreate, PostUpdate, PostResponse, PostListResponse,
@@ -12,12 +13,14 @@ from app.schemas.community import (
 router = APIRouter(prefix="/community", tags=["community"])
 
 
-def get_post_response(post: Post, current_user_id: int, db: Session) -> dict:
-    comment_count = db.query(func.count(Comment.id)).filter(Comment.post_id == post.id).scalar()
-    is_liked = db.query(PostLike).filter(
+async def get_post_response(post: Post, current_user_id: int, db: AsyncSession) -> dict:
+    comment_count = (await db.execute(
+        select(func.count(Comment.id)).where(Comment.post_id == post.id)
+    )).scalar()
+    is_liked = (await db.execute(select(PostLike).where(
         PostLike.post_id == post.id,
         PostLike.user_id == current_user_id
-    ).first() is not None
+    ))).scalars().first() is not None
 
     return {
         "id": post.id,
@@ -37,22 +40,26 @@ def get_post_response(post: Post, current_user_id: int, db: Session) -> dict:
 
 
 @router.get("/posts", response_model=PostListResponse)
-def get_posts(
+async def get_posts(
     category: Optional[CommunityCategoryEnum] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(20, le=50),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = db.query(Post).options(joinedload(Post.user))
+    query = select(Post).options(joinedload(Post.user))
 
     if category:
-        query = query.filter(Post.category == category)
+        query = query.where(Post.category == category)
 
-    total = query.count()
-    posts = query.order_by(Post.created_at.desc()).offset((page - 1) * limit).limit(limit).all()
+    total = (await db.execute(
+        select(func.count()).select_from(query.order_by(None).subquery())
+    )).scalar()
+    posts = (await db.execute(
+        query.order_by(Post.created_at.desc()).offset((page - 1) * limit).limit(limit)
+    )).scalars().all()
 
-    post_responses = [get_post_response(post, current_user.id, db) for post in posts]
+    post_responses = [await get_post_response(post, current_user.id, db) for post in posts]
 
     return PostListResponse(
         posts=post_responses,
@@ -63,42 +70,46 @@ def get_posts(
 
 
 @router.post("/posts", response_model=PostResponse, status_code=201)
-def create_post(
+async def create_post(
     data: PostCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     post = Post(user_id=current_user.id, **data.model_dump())
     db.add(post)
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    await db.refresh(post)
 
     # Reload with user
-    post = db.query(Post).options(joinedload(Post.user)).filter(Post.id == post.id).first()
-    return get_post_response(post, current_user.id, db)
+    post = (await db.execute(
+        select(Post).options(joinedload(Post.user)).where(Post.id == post.id)
+    )).scalars().first()
+    return await get_post_response(post, current_user.id, db)
 
 
 @router.get("/posts/{post_id}", response_model=PostResponse)
-def get_post(
+async def get_post(
     post_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    post = db.query(Post).options(joinedload(Post.user)).filter(Post.id == post_id).first()
+    post = (await db.execute(
+        select(Post).options(joinedload(Post.user)).where(Post.id == post_id)
+    )).scalars().first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    return get_post_response(post, current_user.id, db)
+    return await get_post_response(post, current_user.id, db)
 
 
 @router.put("/posts/{post_id}", response_model=PostResponse)
-def update_post(
+async def update_post(
     post_id: int,
     data: PostUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = (await db.execute(select(Post).where(Post.id == post_id))).scalars().first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -109,72 +120,74 @@ def update_post(
     for field, value in update_data.items():
         setattr(post, field, value)
 
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    await db.refresh(post)
 
-    post = db.query(Post).options(joinedload(Post.user)).filter(Post.id == post.id).first()
-    return get_post_response(post, current_user.id, db)
+    post = (await db.execute(
+        select(Post).options(joinedload(Post.user)).where(Post.id == post.id)
+    )).scalars().first()
+    return await get_post_response(post, current_user.id, db)
 
 
 @router.delete("/posts/{post_id}", status_code=204)
-def delete_post(
+async def delete_post(
     post_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = (await db.execute(select(Post).where(Post.id == post_id))).scalars().first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
     if post.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this post")
 
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
 
 
 @router.post("/posts/{post_id}/like")
-def toggle_like(
+async def toggle_like(
     post_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = (await db.execute(select(Post).where(Post.id == post_id))).scalars().first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    existing_like = db.query(PostLike).filter(
+    existing_like = (await db.execute(select(PostLike).where(
         PostLike.post_id == post_id,
         PostLike.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
 
     if existing_like:
-        db.delete(existing_like)
+        await db.delete(existing_like)
         post.likes_count = max(0, post.likes_count - 1)
-        db.commit()
+        await db.commit()
         return {"liked": False, "likes_count": post.likes_count}
     else:
         new_like = PostLike(post_id=post_id, user_id=current_user.id)
         db.add(new_like)
         post.likes_count = (post.likes_count or 0) + 1
-        db.commit()
+        await db.commit()
         return {"liked": True, "likes_count": post.likes_count}
 
 
 # ========== Comments ==========
 @router.get("/posts/{post_id}/comments", response_model=List[CommentResponse])
-def get_comments(
+async def get_comments(
     post_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = (await db.execute(select(Post).where(Post.id == post_id))).scalars().first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    comments = db.query(Comment).options(
+    comments = (await db.execute(select(Comment).options(
         joinedload(Comment.user)
-    ).filter(Comment.post_id == post_id).order_by(Comment.created_at.asc()).all()
+    ).where(Comment.post_id == post_id).order_by(Comment.created_at.asc()))).scalars().all()
 
     return [
         {
@@ -189,13 +202,13 @@ def get_comments(
 
 
 @router.post("/posts/{post_id}/comments", response_model=CommentResponse, status_code=201)
-def create_comment(
+async def create_comment(
     post_id: int,
     data: CommentCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = (await db.execute(select(Post).where(Post.id == post_id))).scalars().first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
@@ -205,8 +218,8 @@ def create_comment(
         content=data.content
     )
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
 
     return {
         "id": comment.id,
@@ -218,17 +231,17 @@ def create_comment(
 
 
 @router.delete("/comments/{comment_id}", status_code=204)
-def delete_comment(
+async def delete_comment(
     comment_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    comment = (await db.execute(select(Comment).where(Comment.id == comment_id))).scalars().first()
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
 
     if comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
 
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.commit()
@@ -1,27 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import List
-from app.api.deps import get_db, get_current_user
-from app.models import User, Kid, Record, RecordTypeEnum, MealRecord, SleepRecord, HealthRecord, GrowthRecord
+from app.api.deps import get_async_db, get_read_db, get_current_user
+from app.models import (
+    User, Kid, Record, RecordTypeEnum, MealRecord, SleepRecord, HealthRecord, GrowthRecord, RecordDailyStats
+)
 from app.schemas.kid import KidCreate, KidUpdate, KidResponse
+from app.services.ai_service import kid_context_cache
+from app.services.record_index import record_index
 
 router = APIRouter(prefix="/kids", tags=["kids"])
 
 
 @router.get("/", response_model=List[KidResponse])
-def get_kids(
+async def get_kids(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    kids = db.query(Kid).filter(Kid.user_id == current_user.id).all()
+    kids = (await db.execute(select(Kid).where(Kid.user_id == current_user.id))).scalars().all()
     return kids
 
 
 @router.post("/", response_model=KidResponse, status_code=status.HTTP_201_CREATED)
-def create_kid(
+async def create_kid(
     kid_data: KidCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     new_kid = Kid(
         user_id=current_user.id,
@@ -30,21 +36,21 @@ def create_kid(
         gender=kid_data.gender
     )
     db.add(new_kid)
-    db.commit()
-    db.refresh(new_kid)
+    await db.commit()
+    await db.refresh(new_kid)
     return new_kid
 
 
 @router.get("/{kid_id}", response_model=KidResponse)
-def get_kid(
+async def get_kid(
     kid_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    kid = db.query(Kid).filter(
+    kid = (await db.execute(select(Kid).where(
         Kid.id == kid_id,
         Kid.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
 
     if not kid:
         raise HTTPException(
@@ -55,16 +61,16 @@ def get_kid(
 
 
 @router.put("/{kid_id}", response_model=KidResponse)
-def update_kid(
+async def update_kid(
     kid_id: int,
     kid_data: KidUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    kid = db.query(Kid).filter(
+    kid = (await db.execute(select(Kid).where(
         Kid.id == kid_id,
         Kid.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
 
     if not kid:
         raise HTTPException(
@@ -76,21 +82,22 @@ def update_kid(
     for field, value in update_data.items():
         setattr(kid, field, value)
 
-    db.commit()
-    db.refresh(kid)
+    await db.commit()
+    await db.refresh(kid)
+    kid_context_cache.invalidate(kid.id)
     return kid
 
 
 @router.delete("/{kid_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_kid(
+async def delete_kid(
     kid_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    kid = db.query(Kid).filter(
+    kid = (await db.execute(select(Kid).where(
         Kid.id == kid_id,
         Kid.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
 
     if not kid:
         raise HTTPException(
@@ -98,21 +105,25 @@ def delete_kid(
             detail="Kid not found"
         )
 
-    db.delete(kid)
-    db.commit()
+    # Not an ORM relationship; don't rely on the FK cascade (off by default on SQLite)
+    await db.execute(delete(RecordDailyStats).where(RecordDailyStats.kid_id == kid_id))
+    await db.delete(kid)
+    await db.commit()
+    kid_context_cache.invalidate(kid_id)
+    record_index.invalidate(kid_id)
     return None
 
 
 @router.get("/{kid_id}/dashboard")
-def get_kid_dashboard(
+async def get_kid_dashboard(
     kid_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    kid = db.query(Kid).filter(
+    kid = (await db.execute(select(Kid).where(
         Kid.id == kid_id,
         Kid.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
 
     if not kid:
         raise HTTPException(
@@ -121,21 +132,21 @@ def get_kid_dashboard(
         )
 
     # Get recent records by joining through Record base table
-    recent_meal = db.query(MealRecord).join(Record).filter(
+    recent_meal = (await db.execute(select(MealRecord).join(Record).where(
         Record.kid_id == kid_id
-    ).options(joinedload(MealRecord.record)).order_by(Record.created_at.desc()).first()
+    ).options(joinedload(MealRecord.record)).order_by(Record.created_at.desc()).limit(1))).scalars().first()
 
-    recent_sleep = db.query(SleepRecord).join(Record).filter(
+    recent_sleep = (await db.execute(select(SleepRecord).join(Record).where(
         Record.kid_id == kid_id
-    ).options(joinedload(SleepRecord.record)).order_by(Record.created_at.desc()).first()
+    ).options(joinedload(SleepRecord.record)).order_by(Record.created_at.desc()).limit(1))).scalars().first()
 
-    recent_health = db.query(HealthRecord).join(Record).filter(
+    recent_health = (await db.execute(select(HealthRecord).join(Record).where(
         Record.kid_id == kid_id
-    ).options(joinedload(HealthRecord.record)).order_by(Record.created_at.desc()).first()
+    ).options(joinedload(HealthRecord.record)).order_by(Record.created_at.desc()).limit(1))).scalars().first()
 
-    recent_growth = db.query(GrowthRecord).join(Record).filter(
+    recent_growth = (await db.execute(select(GrowthRecord).join(Record).where(
         Record.kid_id == kid_id
-    ).options(joinedload(GrowthRecord.record)).order_by(Record.created_at.desc()).first()
+    ).options(joinedload(GrowthRecord.record)).order_by(Record.created_at.desc()).limit(1))).scalars().first()
 
     return {
         "kid": KidResponse.model_validate(kid),
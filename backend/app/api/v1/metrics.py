@@ -0,0 +1,43 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from app.api.deps import read_routing
+from app.core.config import settings
+from app.core.database import engine, async_engine, replica_async_engine, pool_stats
+from app.services.ai_service import ai_service, kid_context_cache
+from app.services.chat_search import chat_search
+from app.services.coalescer import chat_coalescer
+from app.services.record_index import record_index
+from app.services.response_cache import response_cache
+
+
+def require_metrics_token(x_metrics_token: Optional[str] = Header(None)) -> None:
+    """Metrics are for internal scrapers only: 404 unless METRICS_TOKEN is set, 403 without it"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_metrics_token is None or not secrets.compare_digest(x_metrics_token, settings.METRICS_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid metrics token")
+
+
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_metrics_token)])
+
+
+@router.get("/")
+def get_metrics():
+    return {
+        "db_pool": {
+            "sync": pool_stats(engine),
+            "async": pool_stats(async_engine),
+            "replica": pool_stats(replica_async_engine) if replica_async_engine else None,
+        },
+        "db_read_routing": read_routing,
+        "kid_context_cache": kid_context_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "record_index": record_index.stats(),
+        "chat_search_index": chat_search.stats(),
+        "chat_coalescer": chat_coalescer.stats(),
+        "llm_scheduler": ai_service.scheduler.stats(),
+        "llm_circuit_breaker": ai_service.breaker.stats(),
+        "llm_latency_p95_seconds": ai_service.latency.percentile(0.95),
+        "llm_first_token_p95_seconds": ai_service.first_token_latency.percentile(0.95),
+    }
@@ -0,0 +1,148 @@
+import os
+import uuid
+from datetime import timedelta
+from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_async_db, get_read_db, get_current_user
+from app.api.v1.records import get_kid_or_404
+from app.core.config import settings
+from app.models import User, RecordImportJob, ImportStatusEnum
+from app.schemas.record import RecordImportJobResponse
+from app.services.record_import import record_importer
+
+router = APIRouter(prefix="/kids/{kid_id}/records/imports", tags=["records"])
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def stale_cutoff(dialect_name: str, seconds: int):
+    """SQL for `seconds` ago, comparable with updated_at as func.now() stored it.
+
+    Computed in the database: updated_at is a naive TIMESTAMP in the
+    database's clock, so an aware or app-side timestamp could be hours off.
+    """
+    if dialect_name == "sqlite":
+        # CURRENT_TIMESTAMP's UTC text format
+        return func.datetime("now", f"-{seconds} seconds")
+    return func.localtimestamp() - timedelta(seconds=seconds)
+
+
+async def get_job_or_404(kid_id: int, job_id: int, db: AsyncSession) -> RecordImportJob:
+    job = (await db.execute(select(RecordImportJob).where(
+        RecordImportJob.id == job_id, RecordImportJob.kid_id == kid_id
+    ))).scalars().first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job
+
+
+@router.post("/", response_model=RecordImportJobResponse, status_code=202)
+async def create_import(
+    kid_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Start importing a record CSV in the background; poll the job for progress.
+
+    Columns: record_type, created_at (ISO 8601) and the typed fields, as
+    in the CSV export. Invalid rows are skipped and reported on the job.
+    """
+    await get_kid_or_404(kid_id, current_user.id, db)
+    if not file.filename or not file.filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="A .csv file is required")
+
+    # File I/O runs in the threadpool so a slow disk doesn't stall the event loop
+    await run_in_threadpool(os.makedirs, settings.RECORD_IMPORT_DIR, exist_ok=True)
+    file_path = os.path.join(settings.RECORD_IMPORT_DIR, f"{uuid.uuid4()}.csv")
+    size = 0
+    f = await run_in_threadpool(open, file_path, "wb")
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            size += len(chunk)
+            if size > settings.RECORD_IMPORT_MAX_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Max size: {settings.RECORD_IMPORT_MAX_BYTES // (1024*1024)}MB"
+                )
+            await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        await run_in_threadpool(f.close)
+        await run_in_threadpool(os.remove, file_path)
+        raise
+    await run_in_threadpool(f.close)
+
+    job = RecordImportJob(
+        kid_id=kid_id,
+        user_id=current_user.id,
+        status=ImportStatusEnum.running,
+        filename=file.filename[:255],
+        file_path=file_path,
+        processed_rows=0,
+        imported_rows=0,
+        error_rows=0
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    background_tasks.add_task(record_importer.run, job.id)
+    return job
+
+
+@router.get("/", response_model=List[RecordImportJobResponse])
+async def get_imports(
+    kid_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    await get_kid_or_404(kid_id, current_user.id, db)
+    return (await db.execute(select(RecordImportJob).where(
+        RecordImportJob.kid_id == kid_id
+    ).order_by(RecordImportJob.id.desc()).limit(20))).scalars().all()
+
+
+@router.get("/{job_id}", response_model=RecordImportJobResponse)
+async def get_import(
+    kid_id: int,
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    await get_kid_or_404(kid_id, current_user.id, db)
+    return await get_job_or_404(kid_id, job_id, db)
+
+
+@router.post("/{job_id}/resume", response_model=RecordImportJobResponse, status_code=202)
+async def resume_import(
+    kid_id: int,
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Continue a failed import, or one whose worker died, from its last committed chunk"""
+    await get_kid_or_404(kid_id, current_user.id, db)
+    job = await get_job_or_404(kid_id, job_id, db)
+
+    # Claimed with a conditional UPDATE so two resumes can't both run the job
+    stale_before = stale_cutoff(db.bind.dialect.name, settings.RECORD_IMPORT_STALE_SECONDS)
+    result = await db.execute(update(RecordImportJob).where(
+        RecordImportJob.id == job.id,
+        or_(
+            RecordImportJob.status == ImportStatusEnum.failed,
+            and_(RecordImportJob.status == ImportStatusEnum.running, RecordImportJob.updated_at < stale_before)
+        )
+    ).values(
+        status=ImportStatusEnum.running, error=None, updated_at=func.now()
+    ).execution_options(synchronize_session=False))
+    await db.commit()
+    if result.rowcount == 0:
+        raise HTTPException(status_code=409, detail="Import is already running or has finished")
+
+    await db.refresh(job)
+    background_tasks.add_task(record_importer.run, job.id)
+    return job
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from datetime import datetime
-from app.api.deps import get_db, get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from collections import defaultdict
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, noload, selectinload
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta
+from app.api.deps import get_async_db, get_read_db, get_current_user, read_sessionmaker
+from app.core.config import settings
 from app.models import (
     User, Kid, Record, RecordTypeEnum,
     MealRecord, SleepRecord, HealthRecord,
-    GrowthRecord, StoolRecord
+    GrowthRecord, StoolRecord, RecordDailyStats,
+    MealTypeEnum, StoolConditionEnum, StoolColorEnum
 )
 from app.schemas.record import (
     RecordResponse,
@@ -15,80 +22,357 @@ from app.schemas.record import (
     HealthRecordCreate, HealthRecordResponse,
     GrowthRecordCreate, GrowthRecordResponse,
     StoolRecordCreate, StoolRecordResponse,
+    RecordPage, RecordTimelinePage,
+    BATCH_ITEM_BASE_FIELDS, RecordBatchCreate, RecordBatchCreated, RecordBatchError, RecordBatchResponse,
+    record_batch_item_adapter, DailyStatsResponse,
 )
+from app.services.ai_service import kid_context_cache
+from app.services.daily_stats import daily_stats, stats_today
+from app.services.record_export import csv_chunk, export_statement, ndjson_chunk, stream_rows
+from app.services.record_index import record_index
+from app.utils.pagination import encode_cursor, keyset_before
 
 router = APIRouter(prefix="/kids/{kid_id}/records", tags=["records"])
 
+# Record relationship holding each type's subtype row
+SUBTYPE_RELATIONSHIPS = {
+    RecordTypeEnum.meal: Record.meal_record,
+    RecordTypeEnum.sleep: Record.sleep_record,
+    RecordTypeEnum.health: Record.health_record,
+    RecordTypeEnum.growth: Record.growth_record,
+    RecordTypeEnum.stool: Record.stool_record,
+}
 
-def get_kid_or_404(kid_id: int, user_id: int, db: Session) -> Kid:
-    kid = db.query(Kid).filter(Kid.id == kid_id, Kid.user_id == user_id).first()
+SUBTYPE_MODELS = {
+    type_: relationship.property.mapper.class_ for type_, relationship in SUBTYPE_RELATIONSHIPS.items()
+}
+
+
+def subtype_loaders(types):
+    """One SELECT ... WHERE id IN (...) per subtype in `types`, however many records
+    are loaded; the other subtypes are left empty rather than lazy loaded"""
+    return [
+        selectinload(relationship) if type_ in types else noload(relationship)
+        for type_, relationship in SUBTYPE_RELATIONSHIPS.items()
+    ]
+
+
+async def get_kid_or_404(kid_id: int, user_id: int, db: AsyncSession) -> Kid:
+    kid = (await db.execute(
+        select(Kid).where(Kid.id == kid_id, Kid.user_id == user_id)
+    )).scalars().first()
     if not kid:
         raise HTTPException(status_code=404, detail="Kid not found")
     return kid
 
 
+async def save_record(db: AsyncSession, base_record: Record, detail) -> None:
+    """Insert a record with its subtype row, count it in the daily stats
+    and add it to the retrieval index"""
+    detail.record = base_record
+    db.add(detail)
+    await db.flush()
+    # created_at is a server default; load just that for the response and the stats day
+    await db.refresh(base_record, ["created_at"])
+    await db.run_sync(lambda sync_db: daily_stats.apply(
+        sync_db, base_record.kid_id, [(base_record.record_type, base_record.created_at, detail)]
+    ))
+    await db.commit()
+    record_index.add(base_record, detail)
+
+
+async def paginate(db: AsyncSession, query, limit: int, cursor: Optional[str]) -> dict:
+    """Run a record or subtype query one keyset page at a time, newest first.
+
+    Pages are ordered by (Record.created_at, Record.id), so with the kid
+    filter each one is a single range scan of ix_records_kid_id_created_at_id
+    (or the record_type variant), however far back the cursor is. Subtype
+    rows share their record's id.
+    """
+    if cursor:
+        try:
+            query = query.where(keyset_before(Record.created_at, Record.id, cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows = (await db.execute(query.order_by(
+        Record.created_at.desc(), Record.id.desc()
+    ).limit(limit + 1))).scalars().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1] if isinstance(rows[-1], Record) else rows[-1].record
+        next_cursor = encode_cursor(last.created_at, last.id)
+    # Validated into the endpoint's RecordPage[...] response model
+    return {"records": rows, "next_cursor": next_cursor}
+
+
 # ========== All Records ==========
-@router.get("/", response_model=List[RecordResponse])
-def get_all_records(
+@router.get("/", response_model=RecordPage[RecordResponse])
+async def get_all_records(
     kid_id: int,
     record_type: Optional[RecordTypeEnum] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
-    limit: int = Query(50, le=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    await get_kid_or_404(kid_id, current_user.id, db)
+    query = select(Record).where(Record.kid_id == kid_id)
+
+    if record_type:
+        query = query.where(Record.record_type == record_type)
+    if date_from:
+        query = query.where(Record.created_at >= date_from)
+    if date_to:
+        query = query.where(Record.created_at <= date_to)
+
+    return await paginate(db, query, limit, cursor)
+
+
+@router.get("/timeline", response_model=RecordTimelinePage)
+async def get_record_timeline(
+    kid_id: int,
+    record_type: Optional[List[RecordTypeEnum]] = Query(None),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
-    query = db.query(Record).filter(Record.kid_id == kid_id)
+    """Every record, newest first, with its subtype fields.
+
+    Takes one query for the page plus one per subtype present in the
+    filter, independent of page size. Pass `record_type` repeatedly to
+    filter by several types.
+    """
+    await get_kid_or_404(kid_id, current_user.id, db)
+    types = set(record_type) if record_type else set(RecordTypeEnum)
+    query = select(Record).where(Record.kid_id == kid_id).options(*subtype_loaders(types))
 
     if record_type:
-        query = query.filter(Record.record_type == record_type)
+        query = query.where(Record.record_type.in_(types))
     if date_from:
-        query = query.filter(Record.created_at >= date_from)
+        query = query.where(Record.created_at >= date_from)
     if date_to:
-        query = query.filter(Record.created_at <= date_to)
+        query = query.where(Record.created_at <= date_to)
+
+    return await paginate(db, query, limit, cursor)
+
+
+@router.get("/export")
+async def export_records(
+    kid_id: int,
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    record_type: Optional[List[RecordTypeEnum]] = Query(None),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Stream every record of a kid, oldest first, with its subtype fields.
 
-    return query.order_by(Record.created_at.desc()).limit(limit).all()
+    Rows are read through a server-side cursor in batches and written out
+    as they arrive, so memory use doesn't grow with the size of the history.
+    """
+    kid = await get_kid_or_404(kid_id, current_user.id, db)
+    statement = export_statement(kid_id, set(record_type or ()), date_from, date_to)
+    # The request's session is closed before a streamed body is sent
+    session_factory = read_sessionmaker(current_user.id, request)
+
+    async def body():
+        async with session_factory() as export_db:
+            if format == "csv":
+                # BOM so spreadsheet apps read the Korean text as UTF-8
+                yield "\ufeff" + csv_chunk((), header=True)
+            async for rows in stream_rows(export_db, statement):
+                yield csv_chunk(rows) if format == "csv" else ndjson_chunk(rows)
+
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    filename = f"kid-{kid.id}-records.{format}"
+    return StreamingResponse(
+        body(), media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/stats/daily", response_model=List[DailyStatsResponse])
+async def get_daily_stats(
+    kid_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Per-day sleep, feeding, stool and temperature totals, oldest first.
+
+    Defaults to the last 30 days. Served from the record_daily_stats
+    rollup with one primary key range scan; days without records are
+    omitted. Days are calendar days in RECORD_STATS_TIMEZONE.
+    """
+    await get_kid_or_404(kid_id, current_user.id, db)
+    date_to = date_to or stats_today()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= settings.RECORD_STATS_MAX_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.RECORD_STATS_MAX_DAYS} days per request"
+        )
+
+    rows = (await db.execute(
+        select(RecordDailyStats).where(
+            RecordDailyStats.kid_id == kid_id,
+            RecordDailyStats.day >= date_from,
+            RecordDailyStats.day <= date_to
+        ).order_by(RecordDailyStats.day)
+    )).scalars().all()
+    return [
+        DailyStatsResponse(
+            day=row.day,
+            sleep_minutes=row.sleep_minutes,
+            sleep_count=row.sleep_count,
+            feeds={meal_type: getattr(row, f"feeds_{meal_type.value}") for meal_type in MealTypeEnum},
+            stool_conditions={
+                condition: getattr(row, f"stool_{condition.value}") for condition in StoolConditionEnum
+            },
+            stool_colors={color: getattr(row, f"stool_{color.value}") for color in StoolColorEnum},
+            max_temperature=row.max_temperature,
+        )
+        for row in rows
+    ]
 
 
 @router.delete("/{record_id}", status_code=204)
-def delete_record(
+async def delete_record(
     kid_id: int,
     record_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
-    record = db.query(Record).filter(Record.id == record_id, Record.kid_id == kid_id).first()
+    await get_kid_or_404(kid_id, current_user.id, db)
+    record = (await db.execute(
+        select(Record).where(Record.id == record_id, Record.kid_id == kid_id).options(
+            *(joinedload(relationship) for relationship in SUBTYPE_RELATIONSHIPS.values())
+        )
+    )).unique().scalars().first()
     if not record:
         raise HTTPException(status_code=404, detail="Record not found")
-    db.delete(record)
-    db.commit()
+    # misc records have no subtype row and add nothing to the daily stats
+    relationship = SUBTYPE_RELATIONSHIPS.get(record.record_type)
+    detail = getattr(record, relationship.key) if relationship is not None else None
+    await db.delete(record)
+    await db.flush()
+    if detail is not None:
+        await db.run_sync(lambda sync_db: daily_stats.apply(
+            sync_db, kid_id, [(record.record_type, record.created_at, detail)], sign=-1
+        ))
+    await db.commit()
+    kid_context_cache.invalidate(kid_id)
+    record_index.remove(kid_id, record_id)
+
+
+# ========== Batch ==========
+
+@router.post("/batch", response_model=RecordBatchResponse)
+async def create_records_batch(
+    kid_id: int,
+    data: RecordBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a mix of meal, sleep, health, growth and stool records in one transaction.
+
+    Each item is the matching typed create payload plus `record_type`.
+    Invalid items are reported by index in `errors` and the valid ones
+    are still created. Base rows go in with one multi-row INSERT ...
+    RETURNING, subtype rows with one executemany per subtype table.
+    """
+    if len(data.records) > settings.RECORD_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {settings.RECORD_BATCH_MAX_ITEMS} records per batch"
+        )
+    await get_kid_or_404(kid_id, current_user.id, db)
+
+    items = []
+    errors = []
+    for index, raw in enumerate(data.records):
+        try:
+            items.append((index, record_batch_item_adapter.validate_python(raw)))
+        except ValidationError as e:
+            errors.append(RecordBatchError(
+                index=index, errors=e.errors(include_url=False, include_context=False, include_input=False)
+            ))
+
+    created = []
+    if items:
+        # sort_by_parameter_order pairs each returned id with the item it was inserted for
+        rows = (await db.execute(
+            insert(Record).returning(Record.id, Record.created_at, sort_by_parameter_order=True),
+            [
+                {
+                    "kid_id": kid_id,
+                    "record_type": RecordTypeEnum(item.record_type),
+                    "title": item.title,
+                    "memo": item.memo,
+                    "image_url": item.image_url,
+                }
+                for _, item in items
+            ]
+        )).all()
+
+        details = defaultdict(list)
+        for (index, item), (record_id, created_at) in zip(items, rows):
+            record_type = RecordTypeEnum(item.record_type)
+            details[SUBTYPE_MODELS[record_type]].append(
+                {"id": record_id, **item.model_dump(exclude=BATCH_ITEM_BASE_FIELDS)}
+            )
+            created.append(RecordBatchCreated(
+                index=index, id=record_id, record_type=record_type, created_at=created_at
+            ))
+        for model, values in details.items():
+            await db.execute(insert(model), values)
+        await db.run_sync(lambda sync_db: daily_stats.apply(
+            sync_db, kid_id, [(item.record_type, created_at, item) for (_, item), (_, created_at) in zip(items, rows)]
+        ))
+        await db.commit()
+
+        kid_context_cache.invalidate(kid_id)
+        # Rebuilt from the database on the next chat question
+        record_index.invalidate(kid_id)
+
+    return RecordBatchResponse(created=created, errors=errors)
 
 
 # ========== Meal Records ==========
-@router.get("/meal", response_model=List[MealRecordResponse])
-def get_meal_records(
+@router.get("/meal", response_model=RecordPage[MealRecordResponse])
+async def get_meal_records(
     kid_id: int,
-    limit: int = Query(50, le=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
-    records = db.query(MealRecord).join(Record).filter(
-        Record.kid_id == kid_id
-    ).options(joinedload(MealRecord.record)).order_by(Record.created_at.desc()).limit(limit).all()
-    return records
+    await get_kid_or_404(kid_id, current_user.id, db)
+    # record_type is implied by the join but lets the (kid_id, record_type, ...) index serve the scan
+    query = select(MealRecord).join(Record).where(
+        Record.kid_id == kid_id, Record.record_type == RecordTypeEnum.meal
+    ).options(joinedload(MealRecord.record))
+    return await paginate(db, query, limit, cursor)
 
 
 @router.post("/meal", response_model=MealRecordResponse, status_code=201)
-def create_meal_record(
+async def create_meal_record(
     kid_id: int,
     data: MealRecordCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
+    await get_kid_or_404(kid_id, current_user.id, db)
     
     # Create base record
     base_record = Record(
@@ -98,45 +382,42 @@ def create_meal_record(
         memo=data.memo,
         image_url=data.image_url
     )
-    db.add(base_record)
-    db.flush()
-    
+
     # Create meal record
     meal_record = MealRecord(
-        id=base_record.id,
         meal_type=data.meal_type,
         meal_detail=data.meal_detail,
         burp=data.burp
     )
-    db.add(meal_record)
-    db.commit()
-    db.refresh(meal_record)
+    await save_record(db, base_record, meal_record)
     return meal_record
 
 
 # ========== Sleep Records ==========
-@router.get("/sleep", response_model=List[SleepRecordResponse])
-def get_sleep_records(
+@router.get("/sleep", response_model=RecordPage[SleepRecordResponse])
+async def get_sleep_records(
     kid_id: int,
-    limit: int = Query(50, le=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
-    records = db.query(SleepRecord).join(Record).filter(
-        Record.kid_id == kid_id
-    ).options(joinedload(SleepRecord.record)).order_by(Record.created_at.desc()).limit(limit).all()
-    return records
+    await get_kid_or_404(kid_id, current_user.id, db)
+    # record_type is implied by the join but lets the (kid_id, record_type, ...) index serve the scan
+    query = select(SleepRecord).join(Record).where(
+        Record.kid_id == kid_id, Record.record_type == RecordTypeEnum.sleep
+    ).options(joinedload(SleepRecord.record))
+    return await paginate(db, query, limit, cursor)
 
 
 @router.post("/sleep", response_model=SleepRecordResponse, status_code=201)
-def create_sleep_record(
+async def create_sleep_record(
     kid_id: int,
     data: SleepRecordCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
+    await get_kid_or_404(kid_id, current_user.id, db)
     
     base_record = Record(
         kid_id=kid_id,
@@ -145,44 +426,42 @@ def create_sleep_record(
         memo=data.memo,
         image_url=data.image_url
     )
-    db.add(base_record)
-    db.flush()
-    
+
     sleep_record = SleepRecord(
-        id=base_record.id,
         start_datetime=data.start_datetime,
         end_datetime=data.end_datetime,
         sleep_quality=data.sleep_quality
     )
-    db.add(sleep_record)
-    db.commit()
-    db.refresh(sleep_record)
+    await save_record(db, base_record, sleep_record)
+    kid_context_cache.invalidate(kid_id)
     return sleep_record
 
 
 # ========== Health Records ==========
-@router.get("/health", response_model=List[HealthRecordResponse])
-def get_health_records(
+@router.get("/health", response_model=RecordPage[HealthRecordResponse])
+async def get_health_records(
     kid_id: int,
-    limit: int = Query(50, le=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
-    records = db.query(HealthRecord).join(Record).filter(
-        Record.kid_id == kid_id
-    ).options(joinedload(HealthRecord.record)).order_by(Record.created_at.desc()).limit(limit).all()
-    return records
+    await get_kid_or_404(kid_id, current_user.id, db)
+    # record_type is implied by the join but lets the (kid_id, record_type, ...) index serve the scan
+    query = select(HealthRecord).join(Record).where(
+        Record.kid_id == kid_id, Record.record_type == RecordTypeEnum.health
+    ).options(joinedload(HealthRecord.record))
+    return await paginate(db, query, limit, cursor)
 
 
 @router.post("/health", response_model=HealthRecordResponse, status_code=201)
-def create_health_record(
+async def create_health_record(
     kid_id: int,
     data: HealthRecordCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
+    await get_kid_or_404(kid_id, current_user.id, db)
     
     base_record = Record(
         kid_id=kid_id,
@@ -191,44 +470,42 @@ def create_health_record(
         memo=data.memo,
         image_url=data.image_url
     )
-    db.add(base_record)
-    db.flush()
-    
+
     health_record = HealthRecord(
-        id=base_record.id,
         temperature=data.temperature,
         symptom=data.symptom,
         symptom_other=data.symptom_other
     )
-    db.add(health_record)
-    db.commit()
-    db.refresh(health_record)
+    await save_record(db, base_record, health_record)
+    kid_context_cache.invalidate(kid_id)
     return health_record
 
 
 # ========== Growth Records ==========
-@router.get("/growth", response_model=List[GrowthRecordResponse])
-def get_growth_records(
+@router.get("/growth", response_model=RecordPage[GrowthRecordResponse])
+async def get_growth_records(
     kid_id: int,
-    limit: int = Query(50, le=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
-    records = db.query(GrowthRecord).join(Record).filter(
-        Record.kid_id == kid_id
-    ).options(joinedload(GrowthRecord.record)).order_by(Record.created_at.desc()).limit(limit).all()
-    return records
+    await get_kid_or_404(kid_id, current_user.id, db)
+    # record_type is implied by the join but lets the (kid_id, record_type, ...) index serve the scan
+    query = select(GrowthRecord).join(Record).where(
+        Record.kid_id == kid_id, Record.record_type == RecordTypeEnum.growth
+    ).options(joinedload(GrowthRecord.record))
+    return await paginate(db, query, limit, cursor)
 
 
 @router.post("/growth", response_model=GrowthRecordResponse, status_code=201)
-def create_growth_record(
+async def create_growth_record(
     kid_id: int,
     data: GrowthRecordCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
+    await get_kid_or_404(kid_id, current_user.id, db)
     
     base_record = Record(
         kid_id=kid_id,
@@ -237,43 +514,41 @@ def create_growth_record(
         memo=data.memo,
         image_url=data.image_url
     )
-    db.add(base_record)
-    db.flush()
-    
+
     growth_record = GrowthRecord(
-        id=base_record.id,
         height_cm=data.height_cm,
         weight_kg=data.weight_kg
     )
-    db.add(growth_record)
-    db.commit()
-    db.refresh(growth_record)
+    await save_record(db, base_record, growth_record)
+    kid_context_cache.invalidate(kid_id)
     return growth_record
 
 
 # ========== Stool Records ==========
-@router.get("/stool", response_model=List[StoolRecordResponse])
-def get_stool_records(
+@router.get("/stool", response_model=RecordPage[StoolRecordResponse])
+async def get_stool_records(
     kid_id: int,
-    limit: int = Query(50, le=100),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
-    records = db.query(StoolRecord).join(Record).filter(
-        Record.kid_id == kid_id
-    ).options(joinedload(StoolRecord.record)).order_by(Record.created_at.desc()).limit(limit).all()
-    return records
+    await get_kid_or_404(kid_id, current_user.id, db)
+    # record_type is implied by the join but lets the (kid_id, record_type, ...) index serve the scan
+    query = select(StoolRecord).join(Record).where(
+        Record.kid_id == kid_id, Record.record_type == RecordTypeEnum.stool
+    ).options(joinedload(StoolRecord.record))
+    return await paginate(db, query, limit, cursor)
 
 
 @router.post("/stool", response_model=StoolRecordResponse, status_code=201)
-def create_stool_record(
+async def create_stool_record(
     kid_id: int,
     data: StoolRecordCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    get_kid_or_404(kid_id, current_user.id, db)
+    await get_kid_or_404(kid_id, current_user.id, db)
     
     base_record = Record(
         kid_id=kid_id,
@@ -282,16 +557,11 @@ def create_stool_record(
         memo=data.memo,
         image_url=data.image_url
     )
-    db.add(base_record)
-    db.flush()
-    
+
     stool_record = StoolRecord(
-        id=base_record.id,
         amount=data.amount,
         condition=data.condition,
         color=data.color
     )
-    db.add(stool_record)
-    db.commit()
-    db.refresh(stool_record)
+    await save_record(db, base_record, stool_record)
     return stool_record
@@ -1,8 +1,180 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.utils.cache import TTLCache
 
-engine = create_engine(settings.DATABASE_URL, echo=True, future=True)
+# Async drivers for the sync URLs DATABASE_URL is written with
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+class PoolMetricsMixin:
+    """Times how long checkouts wait for a connection and counts the ones that time out"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.checkout_failures += 1
+            raise
+        waited = time.perf_counter() - started_at
+        with self._metrics_lock:
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return connection
+
+    def recreate(self):
+        # Keep the counters when the engine swaps in a fresh pool (e.g. after dispose)
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.checkout_failures = self.checkout_failures
+        pool.total_wait_seconds = self.total_wait_seconds
+        pool.max_wait_seconds = self.max_wait_seconds
+        return pool
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "avg_wait_ms": round(self.total_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+        }
+
+
+class MeteredQueuePool(PoolMetricsMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: str, asynchronous: bool = False) -> dict:
+    """create_engine keyword arguments for `url` from the DB_* settings"""
+    parsed = make_url(url)
+    options = {"echo": settings.DB_ECHO}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection; keep SQLAlchemy's pool for it
+        return options
+
+    options.update(
+        poolclass=MeteredAsyncQueuePool if asynchronous else MeteredQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if parsed.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if asynchronous:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+def pool_stats(engine) -> dict:
+    pool = engine.pool
+    if isinstance(pool, PoolMetricsMixin):
+        return pool.stats()
+    return {"status": pool.status()}
+
+
+engine = create_engine(settings.DATABASE_URL, future=True, **engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Used by the API; the sync engine stays for create_all and scripts
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, asynchronous=True))
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# Read replica for read-only handlers (see get_read_db); None without one
+replica_async_engine = None
+if settings.DATABASE_REPLICA_URL:
+    ASYNC_DATABASE_REPLICA_URL = (
+        settings.ASYNC_DATABASE_REPLICA_URL or async_database_url(settings.DATABASE_REPLICA_URL)
+    )
+    replica_async_engine = create_async_engine(
+        ASYNC_DATABASE_REPLICA_URL, **engine_options(ASYNC_DATABASE_REPLICA_URL, asynchronous=True)
+    )
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=replica_async_engine or async_engine, autoflush=False, expire_on_commit=False
+)
+
+# The authenticated user of the current request, set by get_current_user
+current_user_id: ContextVar[Optional[int]] = ContextVar("current_user_id", default=None)
+
+# Users who committed a write within the read-your-writes window, in this
+# worker; ReadYourWritesMiddleware tells the others via a cookie
+recent_writers = TTLCache(maxsize=100_000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+# Users who committed a write during the current request; set per request
+# by ReadYourWritesMiddleware
+request_writers: ContextVar[Optional[set]] = ContextVar("request_writers", default=None)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state):
+    # Bulk UPDATE/DELETE statements don't go through a flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session):
+    if session.info.pop("has_writes", False):
+        user_id = current_user_id.get()
+        if user_id is not None:
+            recent_writers.set(user_id, True)
+            writers = request_writers.get()
+            if writers is not None:
+                writers.add(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("has_writes", None)
+
+
 Base = declarative_base()
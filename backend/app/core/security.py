@@ -34,6 +34,18 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
+def create_write_marker(user_id: int) -> str:
+    """Signed proof that `user_id` wrote recently, valid for READ_YOUR_WRITES_SECONDS"""
+    expire = datetime.utcnow() + timedelta(seconds=settings.READ_YOUR_WRITES_SECONDS)
+    to_encode = {"sub": str(user_id), "exp": expire, "type": "write"}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def is_write_marker_for(token: Optional[str], user_id: int) -> bool:
+    payload = decode_token(token) if token else None
+    return payload is not None and payload.get("type") == "write" and payload.get("sub") == str(user_id)
+
+
 def decode_token(token: str) -> Optional[dict]:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -1,26 +1,65 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 import os
 
+from app.api.deps import ReadYourWritesMiddleware
 from app.api.v1 import api_router
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.models import *  # Import all models for table creation
+from app.core.database import engine, async_engine, replica_async_engine
+from app.services.ai_service import AIServiceError, ai_service
+from app.services.history_service import history_manager
+from app.services.llm_scheduler import QueueFullError
 
 
-def init_db():
-    """Initialize database tables"""
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+
+def check_db():
+    """Check the database is at the latest migration (schema changes run via `alembic upgrade head`)"""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
     try:
-        Base.metadata.create_all(bind=engine)
-        print("Database tables created successfully")
+        with engine.connect() as connection:
+            current = MigrationContext.configure(connection).get_current_revision()
+        head = ScriptDirectory(MIGRATIONS_DIR).get_current_head()
+        if current == head:
+            print(f"Database schema is up to date ({current})")
+        else:
+            print(f"Database schema is at {current}, expected {head}; run `alembic upgrade head`")
     except Exception as e:
         print(f"Database connection failed: {e}")
         print("Server will start but database features won't work")
 
 
-# Try to create tables (won't fail if DB is not available)
-init_db()
+def warm_up_provider(provider):
+    try:
+        provider.warm_up()
+    except Exception as e:
+        print(f"AI provider warm-up failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    provider = ai_service.setup()
+    # Neither has to finish before serving: the schema check only reads
+    # alembic_version and reports, and providers also load lazily on first use
+    background = [asyncio.create_task(run_in_threadpool(check_db))]
+    if provider:
+        background.append(asyncio.create_task(run_in_threadpool(warm_up_provider, provider)))
+    yield
+    await asyncio.gather(*background)
+    await history_manager.close()
+    await async_engine.dispose()
+    if replica_async_engine is not None:
+        await replica_async_engine.dispose()
+    engine.dispose()
+
 
 # Create upload directory
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
@@ -30,9 +69,12 @@ app = FastAPI(
     description="Parenting record and AI consultation service API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+app.add_middleware(ReadYourWritesMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -42,6 +84,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(QueueFullError)
+def queue_full_handler(request: Request, exc: QueueFullError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "AI 상담 요청이 많습니다. 잠시 후 다시 시도해주세요."},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.exception_handler(AIServiceError)
+def ai_service_error_handler(request: Request, exc: AIServiceError):
+    headers = {"Retry-After": str(exc.retry_after)} if exc.retry_after else None
+    return JSONResponse(
+        status_code=503,
+        content={"detail": exc.message, "error": "ai_unavailable"},
+        headers=headers
+    )
+
+
 # Static files for uploads
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
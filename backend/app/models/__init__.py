@@ -9,6 +9,8 @@ from .stool_record import StoolRecord
 from .sleep_record import SleepRecord
 from .health_record import HealthRecord
 from .growth_record import GrowthRecord
+from .record_import_job import RecordImportJob
+from .record_daily_stats import RecordDailyStats
 
 from .ai_mode import AIMode
 from .enums import (
@@ -21,6 +23,7 @@ from .enums import (
     SleepQualityEnum,
     SenderTypeEnum,
     CommunityCategoryEnum,
+    ImportStatusEnum,
 )
 
 from .post import Post
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, TIMESTAMP, func, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, func, ForeignKey, Enum, Index, DDL, event
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.enums import SenderTypeEnum
@@ -14,5 +14,23 @@ class ChatMessage(Base):
     content = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_created_at", "session_id", "created_at"),
+        # Trigram index behind chat search; other databases use the in-process index
+        Index(
+            "ix_chat_messages_content_trgm",
+            "content",
+            postgresql_using="gin",
+            postgresql_ops={"content": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
+
     session = relationship("ChatSession", back_populates="messages")
     ai_mode = relationship("AIMode", back_populates="chat_messages")
+
+
+event.listen(
+    ChatMessage.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
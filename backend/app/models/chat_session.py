@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, TIMESTAMP, func, ForeignKey
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, func, ForeignKey
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -10,6 +10,9 @@ class ChatSession(Base):
     kid_id = Column(Integer, ForeignKey("kids.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now())
+    # Rolling summary of turns that fell out of the history token budget
+    summary = Column(Text)
+    summarized_until_id = Column(Integer)
 
     kid = relationship("Kid", back_populates="chat_sessions")
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
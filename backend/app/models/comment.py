@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, TIMESTAMP, func, ForeignKey
+from sqlalchemy import Column, Integer, Text, TIMESTAMP, func, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -12,5 +12,9 @@ class Comment(Base):
     content = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_community_comments_post_id_created_at", "post_id", "created_at"),
+    )
+
     post = relationship("Post", back_populates="comments")
     user = relationship("User", back_populates="comments")
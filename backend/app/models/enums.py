@@ -59,3 +59,9 @@ class CommunityCategoryEnum(PyEnum):
     recipes = "recipes"
     tips = "tips"
     talk = "talk"
+
+
+class ImportStatusEnum(PyEnum):
+    running = "running"
+    completed = "completed"
+    failed = "failed"
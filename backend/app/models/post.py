@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.enums import CommunityCategoryEnum
@@ -18,6 +18,10 @@ class Post(Base):
     updated_at = Column(TIMESTAMP, server_default=func.now())
     likes_count = Column(Integer, default=0)
 
+    __table_args__ = (
+        Index("ix_community_posts_category_created_at", "category", "created_at"),
+    )
+
     user = relationship("User", back_populates="posts")
     kid = relationship("Kid", back_populates="posts")
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from app.models.enums import RecordTypeEnum
@@ -15,6 +15,12 @@ class Record(Base):
     image_url = Column(Text)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        # id breaks created_at ties, so keyset pages are a single index range scan
+        Index("ix_records_kid_id_created_at_id", "kid_id", "created_at", "id"),
+        Index("ix_records_kid_id_record_type_created_at_id", "kid_id", "record_type", "created_at", "id"),
+    )
+
     kid = relationship("Kid", back_populates="records")
     
     # Relationships to specific record types
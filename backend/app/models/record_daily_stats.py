@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, Date, Numeric, ForeignKey
+from app.core.database import Base
+
+
+class RecordDailyStats(Base):
+    """Per-kid, per-day totals kept in step by the record write paths (see daily_stats)"""
+    __tablename__ = "record_daily_stats"
+
+    kid_id = Column(Integer, ForeignKey("kids.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    sleep_minutes = Column(Integer, nullable=False, default=0)
+    # Every sleep started that day; records don't tell naps from night sleep
+    sleep_count = Column(Integer, nullable=False, default=0)
+
+    feeds_breast_milk = Column(Integer, nullable=False, default=0)
+    feeds_formula = Column(Integer, nullable=False, default=0)
+    feeds_baby_food = Column(Integer, nullable=False, default=0)
+
+    stool_normal = Column(Integer, nullable=False, default=0)
+    stool_diarrhea = Column(Integer, nullable=False, default=0)
+    stool_constipation = Column(Integer, nullable=False, default=0)
+    stool_yellow = Column(Integer, nullable=False, default=0)
+    stool_brown = Column(Integer, nullable=False, default=0)
+    stool_green = Column(Integer, nullable=False, default=0)
+    stool_other = Column(Integer, nullable=False, default=0)
+
+    max_temperature = Column(Numeric(4, 1))
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, JSON, func, ForeignKey, Enum
+from app.core.database import Base
+from app.models.enums import ImportStatusEnum
+
+
+class RecordImportJob(Base):
+    __tablename__ = "record_import_jobs"
+
+    id = Column(Integer, primary_key=True)
+    kid_id = Column(Integer, ForeignKey("kids.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    status = Column(Enum(ImportStatusEnum), nullable=False, default=ImportStatusEnum.running)
+    filename = Column(String(255))
+    file_path = Column(Text, nullable=False)
+    total_rows = Column(Integer)
+    # Data rows consumed so far; committed with each chunk, so a resume starts here
+    processed_rows = Column(Integer, nullable=False, default=0)
+    imported_rows = Column(Integer, nullable=False, default=0)
+    error_rows = Column(Integer, nullable=False, default=0)
+    # The first RECORD_IMPORT_MAX_ERRORS row errors as [{"row", "errors"}]
+    errors = Column(JSON)
+    error = Column(Text)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now())
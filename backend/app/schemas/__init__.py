@@ -7,8 +7,15 @@ from .record import (
     HealthRecordCreate, HealthRecordResponse,
     GrowthRecordCreate, GrowthRecordResponse,
     StoolRecordCreate, StoolRecordResponse,
+    TimelineRecordResponse, RecordPage, RecordTimelinePage,
+    RecordBatchItem, RecordBatchCreate, RecordBatchCreated, RecordBatchError, RecordBatchResponse,
+    RecordImportJobResponse, DailyStatsResponse,
+)
+from .chat import (
+    ChatSessionCreate, ChatSessionResponse, ChatSessionDetailResponse, ChatSessionListItem,
+    ChatMessageCreate, ChatMessageResponse, ChatMessagePage, ChatPanelCreate,
+    ChatSearchHit, ChatSearchResponse,
 )
-from .chat import ChatSessionCreate, ChatSessionResponse, ChatMessageCreate, ChatMessageResponse
 from .community import (
     PostCreate, PostUpdate, PostResponse, PostListResponse,
     CommentCreate, CommentResponse,
@@ -11,6 +11,13 @@ class ChatSessionCreate(BaseModel):
 class ChatMessageCreate(BaseModel):
     content: str = Field(..., min_length=1)
     ai_mode_id: Optional[int] = None
+    # Client-generated key; retries with the same key return the original reply
+    idempotency_key: Optional[str] = Field(None, max_length=100)
+
+
+class ChatPanelCreate(BaseModel):
+    content: str = Field(..., min_length=1)
+    ai_mode_ids: List[int] = Field(..., min_length=1, max_length=5)
 
 
 class ChatMessageResponse(BaseModel):
@@ -34,3 +41,41 @@ class ChatSessionResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ChatSessionListItem(BaseModel):
+    id: int
+    kid_id: int
+    created_at: datetime
+    updated_at: datetime
+    last_message_preview: Optional[str] = None
+    message_count: int = 0
+    last_activity_at: datetime
+
+
+class ChatSessionDetailResponse(ChatSessionResponse):
+    # Cursor for older messages than the ones included, if any
+    next_cursor: Optional[str] = None
+
+
+class ChatMessagePage(BaseModel):
+    messages: List[ChatMessageResponse]
+    next_cursor: Optional[str] = None
+
+
+class ChatSearchHit(BaseModel):
+    message_id: int
+    session_id: int
+    kid_id: int
+    sender: SenderTypeEnum
+    ai_mode_id: Optional[int]
+    snippet: str
+    created_at: datetime
+    score: float
+
+
+class ChatSearchResponse(BaseModel):
+    results: List[ChatSearchHit]
+    total: int
+    page: int
+    limit: int
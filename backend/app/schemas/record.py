@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional, Any
+from pydantic import BaseModel, Field, TypeAdapter
+from datetime import date, datetime
+from typing import Annotated, Dict, Generic, List, Literal, Optional, Any, TypeVar, Union
 from decimal import Decimal
 from app.models.enums import (
     RecordTypeEnum,
@@ -10,8 +10,11 @@ from app.models.enums import (
     StoolAmountEnum,
     StoolConditionEnum,
     StoolColorEnum,
+    ImportStatusEnum,
 )
 
+T = TypeVar("T")
+
 
 # Base Record
 class RecordBase(BaseModel):
@@ -120,3 +123,149 @@ class StoolRecordResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Timeline: base records with their subtype fields inline
+class MealDetail(BaseModel):
+    meal_type: MealTypeEnum
+    meal_detail: Optional[str]
+    burp: Optional[bool]
+
+    class Config:
+        from_attributes = True
+
+
+class SleepDetail(BaseModel):
+    start_datetime: datetime
+    end_datetime: datetime
+    sleep_quality: SleepQualityEnum
+
+    class Config:
+        from_attributes = True
+
+
+class HealthDetail(BaseModel):
+    temperature: Optional[Decimal]
+    symptom: SymptomEnum
+    symptom_other: Optional[str]
+
+    class Config:
+        from_attributes = True
+
+
+class GrowthDetail(BaseModel):
+    height_cm: Optional[Decimal]
+    weight_kg: Optional[Decimal]
+
+    class Config:
+        from_attributes = True
+
+
+class StoolDetail(BaseModel):
+    amount: StoolAmountEnum
+    condition: StoolConditionEnum
+    color: StoolColorEnum
+
+    class Config:
+        from_attributes = True
+
+
+class TimelineRecordResponse(RecordResponse):
+    # Only the one matching record_type is set
+    meal_record: Optional[MealDetail] = None
+    sleep_record: Optional[SleepDetail] = None
+    health_record: Optional[HealthDetail] = None
+    growth_record: Optional[GrowthDetail] = None
+    stool_record: Optional[StoolDetail] = None
+
+
+class RecordPage(BaseModel, Generic[T]):
+    """A page of records, newest first; pass next_cursor back as `cursor` for the next one"""
+    records: List[T]
+    next_cursor: Optional[str] = None
+
+
+RecordTimelinePage = RecordPage[TimelineRecordResponse]
+
+
+# Batch ingestion: a mix of the typed create payloads, tagged by record_type
+class MealBatchItem(MealRecordCreate):
+    record_type: Literal["meal"]
+
+
+class SleepBatchItem(SleepRecordCreate):
+    record_type: Literal["sleep"]
+
+
+class HealthBatchItem(HealthRecordCreate):
+    record_type: Literal["health"]
+
+
+class GrowthBatchItem(GrowthRecordCreate):
+    record_type: Literal["growth"]
+
+
+class StoolBatchItem(StoolRecordCreate):
+    record_type: Literal["stool"]
+
+
+RecordBatchItem = Annotated[
+    Union[MealBatchItem, SleepBatchItem, HealthBatchItem, GrowthBatchItem, StoolBatchItem],
+    Field(discriminator="record_type")
+]
+record_batch_item_adapter = TypeAdapter(RecordBatchItem)
+
+# Fields of a batch item that go on the base Record row; the rest go on the subtype row
+BATCH_ITEM_BASE_FIELDS = frozenset(RecordBase.model_fields) | {"record_type"}
+
+
+class RecordBatchCreate(BaseModel):
+    # Validated one by one against RecordBatchItem so a bad item doesn't reject the batch
+    records: List[Dict[str, Any]] = Field(..., min_length=1)
+
+
+class RecordBatchCreated(BaseModel):
+    index: int
+    id: int
+    record_type: RecordTypeEnum
+    created_at: datetime
+
+
+class RecordBatchError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class RecordBatchResponse(BaseModel):
+    created: List[RecordBatchCreated]
+    errors: List[RecordBatchError]
+
+
+# CSV import jobs
+class RecordImportJobResponse(BaseModel):
+    id: int
+    kid_id: int
+    status: ImportStatusEnum
+    filename: Optional[str]
+    total_rows: Optional[int]
+    processed_rows: int
+    imported_rows: int
+    error_rows: int
+    errors: Optional[List[Dict[str, Any]]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Daily stats
+class DailyStatsResponse(BaseModel):
+    day: date
+    sleep_minutes: int
+    sleep_count: int
+    feeds: Dict[MealTypeEnum, int]
+    stool_conditions: Dict[StoolConditionEnum, int]
+    stool_colors: Dict[StoolColorEnum, int]
+    max_temperature: Optional[Decimal]
@@ -1 +1,2 @@
 from .ai_service import AIService, ai_service
+from .history_service import HistoryManager, history_manager
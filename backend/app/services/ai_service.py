@@ -1,19 +1,105 @@
-from typing import Optional, List, Dict, Any
+import asyncio
+import time
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Optional, List, Dict, Any, AsyncIterator, Sequence, Tuple, Awaitable, Callable
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-import google.generativeai as genai
 from app.core.config import settings
 from app.models import Kid, Record, MealRecord, SleepRecord, HealthRecord, GrowthRecord
+from app.services.llm_provider import LLMProvider, create_provider
+from app.services.llm_scheduler import LLMScheduler, PRIORITY_HIGH, PRIORITY_NORMAL
+from app.services.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, backoff_delay, hedged
+from app.services.record_index import record_index
+from app.services.response_cache import age_band, response_cache
+from app.utils.cache import TTLCache
+
+# Per-kid prompt context, invalidated by the record and kid write endpoints
+kid_context_cache = TTLCache(
+    maxsize=settings.KID_CONTEXT_CACHE_SIZE,
+    ttl=settings.KID_CONTEXT_CACHE_TTL_SECONDS
+)
+
+# Words that mark a message as a symptom question for queue prioritisation
+SYMPTOM_KEYWORDS = (
+    "열", "발열", "기침", "콧물", "구토", "토했", "설사", "발진", "경련", "호흡",
+    "fever", "cough", "vomit", "diarrhea", "rash", "seizure",
+)
+
+NOT_CONFIGURED_MESSAGE = "AI 서비스가 설정되지 않았습니다. 관리자에게 문의해주세요."
+UNAVAILABLE_MESSAGE = "AI 서비스가 일시적으로 불안정합니다. 잠시 후 다시 시도해주세요."
+TIMEOUT_MESSAGE = "죄송합니다. 응답 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+ERROR_MESSAGE = "죄송합니다. 응답을 생성하는 중 오류가 발생했습니다."
+
+
+async def _aclose(chunks: AsyncIterator[str]) -> None:
+    """Close a provider stream so its HTTP response / generator is cleaned up"""
+    aclose = getattr(chunks, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception:
+            pass
+
+
+class AIServiceError(Exception):
+    """The model could not produce a reply; nothing should be stored as an answer"""
+
+    def __init__(self, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class KidContext:
+    """Prompt context for a kid plus the profile fields answers are cached by"""
+    text: str
+    birth_date: date
+    recent_symptoms: Tuple[str, ...] = ()
+    related_records: Tuple[str, ...] = ()
 
 
 class AIService:
-    def __init__(self):
-        if settings.GEMINI_API_KEY:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-        else:
-            self.model = None
-
-    def get_system_prompt(self, ai_mode: str, kid_context: Optional[str] = None) -> str:
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        self.provider = provider
+
+        # Bounds in-flight LLM calls per worker and queues the rest fairly
+        self.scheduler = LLMScheduler(
+            max_concurrency=settings.AI_MAX_CONCURRENT_REQUESTS,
+            max_queue=settings.AI_QUEUE_MAX_SIZE,
+            max_queued_per_user=settings.AI_QUEUE_MAX_PER_USER
+        )
+        self._timeout = settings.AI_REQUEST_TIMEOUT_SECONDS
+
+        # Provider health: fail fast during outages, retry transient errors,
+        # optionally hedge slow calls past the observed p95 latency
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.AI_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.AI_BREAKER_RESET_SECONDS
+        )
+        # Full-call latency, which picks the hedge delay; streams only report
+        # time to first token, which is tracked apart so it can't skew it
+        self.latency = LatencyTracker()
+        self.first_token_latency = LatencyTracker()
+        self.max_retries = settings.AI_MAX_RETRIES
+        self.retry_base_delay = settings.AI_RETRY_BASE_DELAY_SECONDS
+        self.hedge_enabled = settings.AI_HEDGE_ENABLED
+        self.hedge_min_samples = settings.AI_HEDGE_MIN_SAMPLES
+
+    def setup(self) -> Optional[LLMProvider]:
+        """Create the configured provider, unless one was passed in"""
+        if self.provider is None:
+            self.provider = create_provider()
+        return self.provider
+
+    def get_system_prompt(
+        self,
+        ai_mode: str,
+        kid_context: Optional[str] = None,
+        summary: Optional[str] = None,
+        related_records: Sequence[str] = ()
+    ) -> str:
         base_prompts = {
             "doctor": """당신은 소아과 전문의 AI 어시스턴트입니다.
 - 아이의 건강 관련 질문에 전문적이고 친절하게 답변합니다.
@@ -39,12 +125,52 @@ class AIService:
         if kid_context:
             system_prompt += f"\n\n[아이 정보]\n{kid_context}"
 
+        if related_records:
+            lines = "\n".join(f"- {text}" for text in related_records)
+            system_prompt += f"\n\n[관련 기록]\n{lines}"
+
+        if summary:
+            system_prompt += f"\n\n[이전 대화 요약]\n{summary}"
+
         system_prompt += "\n\n답변은 한국어로 작성하며, 친절하고 이해하기 쉽게 설명해주세요."
 
         return system_prompt
 
-    def build_kid_context(self, kid: Kid, db: Session) -> str:
-        """Build context string from kid's recent records for RAG-like approach"""
+    def get_priority(self, ai_mode: str, message: str) -> int:
+        """Symptom questions to the doctor persona jump the LLM queue"""
+        if ai_mode == "doctor" and any(keyword in message.lower() for keyword in SYMPTOM_KEYWORDS):
+            return PRIORITY_HIGH
+        return PRIORITY_NORMAL
+
+    def build_kid_context(self, kid: Kid, db: Session, question: Optional[str] = None) -> KidContext:
+        """Build context string from kid's recent records for RAG-like approach.
+
+        With a question, the kid's records most relevant to it are attached too.
+        """
+        context = kid_context_cache.get(kid.id)
+        if context is None:
+            context = self._build_profile_context(kid, db)
+            kid_context_cache.set(kid.id, context)
+
+        if question:
+            related = record_index.search(
+                kid.id, question, db,
+                k=settings.RECORD_RETRIEVAL_TOP_K,
+                min_score=settings.RECORD_RETRIEVAL_MIN_SCORE
+            )
+            if related:
+                context = replace(context, related_records=tuple(text for _, _, text in related))
+        return context
+
+    async def load_kid_context(self, kid: Kid, db: AsyncSession, question: Optional[str] = None) -> KidContext:
+        """build_kid_context for an async session; a kid's record index is
+        built first, with its embedding off the event loop"""
+        if question:
+            await record_index.load(kid.id, db)
+        return await db.run_sync(lambda sync_db: self.build_kid_context(kid, sync_db, question=question))
+
+    def _build_profile_context(self, kid: Kid, db: Session) -> KidContext:
+
         context_parts = [f"- 이름: {kid.name}"]
         context_parts.append(f"- 생년월일: {kid.birth_date}")
         context_parts.append(f"- 성별: {'남아' if kid.gender == 'male' else '여아'}")
@@ -65,8 +191,8 @@ class AIService:
             Record.kid_id == kid.id
         ).options(joinedload(HealthRecord.record)).order_by(Record.created_at.desc()).limit(3).all()
 
+        symptoms = []
         if recent_health:
-            symptoms = []
             for health_record in recent_health:
                 if health_record.symptom:
                     symptoms.append(health_record.symptom.value)
@@ -86,28 +212,25 @@ class AIService:
             avg_sleep = total_hours / len(recent_sleep)
             context_parts.append(f"- 평균 수면시간: {avg_sleep:.1f}시간")
 
-        return "\n".join(context_parts)
+        return KidContext(
+            text="\n".join(context_parts),
+            birth_date=kid.birth_date,
+            recent_symptoms=tuple(sorted(set(symptoms)))
+        )
 
-    async def generate_response(
+    def _build_history(
         self,
-        message: str,
         ai_mode: str,
         conversation_history: List[Dict[str, str]],
-        kid: Optional[Kid] = None,
-        db: Optional[Session] = None
-    ) -> str:
-        if not self.model:
-            return "AI 서비스가 설정되지 않았습니다. 관리자에게 문의해주세요."
-
-        # Build kid context if available
-        kid_context = None
-        if kid and db:
-            kid_context = self.build_kid_context(kid, db)
-
-        system_prompt = self.get_system_prompt(ai_mode, kid_context)
-
-        # Build conversation for Gemini
-        chat = self.model.start_chat(history=[])
+        kid_context: Optional[KidContext] = None,
+        summary: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        system_prompt = self.get_system_prompt(
+            ai_mode,
+            kid_context.text if kid_context else None,
+            summary,
+            kid_context.related_records if kid_context else ()
+        )
 
         # Add system prompt as first message
         messages = [{"role": "user", "parts": [system_prompt]}]
@@ -118,17 +241,233 @@ class AIService:
             role = "user" if msg["sender"] == "user" else "model"
             messages.append({"role": role, "parts": [msg["message"]]})
 
-        # Add current message
-        messages.append({"role": "user", "parts": [message]})
+        return messages
+
+    def _response_cache_key(
+        self,
+        message: str,
+        ai_mode: str,
+        conversation_history: List[Dict[str, str]],
+        kid_context: Optional[KidContext],
+        summary: Optional[str]
+    ) -> Optional[tuple]:
+        """Cache key for single-turn questions; None when the answer depends on history"""
+        if not response_cache.enabled or conversation_history or summary or kid_context is None:
+            return None
+        return response_cache.make_key(
+            message, ai_mode, kid_context.birth_date, kid_context.recent_symptoms
+        )
+
+    def _shared_context(self, kid_context: KidContext) -> KidContext:
+        """Kid context reduced to the fields the response cache keys on.
 
+        A cached answer is served to every kid in the same bucket, so it must
+        be generated without anything that identifies one kid: no name,
+        measurements or records.
+        """
+        parts = [f"- 월령대: {age_band(kid_context.birth_date)}"]
+        if kid_context.recent_symptoms:
+            parts.append(f"- 최근 증상: {', '.join(kid_context.recent_symptoms)}")
+        return KidContext(
+            text="\n".join(parts),
+            birth_date=kid_context.birth_date,
+            recent_symptoms=kid_context.recent_symptoms
+        )
+
+    def _check_breaker(self) -> bool:
+        """Returns whether the call is the breaker's half-open trial"""
         try:
-            # Create chat with history
-            chat = self.model.start_chat(history=messages[:-1])
-            response = chat.send_message(message)
-            return response.text
-        except Exception as e:
-            return f"죄송합니다. 응답을 생성하는 중 오류가 발생했습니다: {str(e)}"
+            return self.breaker.before_call()
+        except CircuitOpenError as e:
+            raise AIServiceError(UNAVAILABLE_MESSAGE, retry_after=e.retry_after)
+
+    def _is_transient(self, error: Exception) -> bool:
+        return isinstance(error, asyncio.TimeoutError) or self.provider.is_transient(error)
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedge_enabled or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(0.95)
+
+    async def _call_provider(self, make_call: Callable[[], Awaitable[str]]) -> str:
+        """Call the provider behind the circuit breaker, with jittered retries and hedging.
+
+        The caller holds a scheduler slot for the call; a hedged second copy
+        only runs if another slot is free, so hedging never exceeds the bound.
+        """
+        async def call() -> str:
+            return await asyncio.wait_for(make_call(), self._timeout)
+
+        async def hedge() -> str:
+            async with self.scheduler.spare_slot():
+                return await call()
+
+        for attempt in range(self.max_retries + 1):
+            trial = self._check_breaker()
+            started_at = time.monotonic()
+            try:
+                answer = await hedged(call, self._hedge_delay(), hedge)
+            except asyncio.CancelledError:
+                # No outcome either way; a half-open circuit must not wait on it forever
+                self.breaker.release(trial)
+                raise
+            except Exception as e:
+                if not self._is_transient(e):
+                    # The provider answered, just not usefully: not a health problem
+                    self.breaker.record_success()
+                    raise AIServiceError(ERROR_MESSAGE) from e
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    message = TIMEOUT_MESSAGE if isinstance(e, asyncio.TimeoutError) else UNAVAILABLE_MESSAGE
+                    raise AIServiceError(message) from e
+                await asyncio.sleep(backoff_delay(attempt, self.retry_base_delay))
+                continue
+
+            self.breaker.record_success()
+            self.latency.record(time.monotonic() - started_at)
+            return answer
+
+    async def generate_response(
+        self,
+        message: str,
+        ai_mode: str,
+        conversation_history: List[Dict[str, str]],
+        kid: Optional[Kid] = None,
+        db: Optional[Session] = None,
+        summary: Optional[str] = None,
+        kid_context: Optional[KidContext] = None,
+        user_id: Optional[int] = None
+    ) -> str:
+        """Return the AI reply; raises AIServiceError instead of returning an error text"""
+        if not self.provider:
+            raise AIServiceError(NOT_CONFIGURED_MESSAGE)
+
+        # Build kid context if available and not supplied by the caller
+        if kid_context is None and kid and db:
+            kid_context = self.build_kid_context(kid, db, question=message)
+
+        cache_key = self._response_cache_key(message, ai_mode, conversation_history, kid_context, summary)
+        if cache_key is not None:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if cache_key is not None:
+            kid_context = self._shared_context(kid_context)
+        history = self._build_history(ai_mode, conversation_history, kid_context, summary)
+        async with self.scheduler.slot(user_id, self.get_priority(ai_mode, message)):
+            answer = await self._call_provider(lambda: self.provider.generate(history, message))
+
+        if cache_key is not None:
+            response_cache.set(cache_key, answer)
+        return answer
+
+    async def generate_response_stream(
+        self,
+        message: str,
+        ai_mode: str,
+        conversation_history: List[Dict[str, str]],
+        kid_context: Optional[KidContext] = None,
+        summary: Optional[str] = None,
+        user_id: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """Yield the reply text chunk by chunk as the model produces it.
+
+        Transient failures before the first chunk are retried; after that
+        the stream can't be replayed, so errors surface as AIServiceError.
+        """
+        if not self.provider:
+            raise AIServiceError(NOT_CONFIGURED_MESSAGE)
+
+        cache_key = self._response_cache_key(message, ai_mode, conversation_history, kid_context, summary)
+        if cache_key is not None:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        if cache_key is not None:
+            kid_context = self._shared_context(kid_context)
+        history = self._build_history(ai_mode, conversation_history, kid_context, summary)
+        parts = []
+        async with self.scheduler.slot(user_id, self.get_priority(ai_mode, message)):
+            for attempt in range(self.max_retries + 1):
+                trial = self._check_breaker()
+                started_at = time.monotonic()
+                chunks = self.provider.stream(history, message).__aiter__()
+                try:
+                    first = await asyncio.wait_for(chunks.__anext__(), self._timeout)
+                except StopAsyncIteration:
+                    first = None
+                except asyncio.CancelledError:
+                    self.breaker.release(trial)
+                    await _aclose(chunks)
+                    raise
+                except Exception as e:
+                    # A failed attempt's stream is never read again
+                    await _aclose(chunks)
+                    if not self._is_transient(e):
+                        self.breaker.record_success()
+                        raise AIServiceError(ERROR_MESSAGE) from e
+                    self.breaker.record_failure()
+                    if attempt == self.max_retries:
+                        raise AIServiceError(UNAVAILABLE_MESSAGE) from e
+                    await asyncio.sleep(backoff_delay(attempt, self.retry_base_delay))
+                    continue
+                break
+
+            self.first_token_latency.record(time.monotonic() - started_at)
+            try:
+                if first is not None:
+                    parts.append(first)
+                    yield first
+                    while True:
+                        # Timeout applies per chunk so long answers aren't cut off
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), self._timeout)
+                        except StopAsyncIteration:
+                            break
+                        except Exception as e:
+                            if not self._is_transient(e):
+                                # The provider is up, this answer just went wrong
+                                self.breaker.record_success()
+                                raise AIServiceError(ERROR_MESSAGE) from e
+                            self.breaker.record_failure()
+                            raise AIServiceError(UNAVAILABLE_MESSAGE) from e
+                        parts.append(chunk)
+                        yield chunk
+            except (asyncio.CancelledError, GeneratorExit):
+                # The consumer went away (client disconnect, generator closed)
+                self.breaker.release(trial)
+                raise
+            finally:
+                await _aclose(chunks)
+            self.breaker.record_success()
+
+        if cache_key is not None:
+            response_cache.set(cache_key, "".join(parts))
+
+    async def summarize_conversation(
+        self,
+        previous_summary: Optional[str],
+        conversation: List[Dict[str, str]]
+    ) -> str:
+        """Fold `conversation` into `previous_summary` and return the new summary"""
+        transcript = "\n".join(
+            f"{'부모' if msg['sender'] == 'user' else 'AI'}: {msg['message']}"
+            for msg in conversation
+        )
+        prompt = (
+            "다음은 육아 상담 대화의 기존 요약과 그 이후의 대화입니다.\n"
+            "아이의 상태, 부모의 고민, AI가 준 주요 조언이 빠지지 않도록 "
+            "기존 요약에 새 대화 내용을 반영한 요약을 10문장 이내로 작성해주세요.\n\n"
+            f"[기존 요약]\n{previous_summary or '없음'}\n\n[새 대화]\n{transcript}"
+        )
+        if not self.provider:
+            raise AIServiceError(NOT_CONFIGURED_MESSAGE)
+        async with self.scheduler.slot():
+            return await self._call_provider(lambda: self.provider.generate([], prompt))
 
 
-# Singleton instance
+# Singleton instance; the provider is created by setup() in the app lifespan
 ai_service = AIService()
@@ -0,0 +1,200 @@
+import threading
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models import ChatMessage, ChatSession, Kid, SenderTypeEnum
+
+SNIPPET_LENGTH = 120
+
+# SQLite limits bound parameters per statement; candidate ids are checked in chunks
+_ID_CHUNK = 500
+
+
+class SearchHit(NamedTuple):
+    message_id: int
+    session_id: int
+    kid_id: int
+    sender: SenderTypeEnum
+    ai_mode_id: Optional[int]
+    content: str
+    created_at: datetime
+    score: float
+
+
+def search_terms(query: str) -> List[str]:
+    text = unicodedata.normalize("NFKC", query).lower()
+    words = ("".join(ch for ch in word if ch.isalnum()) for word in text.split())
+    return list(dict.fromkeys(word for word in words if word))
+
+
+def _grams(word: str) -> Set[str]:
+    """Character bigrams of a word; one-character words index as themselves"""
+    if len(word) == 1:
+        return {word}
+    return {word[i:i + 2] for i in range(len(word) - 1)}
+
+
+def make_snippet(content: str, terms: List[str], length: int = SNIPPET_LENGTH) -> str:
+    """A window of `content` around the first matching term"""
+    lowered = content.lower()
+    positions = [lowered.find(term) for term in terms]
+    positions = [p for p in positions if p >= 0]
+    start = max(0, min(positions) - length // 4) if positions else 0
+    snippet = content[start:start + length]
+    if start > 0:
+        snippet = "…" + snippet
+    if start + length < len(content):
+        snippet += "…"
+    return snippet
+
+
+class InvertedIndex:
+    """Bigram → message id postings over every chat message, for databases without pg_trgm.
+
+    The index catches up on messages from the last id it has seen onwards
+    before each search, so it stays current across workers without write
+    hooks. The last id is read again because SQLite hands the highest id
+    out again once its row is deleted (e.g. a discarded question). Deleted
+    messages, and stale postings of a reused id, are filtered out when
+    candidates are checked against the database.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._sizes: Dict[int, int] = {}
+        self._last_id = 0
+        self._lock = threading.Lock()
+
+    def _catch_up(self, db: Session) -> None:
+        # The lock is only held while applying rows, never across a query:
+        # under the async API the query yields to other requests, which may
+        # search too. Concurrent catch-ups can overlap; applying is idempotent.
+        result = db.execute(
+            select(ChatMessage.id, ChatMessage.content).where(
+                ChatMessage.id >= self._last_id
+            ).order_by(ChatMessage.id).execution_options(yield_per=1000)
+        )
+        for batch in result.partitions():
+            entries = []
+            for message_id, content in batch:
+                grams = set()
+                for word in search_terms(content):
+                    grams |= _grams(word)
+                entries.append((message_id, grams))
+            with self._lock:
+                for message_id, grams in entries:
+                    for gram in grams:
+                        self._postings[gram].add(message_id)
+                    self._sizes[message_id] = len(grams)
+                    self._last_id = max(self._last_id, message_id)
+
+    def candidates(self, db: Session, terms: List[str]) -> Dict[int, float]:
+        """Ids of messages containing every query bigram, scored like trigram similarity"""
+        query_grams = set()
+        for term in terms:
+            query_grams |= _grams(term)
+
+        self._catch_up(db)
+        with self._lock:
+            postings = sorted((self._postings.get(gram, set()) for gram in query_grams), key=len)
+            if not postings or not postings[0]:
+                return {}
+            ids = set(postings[0]).intersection(*postings[1:])
+            # Every query gram is present, so this is |Q| / |Q ∪ M| = |Q| / |M|
+            return {message_id: len(query_grams) / self._sizes[message_id] for message_id in ids}
+
+    def stats(self) -> dict:
+        return {
+            "messages": len(self._sizes),
+            "grams": len(self._postings),
+            "last_id": self._last_id,
+        }
+
+
+class ChatSearch:
+    """Ranked search over chat message content, scoped to a user's kids.
+
+    On PostgreSQL matching uses pg_trgm word similarity, served by the
+    ix_chat_messages_content_trgm GIN index; it works for Korean words of
+    two syllables, which plain trigram LIKE can't index. Elsewhere (the
+    SQLite setup) it uses an in-process bigram inverted index.
+    """
+
+    def __init__(self):
+        self.index = InvertedIndex()
+
+    def search(
+        self,
+        db: Session,
+        user_id: int,
+        terms: List[str],
+        kid_id: Optional[int] = None,
+        sender: Optional[SenderTypeEnum] = None,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[SearchHit], int]:
+        """Return one page of hits (best first) and the total number of matches"""
+        if db.bind.dialect.name == "postgresql":
+            return self._search_postgres(db, user_id, terms, kid_id, sender, offset, limit)
+        return self._search_indexed(db, user_id, terms, kid_id, sender, offset, limit)
+
+    def _scoped(self, db: Session, user_id: int, kid_id: Optional[int], sender: Optional[SenderTypeEnum], *columns):
+        query = db.query(
+            ChatMessage.id,
+            ChatMessage.session_id,
+            ChatSession.kid_id,
+            ChatMessage.sender,
+            ChatMessage.ai_mode_id,
+            ChatMessage.content,
+            ChatMessage.created_at,
+            *columns
+        ).join(ChatSession, ChatSession.id == ChatMessage.session_id).join(
+            Kid, Kid.id == ChatSession.kid_id
+        ).filter(Kid.user_id == user_id)
+        if kid_id is not None:
+            query = query.filter(ChatSession.kid_id == kid_id)
+        if sender is not None:
+            query = query.filter(ChatMessage.sender == sender)
+        return query
+
+    def _search_postgres(self, db, user_id, terms, kid_id, sender, offset, limit):
+        score = func.word_similarity(terms[0], ChatMessage.content)
+        for term in terms[1:]:
+            score = score + func.word_similarity(term, ChatMessage.content)
+        query = self._scoped(db, user_id, kid_id, sender, score.label("score"))
+        for term in terms:
+            # `content %> term` is the index-supported form of word_similarity >= threshold
+            query = query.filter(ChatMessage.content.op("%>")(term))
+
+        total = query.count()
+        rows = query.order_by(
+            score.desc(), ChatMessage.created_at.desc(), ChatMessage.id.desc()
+        ).offset(offset).limit(limit).all()
+        return [SearchHit(*row) for row in rows], total
+
+    def _search_indexed(self, db, user_id, terms, kid_id, sender, offset, limit):
+        scores = self.index.candidates(db, terms)
+        ids = list(scores)
+
+        hits = []
+        for start in range(0, len(ids), _ID_CHUNK):
+            rows = self._scoped(db, user_id, kid_id, sender).filter(
+                ChatMessage.id.in_(ids[start:start + _ID_CHUNK])
+            ).all()
+            for row in rows:
+                # Bigrams can match out of order; keep only real substring matches
+                words = search_terms(row.content)
+                if all(any(term in word for word in words) for term in terms):
+                    hits.append(SearchHit(*row, score=scores[row.id]))
+
+        hits.sort(key=lambda hit: (hit.score, hit.created_at, hit.message_id), reverse=True)
+        return hits[offset:offset + limit], len(hits)
+
+    def stats(self) -> dict:
+        return self.index.stats()
+
+
+chat_search = ChatSearch()
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+Abandon = Callable[[dict], Awaitable[None]]
+
+
+class RequestCoalescer:
+    """Collapses duplicate in-flight requests onto a single execution.
+
+    While a request for a key is running, later requests with the same key
+    wait on its future instead of doing the work again. Results can also be
+    remembered for a short window, so a retry that arrives just after the
+    original finished still gets the original result.
+
+    The work gets a `context` dict to record what it has done so far (e.g.
+    ids of rows it stored). If the running execution is cancelled while
+    duplicates are waiting, one of them takes over with that same context
+    and can resume instead of repeating side effects. If nobody is waiting,
+    `abandon(context)` runs in the background to undo the partial work.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 10000):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._waiting: Dict[Hashable, int] = {}
+        # Context (and its abandon callback) of a cancelled execution, until a waiter takes over
+        self._handoffs: Dict[Hashable, Tuple[dict, Optional[Abandon]]] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._completed = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.executed = 0
+        self.coalesced = 0
+        self.taken_over = 0
+
+    @staticmethod
+    def make_key(
+        session_id: int,
+        content: str,
+        ai_mode_id: Optional[int],
+        idempotency_key: Optional[str]
+    ) -> Tuple[Hashable, ...]:
+        digest = hashlib.sha256(f"{ai_mode_id}:{content}".encode()).hexdigest()
+        return (session_id, digest, idempotency_key)
+
+    async def run(
+        self,
+        key: Hashable,
+        work: Callable[[dict], Awaitable[Any]],
+        remember: bool = False,
+        abandon: Optional[Abandon] = None
+    ) -> Any:
+        while True:
+            if remember:
+                result = self._completed.get(key)
+                if result is not None:
+                    self.coalesced += 1
+                    return result
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+
+            self.coalesced += 1
+            self._waiting[key] = self._waiting.get(key, 0) + 1
+            taking_over = False
+            try:
+                # Shielded so a duplicate going away can't cancel the original
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The original was abandoned (client disconnected) and this request
+                # itself is still wanted: take over
+                taking_over = future.cancelled() and not asyncio.current_task().cancelling()
+                if not taking_over:
+                    raise
+            finally:
+                self._waiting[key] -= 1
+                if not self._waiting[key]:
+                    del self._waiting[key]
+                    if not taking_over:
+                        self._abandon_handoff(key)
+
+        handoff = self._handoffs.pop(key, None)
+        context, abandon_previous = handoff or ({}, None)
+        if handoff:
+            self.taken_over += 1
+        abandon = abandon or abandon_previous
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.executed += 1
+        try:
+            result = await work(context)
+        except asyncio.CancelledError:
+            future.cancel()
+            if self._waiting.get(key):
+                # One of the waiting duplicates takes over from here
+                self._handoffs[key] = (context, abandon)
+            elif abandon is not None:
+                self._in_background(abandon(context))
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure isn't logged twice
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if remember:
+                self._completed.set(key, result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def _abandon_handoff(self, key: Hashable) -> None:
+        """The last waiter left without taking over: undo the cancelled execution's work"""
+        if key in self._inflight or key not in self._handoffs:
+            return
+        context, abandon = self._handoffs.pop(key)
+        if abandon is not None:
+            self._in_background(abandon(context))
+
+    def _in_background(self, coro: Awaitable[None]) -> None:
+        # Keep a reference so the task isn't garbage collected mid-way
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "taken_over": self.taken_over,
+            "remembered": len(self._completed),
+        }
+
+
+chat_coalescer = RequestCoalescer(ttl=settings.CHAT_COALESCE_TTL_SECONDS)
@@ -0,0 +1,194 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, Tuple
+from zoneinfo import ZoneInfo
+from sqlalchemy import bindparam, case, delete, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.config import settings
+from app.models import Record, RecordTypeEnum, HealthRecord, RecordDailyStats
+from app.services.record_export import export_statement
+
+# (record_type, created_at, detail): detail is anything with the subtype's
+# field names as attributes, e.g. a subtype row, a batch item or an export row
+RecordEntry = Tuple[Any, datetime, Any]
+
+COUNTERS = tuple(
+    column.name for column in RecordDailyStats.__table__.columns
+    if column.name not in ("kid_id", "day", "max_temperature")
+)
+
+_table = RecordDailyStats.__table__
+
+STATS_TIMEZONE = ZoneInfo(settings.RECORD_STATS_TIMEZONE)
+
+
+def stored_to_local(created_at: datetime) -> datetime:
+    """A stored created_at (naive UTC) as naive wall-clock time in STATS_TIMEZONE"""
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.astimezone(STATS_TIMEZONE).replace(tzinfo=None)
+
+
+def client_to_local(moment: datetime) -> datetime:
+    """A client-sent time as naive wall-clock time in STATS_TIMEZONE; naive ones already are"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(STATS_TIMEZONE).replace(tzinfo=None)
+
+
+def local_day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """The [start, end) of a stats day as naive UTC, for filtering on created_at"""
+    start = datetime.combine(day, time.min, tzinfo=STATS_TIMEZONE)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=STATS_TIMEZONE)
+    return tuple(moment.astimezone(timezone.utc).replace(tzinfo=None) for moment in (start, end))
+
+
+def stats_today() -> date:
+    return datetime.now(STATS_TIMEZONE).date()
+
+
+def _value(enum_or_value) -> str:
+    return getattr(enum_or_value, "value", enum_or_value)
+
+
+def record_contributions(record_type, created_at: datetime, detail) -> Iterator[Tuple[date, str, Any]]:
+    """(day, column, amount) pairs a record adds to the daily stats.
+
+    Days are calendar days in STATS_TIMEZONE for every record type. Sleep
+    minutes are split at local midnight across the days the sleep covers
+    and each sleep is counted once, on the day it started; everything else
+    counts on the local day the record was created.
+    """
+    record_type = RecordTypeEnum(_value(record_type))
+    if record_type == RecordTypeEnum.sleep:
+        start, end = client_to_local(detail.start_datetime), client_to_local(detail.end_datetime)
+        yield start.date(), "sleep_count", 1
+        cursor = start
+        while cursor < end:
+            midnight = datetime.combine(cursor.date() + timedelta(days=1), time.min)
+            segment_end = min(end, midnight)
+            yield cursor.date(), "sleep_minutes", round((segment_end - cursor).total_seconds() / 60)
+            cursor = segment_end
+        return
+
+    day = stored_to_local(created_at).date()
+    if record_type == RecordTypeEnum.meal:
+        yield day, f"feeds_{_value(detail.meal_type)}", 1
+    elif record_type == RecordTypeEnum.health:
+        if detail.temperature is not None:
+            yield day, "max_temperature", Decimal(detail.temperature)
+    elif record_type == RecordTypeEnum.stool:
+        yield day, f"stool_{_value(detail.condition)}", 1
+        yield day, f"stool_{_value(detail.color)}", 1
+
+
+def _dialect_name(db) -> str:
+    # A Session (via AsyncSession.run_sync) or a Connection (import jobs)
+    dialect = getattr(db, "dialect", None) or db.get_bind().dialect
+    return dialect.name
+
+
+class DailyStats:
+    """Maintains record_daily_stats: one row per kid and day.
+
+    The record write paths call apply() inside their own transaction, so
+    the rollup commits or rolls back together with the records. Counters
+    move by deltas; the maximum temperature only rises incrementally and
+    is recomputed from the day's health records when one is deleted.
+    """
+
+    def aggregate(self, entries: Iterable[RecordEntry]) -> Dict[date, Dict[str, Any]]:
+        deltas: Dict[date, Dict[str, Any]] = defaultdict(dict)
+        for entry in entries:
+            for day, column, amount in record_contributions(*entry):
+                row = deltas[day]
+                if column == "max_temperature":
+                    row[column] = max(row.get(column, amount), amount)
+                else:
+                    row[column] = row.get(column, 0) + amount
+        return deltas
+
+    def apply(self, db, kid_id: int, entries: Iterable[RecordEntry], sign: int = 1) -> None:
+        """Add (sign=1) or remove (sign=-1) records' contributions.
+
+        When removing, the records must already be deleted (flushed) so the
+        day's maximum temperature can be recomputed without them.
+        """
+        deltas = self.aggregate(entries)
+        if not deltas:
+            return
+        if sign > 0:
+            self._add(db, kid_id, deltas)
+        else:
+            self._subtract(db, kid_id, deltas)
+
+    def _add(self, db, kid_id: int, deltas: Dict[date, Dict[str, Any]]) -> None:
+        insert = postgresql.insert if _dialect_name(db) == "postgresql" else sqlite.insert
+        statement = insert(_table)
+        excluded = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[_table.c.kid_id, _table.c.day],
+            set_={
+                **{name: _table.c[name] + excluded[name] for name in COUNTERS},
+                "max_temperature": case(
+                    (_table.c.max_temperature.is_(None), excluded.max_temperature),
+                    (excluded.max_temperature > _table.c.max_temperature, excluded.max_temperature),
+                    else_=_table.c.max_temperature
+                ),
+            }
+        )
+        db.execute(statement, [
+            {
+                "kid_id": kid_id,
+                "day": day,
+                **{name: row.get(name, 0) for name in COUNTERS},
+                "max_temperature": row.get("max_temperature"),
+            }
+            for day, row in deltas.items()
+        ])
+
+    def _subtract(self, db, kid_id: int, deltas: Dict[date, Dict[str, Any]]) -> None:
+        values = {}
+        for name in COUNTERS:
+            remaining = _table.c[name] - bindparam(f"d_{name}")
+            # Days counted before a backfill could otherwise go negative
+            values[name] = case((remaining < 0, 0), else_=remaining)
+        db.execute(
+            update(_table).where(
+                _table.c.kid_id == bindparam("b_kid_id"), _table.c.day == bindparam("b_day")
+            ).values(values),
+            [
+                {"b_kid_id": kid_id, "b_day": day, **{f"d_{name}": row.get(name, 0) for name in COUNTERS}}
+                for day, row in deltas.items()
+            ]
+        )
+        for day, row in deltas.items():
+            if "max_temperature" in row:
+                self._recompute_max_temperature(db, kid_id, day)
+
+    def _recompute_max_temperature(self, db, kid_id: int, day: date) -> None:
+        start, end = local_day_bounds(day)
+        highest = select(func.max(HealthRecord.temperature)).join(
+            Record, Record.id == HealthRecord.id
+        ).where(
+            Record.kid_id == kid_id,
+            Record.record_type == RecordTypeEnum.health,
+            Record.created_at >= start,
+            Record.created_at < end
+        ).scalar_subquery()
+        db.execute(update(_table).where(
+            _table.c.kid_id == kid_id, _table.c.day == day
+        ).values(max_temperature=highest))
+
+    def rebuild(self, db, kid_id: int) -> int:
+        """Recompute a kid's rows from its records; returns the number of days"""
+        db.execute(delete(_table).where(_table.c.kid_id == kid_id))
+        rows = db.execute(export_statement(kid_id).execution_options(yield_per=1000))
+        deltas = self.aggregate((row.record_type, row.created_at, row) for row in rows)
+        if deltas:
+            self._add(db, kid_id, deltas)
+        return len(deltas)
+
+
+daily_stats = DailyStats()
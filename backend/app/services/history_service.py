@@ -0,0 +1,134 @@
+import asyncio
+from typing import List, Dict, Tuple, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import ChatSession, ChatMessage
+from app.services.ai_service import ai_service
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate: ~4 ASCII chars per token, ~1 token per Hangul/other char"""
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars) + 1
+
+
+class HistoryManager:
+    """Keeps the prompt history of a chat session inside a token budget.
+
+    Only the most recent messages that haven't been summarized yet are read
+    for the prompt. Every older unsummarized turn, including ones outside
+    that window, is folded into the session's rolling summary by a
+    background task, a page at a time and oldest first, so chat requests
+    never wait on the summarizing LLM call.
+    """
+
+    def __init__(self, token_budget: int, max_messages: int):
+        self.token_budget = token_budget
+        self.max_messages = max_messages
+        # Running summary task per session id
+        self.tasks: Dict[int, asyncio.Task] = {}
+
+    async def load_recent(self, session: ChatSession, db: AsyncSession) -> List[ChatMessage]:
+        query = select(ChatMessage).where(ChatMessage.session_id == session.id)
+        if session.summarized_until_id:
+            query = query.where(ChatMessage.id > session.summarized_until_id)
+        recent = (await db.execute(query.order_by(
+            ChatMessage.created_at.desc(), ChatMessage.id.desc()
+        ).limit(self.max_messages))).scalars().all()
+        return list(reversed(recent))
+
+    def split_by_budget(
+        self, messages: List[ChatMessage]
+    ) -> Tuple[List[ChatMessage], List[ChatMessage]]:
+        """Return (overflow, kept): kept is the newest suffix that fits the budget"""
+        used = 0
+        cut = len(messages)
+        for index in range(len(messages) - 1, -1, -1):
+            used += estimate_tokens(messages[index].content)
+            if used > self.token_budget:
+                break
+            cut = index
+        return messages[:cut], messages[cut:]
+
+    async def build_history(
+        self, session: ChatSession, db: AsyncSession
+    ) -> Tuple[List[Dict[str, str]], Optional[str]]:
+        """Return the in-budget conversation history and the rolling summary"""
+        recent = await self.load_recent(session, db)
+        overflow, kept = self.split_by_budget(recent)
+
+        # A full window may have unsummarized messages older than it, too
+        if overflow or len(recent) >= self.max_messages:
+            self.schedule_summary(session.id, kept[0].id if kept else recent[-1].id + 1)
+
+        history = [{"sender": msg.sender.value, "message": msg.content} for msg in kept]
+        return history, session.summary
+
+    def schedule_summary(self, session_id: int, before_id: int) -> None:
+        """Fold messages older than `before_id` into the summary in the background"""
+        if session_id in self.tasks:
+            # Already catching up; a later turn schedules whatever is left
+            return
+        task = asyncio.create_task(self.summarize_until(session_id, before_id))
+        self.tasks[session_id] = task
+        task.add_done_callback(lambda _: self.tasks.pop(session_id, None))
+
+    async def summarize_until(self, session_id: int, before_id: int) -> None:
+        """Fold every unsummarized message with an id below `before_id` into the
+        summary, oldest first, advancing summarized_until_id page by page"""
+        while True:
+            # Short sessions on either side: no connection is held during the LLM call
+            async with AsyncSessionLocal() as db:
+                session = await db.get(ChatSession, session_id)
+                if session is None:
+                    return
+                previous_summary, marker = session.summary, session.summarized_until_id
+                query = select(ChatMessage).where(
+                    ChatMessage.session_id == session_id, ChatMessage.id < before_id
+                )
+                if marker:
+                    query = query.where(ChatMessage.id > marker)
+                page = (await db.execute(
+                    query.order_by(ChatMessage.id).limit(self.max_messages)
+                )).scalars().all()
+            if not page:
+                return
+
+            try:
+                summary = await ai_service.summarize_conversation(
+                    previous_summary,
+                    [{"sender": msg.sender.value, "message": msg.content} for msg in page]
+                )
+            except Exception:
+                # The marker stays put, so nothing is skipped; a later turn retries
+                return
+
+            async with AsyncSessionLocal() as db:
+                # Only advance from the marker this page was read after
+                if marker is None:
+                    unchanged = ChatSession.summarized_until_id.is_(None)
+                else:
+                    unchanged = ChatSession.summarized_until_id == marker
+                result = await db.execute(
+                    update(ChatSession).where(ChatSession.id == session_id, unchanged).values(
+                        summary=summary, summarized_until_id=page[-1].id
+                    )
+                )
+                await db.commit()
+            if result.rowcount == 0:
+                return
+
+    async def close(self) -> None:
+        """Cancel running summary tasks; their pages are retried on a later turn"""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+history_manager = HistoryManager(
+    token_budget=settings.CHAT_HISTORY_TOKEN_BUDGET,
+    max_messages=settings.CHAT_HISTORY_MAX_MESSAGES
+)
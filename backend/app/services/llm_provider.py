@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional
+from app.core.config import settings
+
+# Conversation turns in Gemini's format: {"role": "user" | "model", "parts": [text]}
+History = List[Dict[str, list]]
+
+
+class LLMProvider(ABC):
+    """Interface the chat pipeline uses to talk to a language model"""
+
+    name: str = "base"
+
+    @abstractmethod
+    async def generate(self, history: History, message: str) -> str:
+        """Return the full reply to `message` given the prior `history`"""
+
+    @abstractmethod
+    def stream(self, history: History, message: str) -> AsyncIterator[str]:
+        """Yield the reply to `message` in chunks as it is produced"""
+
+    def is_transient(self, error: Exception) -> bool:
+        """Whether `error` is worth retrying (overload, timeouts, network)"""
+        return isinstance(error, (asyncio.TimeoutError, ConnectionError))
+
+    def warm_up(self) -> None:
+        """Do slow one-off setup ahead of the first call; run off the event loop"""
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini through google-generativeai.
+
+    The SDK and its gRPC stack take most of a second to import, so they are
+    loaded on first use (or by warm_up after startup) rather than with the app.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+
+                genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+
+    async def _get_model(self):
+        if self._model is None:
+            # Importing blocks; keep it off the event loop
+            await asyncio.to_thread(self.warm_up)
+        return self._model
+
+    async def generate(self, history: History, message: str) -> str:
+        chat = (await self._get_model()).start_chat(history=history)
+        response = await chat.send_message_async(message)
+        return response.text
+
+    async def stream(self, history: History, message: str) -> AsyncIterator[str]:
+        chat = (await self._get_model()).start_chat(history=history)
+        response = await chat.send_message_async(message, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+    def is_transient(self, error: Exception) -> bool:
+        if super().is_transient(error):
+            return True
+        if self._model is None:
+            # The SDK never loaded, so this can't be one of its errors
+            return False
+        from google.api_core import exceptions as google_exceptions
+
+        return isinstance(error, (
+            google_exceptions.TooManyRequests,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.InternalServerError,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded,
+        ))
+
+
+class FakeProviderError(Exception):
+    pass
+
+
+class FakeProvider(LLMProvider):
+    """Offline stand-in for load testing the chat pipeline.
+
+    Replies are derived from a hash of the message, so the same question
+    always gets the same answer. Latency, streaming cadence, reply length
+    and error rate are configurable; with a seed, the sequence of latencies
+    and injected errors is reproducible too.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        latency_distribution: str = "lognormal",
+        latency_sigma: float = 0.5,
+        chunk_interval_ms: float = 50.0,
+        tokens_per_chunk: int = 4,
+        reply_tokens: int = 120,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        if latency_distribution not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.chunk_interval_ms = chunk_interval_ms
+        self.tokens_per_chunk = max(1, tokens_per_chunk)
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def sample_latency(self) -> float:
+        """Time to first token in seconds"""
+        if self.latency_distribution == "fixed":
+            latency = self.latency_ms
+        elif self.latency_distribution == "uniform":
+            spread = self.latency_ms * self.latency_sigma
+            latency = self._random.uniform(self.latency_ms - spread, self.latency_ms + spread)
+        else:
+            # Median at latency_ms with a long right tail, like real LLM calls
+            latency = self.latency_ms * self._random.lognormvariate(0.0, self.latency_sigma)
+        return max(0.0, latency) / 1000
+
+    def reply_chunks(self, message: str) -> List[str]:
+        digest = hashlib.sha256(message.encode()).hexdigest()
+        tokens = [f"{digest[i % len(digest)]}{i}" for i in range(self.reply_tokens)]
+        return [
+            " ".join(tokens[i:i + self.tokens_per_chunk]) + " "
+            for i in range(0, len(tokens), self.tokens_per_chunk)
+        ]
+
+    async def _first_token(self) -> None:
+        await asyncio.sleep(self.sample_latency())
+        if self._random.random() < self.error_rate:
+            raise FakeProviderError("Simulated provider error")
+
+    async def generate(self, history: History, message: str) -> str:
+        await self._first_token()
+        chunks = self.reply_chunks(message)
+        await asyncio.sleep(self.chunk_interval_ms * (len(chunks) - 1) / 1000)
+        return "".join(chunks)
+
+    async def stream(self, history: History, message: str) -> AsyncIterator[str]:
+        await self._first_token()
+        for index, chunk in enumerate(self.reply_chunks(message)):
+            if index:
+                await asyncio.sleep(self.chunk_interval_ms / 1000)
+            yield chunk
+
+    def is_transient(self, error: Exception) -> bool:
+        return super().is_transient(error) or isinstance(error, FakeProviderError)
+
+
+def create_provider() -> Optional[LLMProvider]:
+    """Build the provider selected by LLM_PROVIDER, or None if it isn't configured"""
+    if settings.LLM_PROVIDER == "fake":
+        return FakeProvider(
+            latency_ms=settings.FAKE_LLM_LATENCY_MS,
+            latency_distribution=settings.FAKE_LLM_LATENCY_DISTRIBUTION,
+            latency_sigma=settings.FAKE_LLM_LATENCY_SIGMA,
+            chunk_interval_ms=settings.FAKE_LLM_CHUNK_INTERVAL_MS,
+            tokens_per_chunk=settings.FAKE_LLM_TOKENS_PER_CHUNK,
+            reply_tokens=settings.FAKE_LLM_REPLY_TOKENS,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            seed=settings.FAKE_LLM_SEED
+        )
+    if settings.LLM_PROVIDER == "gemini":
+        if not settings.GEMINI_API_KEY:
+            return None
+        return GeminiProvider(settings.GEMINI_API_KEY, settings.GEMINI_MODEL)
+    raise ValueError(f"Unknown LLM_PROVIDER: {settings.LLM_PROVIDER}")
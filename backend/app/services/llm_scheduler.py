@@ -0,0 +1,161 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Hashable, Optional
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+
+class QueueFullError(Exception):
+    """Raised when a request can't be admitted to the LLM queue"""
+
+    def __init__(self, retry_after: int, reason: str = "queue full"):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class LLMScheduler:
+    """In-process admission control in front of the LLM provider.
+
+    At most `max_concurrency` calls run at once. Others wait in a bounded
+    queue with one lane per priority; within a lane, users are served
+    round-robin so a single user can't starve everyone else. When the queue
+    (or a user's share of it) is full, requests are rejected immediately
+    with a Retry-After estimate instead of piling up.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, max_queued_per_user: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self._active = 0
+        self._queued = 0
+        self._queued_per_user: Dict[Hashable, int] = {}
+        self._lanes: Dict[int, "OrderedDict[Hashable, Deque[asyncio.Future]]"] = {
+            PRIORITY_HIGH: OrderedDict(),
+            PRIORITY_NORMAL: OrderedDict(),
+        }
+        self._wait_times: Deque[float] = deque(maxlen=1000)
+        self._service_time = 1.0  # moving average, seconds
+        self.admitted = 0
+        self.rejected = 0
+
+    def retry_after(self) -> int:
+        """Rough seconds until a new request would get a slot"""
+        backlog = self._queued + 1
+        return max(1, math.ceil(self._service_time * backlog / self.max_concurrency))
+
+    def check_admission(self, user_id: Optional[Hashable], slots: int = 1) -> None:
+        """Raise QueueFullError if `slots` requests from `user_id` would be rejected now"""
+        free = self.max_concurrency - self._active if not self._queued else 0
+        waiting = slots - max(0, free)
+        if waiting <= 0:
+            return
+        if self._queued + waiting > self.max_queue:
+            self.rejected += 1
+            raise QueueFullError(self.retry_after())
+        if self._queued_per_user.get(user_id, 0) + waiting > self.max_queued_per_user:
+            self.rejected += 1
+            raise QueueFullError(self.retry_after(), reason="too many pending requests for user")
+
+    async def _acquire(self, user_id: Optional[Hashable], priority: int) -> None:
+        self.check_admission(user_id)
+        self.admitted += 1
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            self._wait_times.append(0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._lanes[priority].setdefault(user_id, deque()).append(future)
+        self._queued += 1
+        self._queued_per_user[user_id] = self._queued_per_user.get(user_id, 0) + 1
+        enqueued_at = time.monotonic()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted a slot just as we were cancelled: hand it on
+                self._release()
+            else:
+                self._remove(future, user_id, priority)
+            raise
+        self._wait_times.append(time.monotonic() - enqueued_at)
+
+    def _remove(self, future: asyncio.Future, user_id: Optional[Hashable], priority: int) -> None:
+        waiters = self._lanes[priority].get(user_id)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self._lanes[priority][user_id]
+            self._dequeued(user_id)
+
+    def _dequeued(self, user_id: Optional[Hashable]) -> None:
+        self._queued -= 1
+        remaining = self._queued_per_user.get(user_id, 1) - 1
+        if remaining:
+            self._queued_per_user[user_id] = remaining
+        else:
+            self._queued_per_user.pop(user_id, None)
+
+    def _release(self) -> None:
+        self._active -= 1
+        for lane in (PRIORITY_HIGH, PRIORITY_NORMAL):
+            users = self._lanes[lane]
+            while users:
+                user_id, waiters = next(iter(users.items()))
+                future = waiters.popleft()
+                # Round-robin: the user goes to the back of the lane
+                del users[user_id]
+                if waiters:
+                    users[user_id] = waiters
+                self._dequeued(user_id)
+                if not future.done():
+                    self._active += 1
+                    future.set_result(None)
+                    return
+
+    @asynccontextmanager
+    async def slot(
+        self, user_id: Optional[Hashable] = None, priority: int = PRIORITY_NORMAL
+    ) -> AsyncIterator[None]:
+        await self._acquire(user_id, priority)
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started_at
+            self._service_time = 0.9 * self._service_time + 0.1 * elapsed
+            self._release()
+
+    @asynccontextmanager
+    async def spare_slot(self) -> AsyncIterator[None]:
+        """A slot only if one is free right now, for optional extra work like a
+        hedged call; raises QueueFullError instead of queueing"""
+        if self._active >= self.max_concurrency or self._queued:
+            raise QueueFullError(self.retry_after(), reason="no spare capacity")
+        self._active += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        waits = sorted(self._wait_times)
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self._queued,
+            "queue_depth_high_priority": sum(len(w) for w in self._lanes[PRIORITY_HIGH].values()),
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_seconds_avg": round(sum(waits) / len(waits), 4) if waits else 0.0,
+            "wait_seconds_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 4) if waits else 0.0,
+            "service_seconds_avg": round(self._service_time, 4),
+        }
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import AsyncIterator, Iterable, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import (
+    Record, RecordTypeEnum,
+    MealRecord, SleepRecord, HealthRecord, GrowthRecord, StoolRecord
+)
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+BASE_COLUMNS = (Record.id, Record.created_at, Record.record_type, Record.title, Record.memo, Record.image_url)
+
+# Subtype table and the key its fields are nested under in NDJSON (as in the timeline)
+SUBTYPES = {
+    RecordTypeEnum.meal: (MealRecord, "meal_record"),
+    RecordTypeEnum.sleep: (SleepRecord, "sleep_record"),
+    RecordTypeEnum.health: (HealthRecord, "health_record"),
+    RecordTypeEnum.growth: (GrowthRecord, "growth_record"),
+    RecordTypeEnum.stool: (StoolRecord, "stool_record"),
+}
+
+SUBTYPE_FIELDS = {
+    record_type: [column.name for column in model.__table__.columns if column.name != "id"]
+    for record_type, (model, _) in SUBTYPES.items()
+}
+
+# Subtype field names don't collide, so CSV uses them as they are
+CSV_HEADER = [column.key for column in BASE_COLUMNS] + [
+    name for fields in SUBTYPE_FIELDS.values() for name in fields
+]
+
+
+def export_statement(
+    kid_id: int,
+    types: Optional[Set[RecordTypeEnum]] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+):
+    """One flat row per record, oldest first, with every subtype LEFT JOINed in.
+
+    Plain column rows rather than ORM objects: nothing accumulates in the
+    session's identity map while the export streams.
+    """
+    query = select(*BASE_COLUMNS, *(
+        model.__table__.c[name]
+        for record_type, (model, _) in SUBTYPES.items()
+        for name in SUBTYPE_FIELDS[record_type]
+    )).select_from(Record)
+    for model, _ in SUBTYPES.values():
+        query = query.outerjoin(model, model.id == Record.id)
+
+    query = query.where(Record.kid_id == kid_id)
+    if types:
+        query = query.where(Record.record_type.in_(types))
+    if date_from:
+        query = query.where(Record.created_at >= date_from)
+    if date_to:
+        query = query.where(Record.created_at <= date_to)
+    return query.order_by(Record.created_at, Record.id)
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+async def stream_rows(db: AsyncSession, statement) -> AsyncIterator[list]:
+    """Batches of result rows read through a server-side cursor"""
+    result = await db.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    async for rows in result.partitions():
+        yield rows
+
+
+def ndjson_chunk(rows: Iterable) -> str:
+    lines = []
+    for row in rows:
+        mapping = row._mapping
+        item = {column.key: _plain(mapping[column.key]) for column in BASE_COLUMNS}
+        subtype = SUBTYPES.get(mapping["record_type"])
+        if subtype:
+            item[subtype[1]] = {
+                name: _plain(mapping[name]) for name in SUBTYPE_FIELDS[mapping["record_type"]]
+            }
+        lines.append(json.dumps(item, ensure_ascii=False))
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def csv_chunk(rows: Iterable, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_HEADER)
+    for row in rows:
+        mapping = row._mapping
+        writer.writerow(["" if mapping[name] is None else _plain(mapping[name]) for name in CSV_HEADER])
+    return buffer.getvalue()
@@ -0,0 +1,223 @@
+import csv
+import io
+import os
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, select, text, update, func
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Record, RecordImportJob, RecordTypeEnum, ImportStatusEnum
+from app.schemas.record import BATCH_ITEM_BASE_FIELDS, record_batch_item_adapter
+from app.services.ai_service import kid_context_cache
+from app.services.daily_stats import daily_stats
+from app.services.record_export import SUBTYPES, SUBTYPE_FIELDS
+from app.services.record_index import record_index
+
+# Base columns written for each imported record, in COPY column order
+RECORD_COLUMNS = ("id", "kid_id", "record_type", "title", "memo", "image_url", "created_at")
+
+# Columns an import CSV may have; the export CSV's header is a superset (its `id` is ignored)
+IMPORT_FIELDS = {"record_type", "created_at", "title", "memo", "image_url"} | {
+    name for fields in SUBTYPE_FIELDS.values() for name in fields
+}
+
+
+class ImportFileError(Exception):
+    """The file as a whole can't be imported"""
+
+
+def parse_row(row: Dict[str, Optional[str]]) -> Tuple[Optional[tuple], Optional[list]]:
+    """Validate one CSV row as (created_at, batch item), or return its errors"""
+    values = {
+        key.strip(): value.strip()
+        for key, value in row.items()
+        if key and key.strip() in IMPORT_FIELDS and value and value.strip()
+    }
+    errors = []
+    created_at = None
+    try:
+        created_at = datetime.fromisoformat(values.pop("created_at"))
+    except KeyError:
+        errors.append({"loc": ["created_at"], "msg": "Field required", "type": "missing"})
+    except ValueError:
+        errors.append({"loc": ["created_at"], "msg": "Invalid datetime", "type": "datetime_parsing"})
+    try:
+        item = record_batch_item_adapter.validate_python(values)
+    except ValidationError as e:
+        errors.extend(e.errors(include_url=False, include_context=False, include_input=False))
+    if errors:
+        return None, errors
+    return (created_at, item), None
+
+
+def _copy_value(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)
+
+
+def _copy(conn: Connection, table: str, columns, rows) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # csv writes None as an unquoted empty field, which COPY reads as NULL
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+class RecordImporter:
+    """Loads a record CSV for one kid in chunks.
+
+    Each chunk is inserted in one transaction together with the job's
+    progress counters, so after a crash or error the job resumes at the
+    first row that wasn't committed: nothing is imported twice or skipped.
+    On PostgreSQL (psycopg2) rows go in with COPY; elsewhere with
+    executemany INSERTs.
+    """
+
+    def __init__(self, chunk_rows: int, max_errors: int):
+        self.chunk_rows = chunk_rows
+        self.max_errors = max_errors
+
+    def run(self, job_id: int) -> None:
+        """Run or resume a job already marked running; meant for a worker thread"""
+        try:
+            self._run(job_id)
+        except Exception as e:
+            with engine.begin() as conn:
+                kid_id = conn.execute(update(RecordImportJob).where(RecordImportJob.id == job_id).values(
+                    status=ImportStatusEnum.failed, error=str(e)[:1000], updated_at=func.now()
+                ).returning(RecordImportJob.kid_id)).scalar()
+            # Chunks committed before the failure stay imported
+            self._invalidate(kid_id)
+
+    def _run(self, job_id: int) -> None:
+        with engine.connect() as conn:
+            job = conn.execute(select(
+                RecordImportJob.kid_id,
+                RecordImportJob.file_path,
+                RecordImportJob.total_rows,
+                RecordImportJob.processed_rows,
+                RecordImportJob.errors,
+            ).where(RecordImportJob.id == job_id)).one()
+        kid_id = job.kid_id
+        processed = job.processed_rows
+        stored_errors = list(job.errors or [])
+
+        if job.total_rows is None:
+            with open(job.file_path, newline="", encoding="utf-8-sig") as f:
+                # Counted like the import reads them: DictReader skips blank lines
+                total_rows = sum(1 for _ in csv.DictReader(f))
+            with engine.begin() as conn:
+                conn.execute(update(RecordImportJob).where(RecordImportJob.id == job_id).values(
+                    total_rows=total_rows, updated_at=func.now()
+                ))
+
+        with open(job.file_path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            header = {name.strip() for name in reader.fieldnames or ()}
+            missing = {"record_type", "created_at"} - header
+            if missing:
+                raise ImportFileError(f"Missing columns: {', '.join(sorted(missing))}")
+
+            rows = islice(reader, processed, None)
+            while True:
+                chunk = list(islice(rows, self.chunk_rows))
+                if not chunk:
+                    break
+                items = []
+                chunk_errors = 0
+                for offset, row in enumerate(chunk, start=processed + 1):
+                    parsed, errors = parse_row(row)
+                    if errors:
+                        chunk_errors += 1
+                        if len(stored_errors) < self.max_errors:
+                            stored_errors.append({"row": offset, "errors": errors})
+                    else:
+                        items.append(parsed)
+
+                processed += len(chunk)
+                with engine.begin() as conn:
+                    if items:
+                        self._load(conn, kid_id, items)
+                    conn.execute(update(RecordImportJob).where(RecordImportJob.id == job_id).values(
+                        processed_rows=processed,
+                        imported_rows=RecordImportJob.imported_rows + len(items),
+                        error_rows=RecordImportJob.error_rows + chunk_errors,
+                        errors=list(stored_errors),
+                        updated_at=func.now()
+                    ))
+                if items:
+                    # Committed rows are visible now; chat shouldn't answer from
+                    # context built before them while the rest is loading
+                    self._invalidate(kid_id)
+
+        with engine.begin() as conn:
+            conn.execute(update(RecordImportJob).where(RecordImportJob.id == job_id).values(
+                status=ImportStatusEnum.completed, error=None, updated_at=func.now()
+            ))
+        # Only an unfinished job needs its file, to resume
+        os.remove(job.file_path)
+
+    def _invalidate(self, kid_id: Optional[int]) -> None:
+        if kid_id is not None:
+            kid_context_cache.invalidate(kid_id)
+            record_index.invalidate(kid_id)
+
+    def _load(self, conn: Connection, kid_id: int, items: List[tuple]) -> None:
+        records = [
+            {
+                "kid_id": kid_id,
+                "record_type": RecordTypeEnum(item.record_type),
+                "title": item.title,
+                "memo": item.memo,
+                "image_url": item.image_url,
+                "created_at": created_at,
+            }
+            for created_at, item in items
+        ]
+        copy = conn.dialect.driver == "psycopg2"
+
+        if copy:
+            # Reserve the ids up front so subtype rows can reference them
+            ids = conn.execute(text(
+                "SELECT nextval(pg_get_serial_sequence('records', 'id')) FROM generate_series(1, :n)"
+            ), {"n": len(records)}).scalars().all()
+            for record, record_id in zip(records, ids):
+                record["id"] = record_id
+            _copy(conn, Record.__tablename__, RECORD_COLUMNS, records)
+        else:
+            ids = conn.execute(
+                insert(Record.__table__).returning(Record.id, sort_by_parameter_order=True), records
+            ).scalars().all()
+
+        subtype_rows: Dict[RecordTypeEnum, list] = {}
+        for (_, item), record_id in zip(items, ids):
+            subtype_rows.setdefault(RecordTypeEnum(item.record_type), []).append(
+                {"id": record_id, **item.model_dump(exclude=BATCH_ITEM_BASE_FIELDS)}
+            )
+        for record_type, rows in subtype_rows.items():
+            model = SUBTYPES[record_type][0]
+            if copy:
+                _copy(conn, model.__tablename__, ["id"] + SUBTYPE_FIELDS[record_type], rows)
+            else:
+                conn.execute(insert(model.__table__), rows)
+        daily_stats.apply(conn, kid_id, [(item.record_type, created_at, item) for created_at, item in items])
+
+
+record_importer = RecordImporter(
+    chunk_rows=settings.RECORD_IMPORT_CHUNK_ROWS,
+    max_errors=settings.RECORD_IMPORT_MAX_ERRORS
+)
@@ -0,0 +1,366 @@
+import asyncio
+import math
+import re
+import threading
+import unicodedata
+import zlib
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.models import (
+    Record, RecordTypeEnum, MealRecord, SleepRecord, HealthRecord, GrowthRecord, StoolRecord,
+)
+
+if TYPE_CHECKING:
+    # numpy is imported on first use: it costs ~80ms of startup and only
+    # kids with records ever need it
+    import numpy as np
+
+# Korean labels for enum values, so "설사" finds a record stored as `diarrhea`
+VALUE_LABELS = {
+    "growth": "성장", "sleep": "수면 잠", "meal": "식사 수유", "health": "건강", "stool": "배변 대변 변",
+    "misc": "기타",
+    "breast_milk": "모유 수유", "formula": "분유", "baby_food": "이유식",
+    "cough": "기침", "fever": "열 발열", "runny_nose": "콧물", "vomit": "구토 토",
+    "diarrhea": "설사", "other": "기타",
+    "low": "적음", "medium": "보통", "high": "많음",
+    "normal": "정상 보통", "constipation": "변비",
+    "yellow": "노란색", "brown": "갈색", "green": "초록색",
+    "good": "좋음", "bad": "나쁨",
+}
+
+
+# The one subtype relationship each record type has
+SUBTYPE_ATTRS = {
+    RecordTypeEnum.meal: "meal_record",
+    RecordTypeEnum.sleep: "sleep_record",
+    RecordTypeEnum.health: "health_record",
+    RecordTypeEnum.growth: "growth_record",
+    RecordTypeEnum.stool: "stool_record",
+}
+
+Row = Tuple[int, str, str]
+
+
+def _label(value) -> str:
+    value = getattr(value, "value", value)
+    return VALUE_LABELS.get(value, str(value))
+
+
+def _detail(record: Record):
+    """The record's subtype row, touching only the relationship its type uses
+    (probing the others would lazy load each of them)"""
+    attr = SUBTYPE_ATTRS.get(record.record_type)
+    return getattr(record, attr) if attr else None
+
+
+def record_text(record: Record, detail=None) -> str:
+    """One line describing a record: date, type, title, memo and subtype fields.
+
+    `detail` is the subtype row; it is read from the record if not given.
+    """
+    if detail is None:
+        detail = _detail(record)
+    parts = []
+    if record.created_at:
+        parts.append(record.created_at.strftime("%Y-%m-%d"))
+    parts.append(_label(record.record_type).split()[0])
+    if record.title:
+        parts.append(record.title)
+
+    if isinstance(detail, MealRecord):
+        meal = detail
+        parts.append(_label(meal.meal_type).split()[0])
+        if meal.meal_detail:
+            parts.append(meal.meal_detail)
+        if meal.burp is not None:
+            parts.append("트림 함" if meal.burp else "트림 안 함")
+    elif isinstance(detail, SleepRecord):
+        sleep = detail
+        hours = (sleep.end_datetime - sleep.start_datetime).total_seconds() / 3600
+        parts.append(f"{hours:.1f}시간 수면, 수면 질 {_label(sleep.sleep_quality).split()[0]}")
+    elif isinstance(detail, HealthRecord):
+        health = detail
+        if health.temperature is not None:
+            parts.append(f"체온 {health.temperature}도")
+        parts.append(f"증상 {_label(health.symptom).split()[0]}")
+        if health.symptom_other:
+            parts.append(health.symptom_other)
+    elif isinstance(detail, GrowthRecord):
+        growth = detail
+        if growth.height_cm:
+            parts.append(f"키 {growth.height_cm}cm")
+        if growth.weight_kg:
+            parts.append(f"체중 {growth.weight_kg}kg")
+    elif isinstance(detail, StoolRecord):
+        stool = detail
+        parts.append(
+            f"양 {_label(stool.amount).split()[0]}, 상태 {_label(stool.condition).split()[0]}, "
+            f"색 {_label(stool.color).split()[0]}"
+        )
+
+    if record.memo:
+        parts.append(record.memo)
+    return " / ".join(parts)
+
+
+def _row(record: Record, detail=None) -> Row:
+    """(id, text to embed, display line) for a record; plain data, so it can be
+    embedded away from the session it was loaded in"""
+    if detail is None:
+        detail = _detail(record)
+    text = record_text(record, detail)
+    # Embedded text is the display line plus every label synonym
+    labels = [
+        _label(value)
+        for value in (
+            record.record_type,
+            getattr(detail, "meal_type", None),
+            getattr(detail, "symptom", None),
+            getattr(detail, "condition", None),
+        )
+        if value
+    ]
+    return record.id, " ".join([text] + labels), text
+
+
+# Hangul or Latin runs; digits (dates, readings) only add noise to matching
+_WORD = re.compile(r"[가-힣]+|[a-z]+")
+
+# Trailing particles and endings stripped so "설사를", "설사가" and "설사" match
+_SUFFIXES = sorted(
+    "을 를 이 가 은 는 에 에서 으로 로 도 만 요 의 과 와 "
+    "해요 하는데 했어요 해서 나요 어요 아요 까요".split(),
+    key=len,
+    reverse=True
+)
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) > len(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+@lru_cache(maxsize=65536)
+def _bucket(gram: str, dim: int) -> Tuple[int, float]:
+    h = zlib.crc32(gram.encode())
+    # Signed hashing keeps collisions from only ever adding up
+    return h % dim, (1.0 if h & 0x80000000 else -1.0)
+
+
+def embed(text: str, dim: int) -> "np.ndarray":
+    """Hashed character 2/3-gram embedding, L2-normalized.
+
+    Character n-grams cope with Korean spacing and inflection ("열", "열나요")
+    without a tokenizer or a model download.
+    """
+    import numpy as np
+
+    counts: Counter = Counter()
+    for word in _WORD.findall(unicodedata.normalize("NFKC", text).lower()):
+        padded = f" {_stem(word)} "
+        for n in (2, 3):
+            for i in range(len(padded) - n + 1):
+                counts[padded[i:i + n]] += 1
+
+    buckets = []
+    weights = []
+    for gram, count in counts.items():
+        bucket, sign = _bucket(gram, dim)
+        buckets.append(bucket)
+        weights.append(sign * (1.0 + math.log(count)))
+    vector = np.bincount(buckets, weights, minlength=dim).astype(np.float32)
+
+    norm = float(np.linalg.norm(vector))
+    if norm:
+        vector /= norm
+    return vector
+
+
+class KidRecordIndex:
+    """Embeddings of one kid's records in a growable matrix"""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        import numpy as np
+
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._ids: List[int] = []
+        self._texts: List[str] = []
+        self._rows: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, record_id: int, vector: "np.ndarray", text: str) -> None:
+        import numpy as np
+
+        with self._lock:
+            row = self._rows.get(record_id)
+            if row is None:
+                row = len(self._ids)
+                if row == len(self._vectors):
+                    grown = np.zeros((row * 2, self.dim), dtype=np.float32)
+                    grown[:row] = self._vectors
+                    self._vectors = grown
+                self._ids.append(record_id)
+                self._texts.append(text)
+                self._rows[record_id] = row
+            else:
+                self._texts[row] = text
+            self._vectors[row] = vector
+
+    def remove(self, record_id: int) -> None:
+        with self._lock:
+            row = self._rows.pop(record_id, None)
+            if row is None:
+                return
+            # Move the last row into the gap so the matrix stays dense
+            last = len(self._ids) - 1
+            if row != last:
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = self._ids[last]
+                self._texts[row] = self._texts[last]
+                self._rows[self._ids[row]] = row
+            self._ids.pop()
+            self._texts.pop()
+
+    def search(self, query: "np.ndarray", k: int, min_score: float) -> List[Tuple[int, float, str]]:
+        import numpy as np
+
+        with self._lock:
+            size = len(self._ids)
+            if not size:
+                return []
+            scores = self._vectors[:size] @ query
+            k = min(k, size)
+            top = np.argpartition(scores, size - k)[size - k:]
+            top = top[np.argsort(scores[top])[::-1]]
+            return [
+                (self._ids[i], float(scores[i]), self._texts[i])
+                for i in top
+                if scores[i] >= min_score
+            ]
+
+
+class RecordIndex:
+    """Per-kid retrieval over every record, kept for the most recently used kids.
+
+    A kid's index is built from the database on first use and then kept in
+    step by the record write endpoints, so queries never touch the database.
+    """
+
+    def __init__(self, dim: int, max_kids: int):
+        self.dim = dim
+        self.max_kids = max_kids
+        self._indexes: "OrderedDict[int, KidRecordIndex]" = OrderedDict()
+        # Bumped on every write so a build that raced a write isn't kept
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.searches = 0
+
+    def _get(self, kid_id: int) -> Optional[KidRecordIndex]:
+        with self._lock:
+            index = self._indexes.get(kid_id)
+            if index is not None:
+                self._indexes.move_to_end(kid_id)
+            return index
+
+    def _load(self, kid_id: int, db: Session) -> Tuple[int, List[Row]]:
+        """The kid's records as rows to embed, with the version they were read at"""
+        with self._lock:
+            version = self._versions.get(kid_id, 0)
+
+        records = db.query(Record).filter(Record.kid_id == kid_id).options(
+            selectinload(Record.meal_record),
+            selectinload(Record.sleep_record),
+            selectinload(Record.health_record),
+            selectinload(Record.growth_record),
+            selectinload(Record.stool_record),
+        ).all()
+        return version, [_row(record) for record in records]
+
+    def _embed(self, kid_id: int, version: int, rows: List[Row]) -> KidRecordIndex:
+        """Embed the rows into a new index and keep it unless a write raced the load"""
+        index = KidRecordIndex(self.dim, capacity=max(64, len(rows)))
+        for record_id, terms, text in rows:
+            index.add(record_id, embed(terms, self.dim), text)
+
+        with self._lock:
+            self.builds += 1
+            if self._versions.get(kid_id, 0) == version:
+                self._indexes[kid_id] = index
+                self._indexes.move_to_end(kid_id)
+                while len(self._indexes) > self.max_kids:
+                    self._indexes.popitem(last=False)
+        return index
+
+    def _build(self, kid_id: int, db: Session) -> KidRecordIndex:
+        return self._embed(kid_id, *self._load(kid_id, db))
+
+    async def load(self, kid_id: int, db: AsyncSession) -> None:
+        """Build the kid's index if it isn't loaded yet.
+
+        Only the query runs on the session; embedding a long history is CPU
+        work, so it runs in a worker thread instead of on the event loop.
+        """
+        if self._get(kid_id) is not None:
+            return
+        version, rows = await db.run_sync(lambda sync_db: self._load(kid_id, sync_db))
+        await asyncio.to_thread(self._embed, kid_id, version, rows)
+
+    def search(self, kid_id: int, question: str, db: Session, k: int, min_score: float) -> List[Tuple[int, float, str]]:
+        """Records most similar to the question as (record_id, score, text)"""
+        index = self._get(kid_id) or self._build(kid_id, db)
+        self.searches += 1
+        return index.search(embed(question, self.dim), k, min_score)
+
+    def add(self, record: Record, detail=None) -> None:
+        """Index a newly written record if its kid's index is loaded.
+
+        Pass the subtype row the record was written with, so none of the
+        record's relationships need loading.
+        """
+        self._bump(record.kid_id)
+        index = self._get(record.kid_id)
+        if index is not None:
+            record_id, terms, text = _row(record, detail)
+            index.add(record_id, embed(terms, self.dim), text)
+
+    def remove(self, kid_id: int, record_id: int) -> None:
+        self._bump(kid_id)
+        index = self._get(kid_id)
+        if index is not None:
+            index.remove(record_id)
+
+    def invalidate(self, kid_id: int) -> None:
+        with self._lock:
+            self._versions[kid_id] = self._versions.get(kid_id, 0) + 1
+            self._indexes.pop(kid_id, None)
+
+    def _bump(self, kid_id: int) -> None:
+        with self._lock:
+            self._versions[kid_id] = self._versions.get(kid_id, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "kids": len(self._indexes),
+            "max_kids": self.max_kids,
+            "records": sum(len(index) for index in list(self._indexes.values())),
+            "dim": self.dim,
+            "builds": self.builds,
+            "searches": self.searches,
+        }
+
+
+record_index = RecordIndex(
+    dim=settings.RECORD_INDEX_DIM,
+    max_kids=settings.RECORD_INDEX_MAX_KIDS
+)
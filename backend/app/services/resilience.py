@@ -0,0 +1,147 @@
+import asyncio
+import math
+import random
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("circuit open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fails fast after repeated provider failures instead of waiting out timeouts.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are rejected for `reset_timeout` seconds. Then a single trial call
+    is let through (half-open): success closes the circuit, failure opens it
+    again. A call that ends with neither (e.g. it was cancelled) must call
+    release() so the trial slot isn't held forever.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError if the call must not go to the provider.
+
+        Returns whether this call is the half-open trial; pass it to release().
+        """
+        if self.state == STATE_OPEN:
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(max(1, math.ceil(remaining)))
+            self.state = STATE_HALF_OPEN
+            self._trial_in_flight = False
+
+        if self.state == STATE_HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(1)
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release(self, trial: bool) -> None:
+        """The call ended without an outcome: free its trial slot, counting nothing"""
+        if trial and self.state == STATE_HALF_OPEN:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != STATE_OPEN:
+                self.times_opened += 1
+            self.state = STATE_OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """Rolling window of call latencies, used to pick the hedging delay"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 10.0) -> float:
+    """Full-jitter exponential backoff for retry number `attempt` (0-based)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def hedged(
+    make_call: Callable[[], Awaitable[T]],
+    delay: Optional[float],
+    make_hedge: Optional[Callable[[], Awaitable[T]]] = None
+) -> T:
+    """Run `make_call`; if it hasn't finished after `delay` seconds, race a second copy.
+
+    The second copy comes from `make_hedge` if given (e.g. to run it under
+    its own concurrency slot), else from `make_call`. The first successful
+    result wins and the other call is cancelled; if both fail, the error of
+    the one that failed last is raised. With `delay` None this is just
+    `await make_call()`.
+    """
+    if delay is None:
+        return await make_call()
+
+    tasks = [asyncio.ensure_future(make_call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            tasks.append(asyncio.ensure_future((make_hedge or make_call)()))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
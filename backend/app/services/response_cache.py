@@ -0,0 +1,81 @@
+import hashlib
+import re
+import unicodedata
+from datetime import date
+from typing import Hashable, Optional, Sequence, Tuple
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+# Upper bounds (in months) of the age bands answers are shared across
+AGE_BANDS_MONTHS = (3, 6, 12, 24, 36, 60)
+
+_PUNCTUATION = re.compile(r"[^\w\s.]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Fold case, width, punctuation and spacing so near-identical questions match"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _PUNCTUATION.sub(" ", text)
+    text = _WHITESPACE.sub(" ", text)
+    return text.strip(" .")
+
+
+def age_band(birth_date: date, today: Optional[date] = None) -> str:
+    today = today or date.today()
+    months = (today.year - birth_date.year) * 12 + today.month - birth_date.month
+    if today.day < birth_date.day:
+        months -= 1
+    lower = 0
+    for upper in AGE_BANDS_MONTHS:
+        if months < upper:
+            return f"{lower}-{upper}m"
+        lower = upper
+    return f"{lower}m+"
+
+
+class ResponseCache:
+    """Answers to single-turn questions, shared across kids with a similar profile.
+
+    Keys combine the normalized question, the AI mode and a coarse profile
+    bucket (age band + recent symptoms), so a cached answer never crosses
+    personas or very different kids. Cacheable answers are generated from
+    those key fields alone (see AIService._shared_context), so nothing about
+    one kid can reach another family.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, enabled: bool = True):
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def make_key(
+        self,
+        question: str,
+        ai_mode: str,
+        birth_date: date,
+        recent_symptoms: Sequence[str]
+    ) -> Tuple[Hashable, ...]:
+        digest = hashlib.sha256(normalize_question(question).encode()).hexdigest()
+        return (digest, ai_mode, age_band(birth_date), tuple(sorted(set(recent_symptoms))))
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[str]:
+        if not self.enabled:
+            return None
+        return self._cache.get(key)
+
+    def set(self, key: Tuple[Hashable, ...], answer: str) -> None:
+        if self.enabled:
+            self._cache.set(key, answer)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self._cache.stats()}
+
+
+response_cache = ResponseCache(
+    maxsize=settings.RESPONSE_CACHE_SIZE,
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.RESPONSE_CACHE_ENABLED
+)
@@ -0,0 +1,34 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from sqlalchemy import literal, tuple_
+from sqlalchemy.types import NullType
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque keyset cursor for a `(created_at, id)` position"""
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_before(created_at_column, id_column, cursor: str):
+    """WHERE clause selecting rows strictly before `cursor` in (created_at, id) order.
+
+    The timestamp is bound untyped so SQLite compares it in the same text
+    form CURRENT_TIMESTAMP writes; other drivers infer the type as usual.
+    """
+    created_at, id = decode_cursor(cursor)
+    return tuple_(created_at_column, id_column) < tuple_(
+        literal(created_at, NullType()), literal(id)
+    )
@@ -0,0 +1,194 @@
+"""Baseline schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+The tables as Base.metadata.create_all used to create them. Databases that
+were created that way can simply be upgraded: tables that already exist are
+left alone, so this revision only records them (like `alembic stamp 0001`)
+and creates any that an older create_all didn't.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+record_type = sa.Enum("growth", "sleep", "meal", "health", "stool", "misc", name="recordtypeenum")
+meal_type = sa.Enum("breast_milk", "formula", "baby_food", name="mealtypeenum")
+symptom = sa.Enum("cough", "fever", "runny_nose", "vomit", "diarrhea", "other", name="symptomenum")
+stool_amount = sa.Enum("low", "medium", "high", name="stoolamountenum")
+stool_condition = sa.Enum("normal", "diarrhea", "constipation", name="stoolconditionenum")
+stool_color = sa.Enum("yellow", "brown", "green", "other", name="stoolcolorenum")
+sleep_quality = sa.Enum("good", "normal", "bad", name="sleepqualityenum")
+sender_type = sa.Enum("user", "ai", name="sendertypeenum")
+community_category = sa.Enum("recipes", "tips", "talk", name="communitycategoryenum")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nothing to inspect when only emitting SQL (`alembic upgrade head --sql`)
+    existing = set() if op.get_context().as_sql else set(sa.inspect(op.get_bind()).get_table_names())
+
+    def create_table(name: str, *columns) -> None:
+        if name not in existing:
+            op.create_table(name, *columns)
+
+    create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50), nullable=False, unique=True),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("nickname", sa.String(50)),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+    create_table(
+        "kids",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(50), nullable=False),
+        sa.Column("birth_date", sa.Date(), nullable=False),
+        sa.Column("gender", sa.String(20)),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+    create_table(
+        "ai_modes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(20), nullable=False, unique=True),
+        sa.Column("description", sa.Text()),
+    )
+
+    create_table(
+        "records",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kid_id", sa.Integer(), sa.ForeignKey("kids.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("record_type", record_type, nullable=False),
+        sa.Column("title", sa.String(200)),
+        sa.Column("memo", sa.Text()),
+        sa.Column("image_url", sa.Text()),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+    create_table(
+        "meal_records",
+        sa.Column("id", sa.Integer(), sa.ForeignKey("records.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("meal_type", meal_type, nullable=False),
+        sa.Column("meal_detail", sa.Text()),
+        sa.Column("burp", sa.Boolean()),
+    )
+    create_table(
+        "sleep_records",
+        sa.Column("id", sa.Integer(), sa.ForeignKey("records.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("start_datetime", sa.TIMESTAMP(), nullable=False),
+        sa.Column("end_datetime", sa.TIMESTAMP(), nullable=False),
+        sa.Column("sleep_quality", sleep_quality, nullable=False),
+    )
+    create_table(
+        "health_records",
+        sa.Column("id", sa.Integer(), sa.ForeignKey("records.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("temperature", sa.Numeric(4, 1)),
+        sa.Column("symptom", symptom, nullable=False),
+        sa.Column("symptom_other", sa.Text()),
+    )
+    create_table(
+        "growth_records",
+        sa.Column("id", sa.Integer(), sa.ForeignKey("records.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("height_cm", sa.Numeric(5, 2)),
+        sa.Column("weight_kg", sa.Numeric(5, 2)),
+    )
+    create_table(
+        "stool_records",
+        sa.Column("id", sa.Integer(), sa.ForeignKey("records.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("amount", stool_amount, nullable=False),
+        sa.Column("condition", stool_condition, nullable=False),
+        sa.Column("color", stool_color, nullable=False),
+    )
+
+    create_table(
+        "chat_sessions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kid_id", sa.Integer(), sa.ForeignKey("kids.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+    create_table(
+        "chat_messages",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "session_id", sa.Integer(), sa.ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("sender", sender_type, nullable=False),
+        sa.Column("ai_mode_id", sa.Integer(), sa.ForeignKey("ai_modes.id")),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+
+    create_table(
+        "community_posts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("kid_id", sa.Integer(), sa.ForeignKey("kids.id", ondelete="SET NULL")),
+        sa.Column("category", community_category, nullable=False),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("image_url", sa.Text()),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("likes_count", sa.Integer()),
+    )
+    create_table(
+        "community_comments",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "post_id", sa.Integer(), sa.ForeignKey("community_posts.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+    create_table(
+        "community_likes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "post_id", sa.Integer(), sa.ForeignKey("community_posts.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.UniqueConstraint("post_id", "user_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in (
+        "community_likes",
+        "community_comments",
+        "community_posts",
+        "chat_messages",
+        "chat_sessions",
+        "stool_records",
+        "growth_records",
+        "health_records",
+        "sleep_records",
+        "meal_records",
+        "records",
+        "ai_modes",
+        "kids",
+        "users",
+    ):
+        op.drop_table(table)
+
+    bind = op.get_bind()
+    for enum in (
+        community_category, sender_type, sleep_quality, stool_color, stool_condition,
+        stool_amount, symptom, meal_type, record_type,
+    ):
+        enum.drop(bind, checkfirst=True)
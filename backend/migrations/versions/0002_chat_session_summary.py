@@ -0,0 +1,37 @@
+"""Rolling summary columns on chat_sessions
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all built chat_sessions with these once they were on the model
+    existing = set() if op.get_context().as_sql else {
+        column["name"] for column in sa.inspect(op.get_bind()).get_columns("chat_sessions")
+    }
+    if "summary" not in existing:
+        op.add_column("chat_sessions", sa.Column("summary", sa.Text()))
+    if "summarized_until_id" not in existing:
+        op.add_column("chat_sessions", sa.Column("summarized_until_id", sa.Integer()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("chat_sessions") as batch:
+        batch.drop_column("summarized_until_id")
+        batch.drop_column("summary")
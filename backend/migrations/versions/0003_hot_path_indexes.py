@@ -0,0 +1,62 @@
+"""Indexes for the per-kid, per-session and per-post listing queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+Every list endpoint filters on a parent id and orders by created_at; without
+these they scan and sort the whole child table. On PostgreSQL the indexes are
+built CONCURRENTLY so writes keep flowing while they build.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    ("ix_records_kid_id_created_at", "records", ["kid_id", "created_at"]),
+    ("ix_records_kid_id_record_type_created_at", "records", ["kid_id", "record_type", "created_at"]),
+    ("ix_chat_messages_session_id_created_at", "chat_messages", ["session_id", "created_at"]),
+    ("ix_community_posts_category_created_at", "community_posts", ["category", "created_at"]),
+    ("ix_community_comments_post_id_created_at", "community_comments", ["post_id", "created_at"]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    postgresql = op.get_bind().dialect.name == "postgresql"
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        # Databases created by create_all may already have some of these
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+        if postgresql:
+            # Backs chat search (see app/services/chat_search.py)
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            op.create_index(
+                "ix_chat_messages_content_trgm",
+                "chat_messages",
+                ["content"],
+                if_not_exists=True,
+                postgresql_using="gin",
+                postgresql_ops={"content": "gin_trgm_ops"},
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        if op.get_bind().dialect.name == "postgresql":
+            op.drop_index(
+                "ix_chat_messages_content_trgm", "chat_messages", if_exists=True, postgresql_concurrently=True
+            )
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table, if_exists=True, postgresql_concurrently=True)
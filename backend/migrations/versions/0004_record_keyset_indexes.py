@@ -0,0 +1,46 @@
+"""Add id to the records listing indexes for keyset pagination
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00
+
+Record lists page on (created_at, id). With id as the last index column
+the `(created_at, id) < (:created_at, :id)` condition and the ORDER BY are
+both answered by the index range scan, with no sort for created_at ties.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REPLACED = (
+    ("ix_records_kid_id_created_at", ["kid_id", "created_at"], "ix_records_kid_id_created_at_id"),
+    (
+        "ix_records_kid_id_record_type_created_at",
+        ["kid_id", "record_type", "created_at"],
+        "ix_records_kid_id_record_type_created_at_id",
+    ),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for old_name, columns, new_name in REPLACED:
+            # Build the replacement first so listings never lose their index
+            op.create_index(new_name, "records", columns + ["id"], if_not_exists=True, postgresql_concurrently=True)
+            op.drop_index(old_name, "records", if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for old_name, columns, new_name in REPLACED:
+            op.create_index(old_name, "records", columns, if_not_exists=True, postgresql_concurrently=True)
+            op.drop_index(new_name, "records", if_exists=True, postgresql_concurrently=True)
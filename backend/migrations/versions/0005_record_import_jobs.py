@@ -0,0 +1,49 @@
+"""Record CSV import jobs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+import_status = sa.Enum("running", "completed", "failed", name="importstatusenum")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "record_import_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kid_id", sa.Integer(), sa.ForeignKey("kids.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status", import_status, nullable=False),
+        sa.Column("filename", sa.String(255)),
+        sa.Column("file_path", sa.Text(), nullable=False),
+        sa.Column("total_rows", sa.Integer()),
+        sa.Column("processed_rows", sa.Integer(), nullable=False),
+        sa.Column("imported_rows", sa.Integer(), nullable=False),
+        sa.Column("error_rows", sa.Integer(), nullable=False),
+        sa.Column("errors", sa.JSON()),
+        sa.Column("error", sa.Text()),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_record_import_jobs_kid_id", "record_import_jobs", ["kid_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_record_import_jobs_kid_id", "record_import_jobs")
+    op.drop_table("record_import_jobs")
+    import_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,43 @@
+"""Per-kid daily record rollups
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00
+
+Starts empty; fill it for existing records with
+`python scripts/backfill_daily_stats.py`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = (
+    "sleep_minutes", "sleep_count",
+    "feeds_breast_milk", "feeds_formula", "feeds_baby_food",
+    "stool_normal", "stool_diarrhea", "stool_constipation",
+    "stool_yellow", "stool_brown", "stool_green", "stool_other",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "record_daily_stats",
+        sa.Column("kid_id", sa.Integer(), sa.ForeignKey("kids.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("day", sa.Date(), primary_key=True),
+        *(sa.Column(name, sa.Integer(), nullable=False) for name in COUNTERS),
+        sa.Column("max_temperature", sa.Numeric(4, 1)),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("record_daily_stats")
@@ -0,0 +1,47 @@
+"""Rebuild record_daily_stats from the records table.
+
+The API keeps the rollup current as records are created and deleted; run
+this once after the 0006 migration, again after changing
+RECORD_STATS_TIMEZONE (days already stored keep the old zone's
+boundaries), and whenever the rollup is suspected to have drifted. Each kid is rebuilt in its own transaction, so
+the script can be stopped and rerun at any point:
+
+    cd backend && python scripts/backfill_daily_stats.py [--kid-id 42]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.models import Kid  # noqa: E402
+from app.services.daily_stats import daily_stats  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--kid-id", type=int, action="append", help="only these kids (repeatable)")
+    args = parser.parse_args()
+
+    if args.kid_id:
+        kid_ids = args.kid_id
+    else:
+        with engine.connect() as conn:
+            kid_ids = conn.execute(select(Kid.id).order_by(Kid.id)).scalars().all()
+
+    started = time.perf_counter()
+    total_days = 0
+    for kid_id in kid_ids:
+        with engine.begin() as conn:
+            days = daily_stats.rebuild(conn, kid_id)
+        total_days += days
+        print(f"kid {kid_id}: {days} days")
+    print(f"Rebuilt {total_days} days for {len(kid_ids)} kids in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Sync vs async DB benchmark: the same query served by a `def` handler on
+get_db (threadpool) and an `async def` handler on get_async_db.
+
+Each request runs one query that takes --query-ms on the database side
+(pg_sleep on PostgreSQL, a sleeping SQL function on SQLite), so the numbers
+show how many DB-bound requests one worker keeps in flight, not how fast the
+driver is. Requests go through the ASGI app in-process, --concurrency at a
+time, and the pool is sized to the concurrency so it isn't the limit:
+
+    cd backend && python scripts/bench_db_modes.py --concurrency 200 --requests 2000
+
+Point --database-url at PostgreSQL to measure psycopg2 against asyncpg; the
+default is a throwaway SQLite file (sqlite3 against aiosqlite). Exits
+non-zero when async throughput is below --min-speedup times sync.
+
+Sync throughput tops out at threadpool size / query time (40 threads by
+default). Async only pulls ahead once queries wait long enough for that to
+bind: on SQLite with --query-ms 20 aiosqlite's per-statement thread hop
+costs more than it saves, while at 100ms async serves about 1.3x and at
+200ms about 2x the requests of sync.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configure(database_url: str, pool_size: int) -> None:
+    """Settings are read at import, so this runs before any app module is imported"""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def build_app():
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import event, text
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+    from app.api.deps import get_async_db, get_db
+    from app.core.database import async_engine, engine
+
+    if engine.dialect.name == "sqlite":
+        def add_sleep(dbapi_connection, connection_record):
+            # Blocks whichever thread runs the query: the request's threadpool
+            # thread for sqlite3, aiosqlite's own connection thread for async
+            dbapi_connection.create_function("pg_sleep", 1, lambda seconds: time.sleep(seconds) or 0)
+
+        event.listen(engine, "connect", add_sleep)
+        event.listen(async_engine.sync_engine, "connect", add_sleep)
+
+    query = text("SELECT pg_sleep(:seconds)")
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_query(seconds: float, db: Session = Depends(get_db)):
+        db.execute(query, {"seconds": seconds})
+        return {"ok": True}
+
+    @app.get("/async")
+    async def async_query(seconds: float, db: AsyncSession = Depends(get_async_db)):
+        await db.execute(query, {"seconds": seconds})
+        return {"ok": True}
+
+    return app
+
+
+async def run(app, path: str, seconds: float, concurrency: int, requests: int) -> dict:
+    import httpx
+
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker(client):
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path, params={"seconds": seconds})
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm the pool so connection setup isn't measured
+        await asyncio.gather(*(client.get(path, params={"seconds": 0}) for _ in range(concurrency)))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 1),
+        "errors": errors,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--query-ms", type=float, default=100.0, help="database-side time per query")
+    parser.add_argument("--min-speedup", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(args.database_url or f"sqlite:///{tmp}/bench.db", args.concurrency)
+        app = build_app()
+        seconds = args.query_ms / 1000
+
+        async def bench():
+            from app.core.database import async_engine, engine
+
+            try:
+                return {
+                    mode: await run(app, f"/{mode}", seconds, args.concurrency, args.requests)
+                    for mode in ("sync", "async")
+                }
+            finally:
+                await async_engine.dispose()
+                engine.dispose()
+
+        results = asyncio.run(bench())
+
+    speedup = results["async"]["requests_per_second"] / results["sync"]["requests_per_second"]
+    report = {
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "query_ms": args.query_ms,
+        **results,
+        "async_speedup": round(speedup, 2),
+    }
+    print(json.dumps(report, indent=2))
+
+    if speedup < args.min_speedup:
+        print(f"Async speedup {speedup:.2f} below {args.min_speedup}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Batch ingest benchmark: records/s through POST /records/meal one at a time
+against POST /records/batch.
+
+Runs the app in-process on a throwaway SQLite database migrated to head, so
+it measures the request path (auth, validation, inserts, daily stats, commit)
+rather than the network:
+
+    cd backend && python scripts/bench_record_batch.py --records 300
+
+Batches are split at RECORD_BATCH_MAX_ITEMS. Exits non-zero when batch
+ingest is below --min-speedup times one-at-a-time ingest.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def meal(i: int) -> dict:
+    return {"title": f"수유 {i}", "meal_type": "formula", "meal_detail": f"{100 + i % 60}ml", "burp": i % 2 == 0}
+
+
+def setup(database_url: str):
+    """Migrate a fresh database and add a user with one kid; returns (app, headers, kid_id)"""
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.pop("ASYNC_DATABASE_URL", None)
+    sys.path.insert(0, BACKEND_DIR)
+
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config(os.path.join(BACKEND_DIR, "alembic.ini")), "head")
+
+    from datetime import date
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.models import Kid, User
+
+    with SessionLocal() as db:
+        user = User(username="bench", password_hash="!")
+        db.add(user)
+        db.flush()
+        kid = Kid(user_id=user.id, name="bench", birth_date=date(2025, 1, 1), gender="female")
+        db.add(kid)
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+        return app, headers, kid.id
+
+
+async def bench(app, headers: dict, kid_id: int, records: int) -> dict:
+    import httpx
+    from app.core.config import settings
+
+    path = f"/api/v1/kids/{kid_id}/records"
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+        started = time.perf_counter()
+        for i in range(records):
+            response = await client.post(f"{path}/meal", json=meal(i))
+            response.raise_for_status()
+        single = time.perf_counter() - started
+
+        items = [{"record_type": "meal", **meal(i)} for i in range(records)]
+        size = settings.RECORD_BATCH_MAX_ITEMS
+        started = time.perf_counter()
+        for offset in range(0, records, size):
+            response = await client.post(f"{path}/batch", json={"records": items[offset:offset + size]})
+            response.raise_for_status()
+            if response.json()["errors"]:
+                raise RuntimeError(f"Batch items rejected: {response.json()['errors'][:3]}")
+        batched = time.perf_counter() - started
+
+    return {
+        "one_at_a_time": {"seconds": round(single, 3), "records_per_second": round(records / single, 1)},
+        "batch": {
+            "seconds": round(batched, 3),
+            "records_per_second": round(records / batched, 1),
+            "batch_size": size,
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=300)
+    parser.add_argument("--min-speedup", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app, headers, kid_id = setup(f"sqlite:///{tmp}/bench.db")
+
+        async def run():
+            from app.core.database import async_engine, engine
+
+            try:
+                return await bench(app, headers, kid_id, args.records)
+            finally:
+                await async_engine.dispose()
+                engine.dispose()
+
+        results = asyncio.run(run())
+
+    speedup = results["batch"]["records_per_second"] / results["one_at_a_time"]["records_per_second"]
+    report = {"records": args.records, **results, "batch_speedup": round(speedup, 1)}
+    print(json.dumps(report, indent=2))
+
+    if speedup < args.min_speedup:
+        print(f"Batch speedup {speedup:.1f} below {args.min_speedup}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
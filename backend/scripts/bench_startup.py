@@ -0,0 +1,139 @@
+"""Cold start benchmark: `import app.main` time and time to the first 200 on /health.
+
+Each run starts a fresh interpreter, so nothing is shared between samples.
+The median of the runs is compared against a budget and the script exits
+non-zero when either is exceeded, so it can gate a deploy pipeline:
+
+    cd backend && python scripts/bench_startup.py --runs 5
+
+Use --top to list the slowest imports (from `python -X importtime`) when
+chasing a regression.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Medians of `--runs 9` on a 1-vCPU container, Python 3.11, with numpy
+# deferred: import 1914ms (1759-2006), first 200 2146ms (1921-2406). The
+# budgets sit 20% above them, clear of the ~10% run-to-run noise but low
+# enough to catch a new heavy import. Re-measure and update the baselines
+# when startup changes.
+IMPORT_BASELINE_MS = 1900
+READY_BASELINE_MS = 2150
+BUDGET_MARGIN = 1.2
+IMPORT_BUDGET_MS = round(IMPORT_BASELINE_MS * BUDGET_MARGIN)
+READY_BUDGET_MS = round(READY_BASELINE_MS * BUDGET_MARGIN)
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - started) * 1000)"
+)
+
+
+def measure_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_ready(timeout: float) -> float:
+    """Milliseconds from spawning uvicorn to the first 200 from /health"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f"/health did not return 200 within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def slowest_imports(count: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative) / 1000, name))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--ready-budget-ms", type=float, default=READY_BUDGET_MS)
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for /health")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest imports")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    readies = [measure_ready(args.timeout) for _ in range(args.runs)]
+    report = {
+        "runs": args.runs,
+        "import_ms": {
+            "median": round(statistics.median(imports), 1),
+            "min": round(min(imports), 1),
+            "max": round(max(imports), 1),
+            "budget": args.import_budget_ms,
+        },
+        "first_200_ms": {
+            "median": round(statistics.median(readies), 1),
+            "min": round(min(readies), 1),
+            "max": round(max(readies), 1),
+            "budget": args.ready_budget_ms,
+        },
+    }
+    if args.top:
+        report["slowest_imports_ms"] = [
+            {"module": name, "cumulative": round(ms, 1)} for ms, name in slowest_imports(args.top)
+        ]
+    print(json.dumps(report, indent=2))
+
+    over_budget = []
+    if report["import_ms"]["median"] > args.import_budget_ms:
+        over_budget.append("import")
+    if report["first_200_ms"]["median"] > args.ready_budget_ms:
+        over_budget.append("first 200")
+    if over_budget:
+        print(f"Startup over budget: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""The app on a throwaway SQLite database, migrated to head, with the fake LLM provider.
+
+Settings are read from the environment when app.core.config is imported,
+so they are set here before anything from `app` is.
+"""
+import itertools
+import os
+import tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix="todoc-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{DATA_DIR}/primary.db",
+    "LLM_PROVIDER": "fake",
+    "FAKE_LLM_LATENCY_DISTRIBUTION": "fixed",
+    "FAKE_LLM_LATENCY_MS": "20",
+    "FAKE_LLM_CHUNK_INTERVAL_MS": "5",
+    "RECORD_IMPORT_DIR": os.path.join(DATA_DIR, "imports"),
+    "UPLOAD_DIR": os.path.join(DATA_DIR, "uploads"),
+})
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_usernames = itertools.count(1)
+
+
+def migrate() -> None:
+    """Upgrade DATABASE_URL to head; migrations/env.py reads it from settings"""
+    command.upgrade(Config(os.path.join(BACKEND_DIR, "alembic.ini")), "head")
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def asgi_app(anyio_backend):
+    """The FastAPI app with its provider set up; the lifespan isn't run under httpx"""
+    migrate()
+    from app.core.database import async_engine, engine
+    from app.main import app
+    from app.services.ai_service import ai_service
+
+    ai_service.setup()
+    yield app
+    await async_engine.dispose()
+    engine.dispose()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Swap in a FakeProvider and fresh scheduler/breaker state for one test.
+
+    Call it with FakeProvider keyword arguments plus the scheduler limits;
+    returns the AIService it configured.
+    """
+    from app.services.ai_service import ai_service
+    from app.services.llm_provider import FakeProvider
+    from app.services.llm_scheduler import LLMScheduler
+    from app.services.resilience import CircuitBreaker, LatencyTracker
+
+    def configure(max_concurrency: int = 8, max_queue: int = 100, max_queued_per_user: int = 100, **provider):
+        monkeypatch.setattr(ai_service, "provider", FakeProvider(**provider))
+        monkeypatch.setattr(ai_service, "scheduler", LLMScheduler(
+            max_concurrency=max_concurrency, max_queue=max_queue, max_queued_per_user=max_queued_per_user
+        ))
+        monkeypatch.setattr(ai_service, "breaker", CircuitBreaker(
+            failure_threshold=ai_service.breaker.failure_threshold, reset_timeout=ai_service.breaker.reset_timeout
+        ))
+        monkeypatch.setattr(ai_service, "latency", LatencyTracker())
+        monkeypatch.setattr(ai_service, "first_token_latency", LatencyTracker())
+        return ai_service
+
+    return configure
+
+
+@pytest.fixture
+async def client(asgi_app):
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+def make_user() -> dict:
+    """A new user inserted directly (skips password hashing); returns auth headers"""
+    from app.core.database import SessionLocal
+    from app.core.security import create_access_token
+    from app.models import User
+
+    with SessionLocal() as db:
+        user = User(username=f"user{next(_usernames)}", password_hash="!")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+@pytest.fixture
+def headers(asgi_app) -> dict:
+    return make_user()
+
+
+@pytest.fixture
+def other_headers(asgi_app) -> dict:
+    """A second user, for what one user's requests must not change for another"""
+    return make_user()
+
+
+@pytest.fixture
+async def kid_id(client, headers) -> int:
+    response = await client.post(
+        "/api/v1/kids/", json={"name": "test", "birth_date": "2025-01-01", "gender": "male"}, headers=headers
+    )
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+async def session_id(client, headers, kid_id) -> int:
+    response = await client.post("/api/v1/chat/sessions", json={"kid_id": kid_id}, headers=headers)
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id"]
@@ -0,0 +1,66 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+import pytest
+from app.services.ai_service import ai_service
+
+pytestmark = pytest.mark.anyio
+
+PENDING_CHATS = 50
+MAX_CONCURRENCY = 10
+MAX_QUEUE = 30
+
+
+@pytest.fixture
+def slow_llm(fake_llm):
+    """LLM calls take two seconds, so none finishes before all 50 chats have arrived
+    (that takes about half a second on a single slow core)"""
+    return fake_llm(
+        max_concurrency=MAX_CONCURRENCY, max_queue=MAX_QUEUE, max_queued_per_user=PENDING_CHATS,
+        latency_ms=2000, latency_distribution="fixed", chunk_interval_ms=0, reply_tokens=8
+    )
+
+
+async def timed_get(client, path: str, headers: dict) -> float:
+    started = time.perf_counter()
+    response = await client.get(path, headers=headers)
+    assert response.status_code == 200
+    return time.perf_counter() - started
+
+
+async def test_pending_chats_dont_slow_other_endpoints(slow_llm, client, headers, session_id):
+    baseline = [await timed_get(client, "/api/v1/kids/", headers) for _ in range(10)]
+
+    chats = [
+        asyncio.ensure_future(client.post(
+            f"/api/v1/chat/sessions/{session_id}/messages", json={"content": f"질문 {i}"}, headers=headers
+        ))
+        for i in range(PENDING_CHATS)
+    ]
+    # Measure once every chat is pending (or turned away), not while the burst
+    # of requests is still being parsed and admitted
+    rejected = PENDING_CHATS - MAX_CONCURRENCY - MAX_QUEUE
+    for _ in range(300):
+        if sum(chat.done() for chat in chats) >= rejected:
+            break
+        await asyncio.sleep(0.01)
+
+    during = []
+    max_queue_depth = 0
+    while not all(chat.done() for chat in chats):
+        max_queue_depth = max(max_queue_depth, ai_service.scheduler.stats()["queue_depth"])
+        during.append(await timed_get(client, "/api/v1/kids/", headers))
+        await asyncio.sleep(0.02)
+    responses = await asyncio.gather(*chats)
+
+    # Admitted: the running calls plus a full queue; everything beyond is turned away
+    statuses = Counter(response.status_code for response in responses)
+    assert statuses == {200: MAX_CONCURRENCY + MAX_QUEUE, 429: PENDING_CHATS - MAX_CONCURRENCY - MAX_QUEUE}
+    assert all(int(r.headers["Retry-After"]) >= 1 for r in responses if r.status_code == 429)
+
+    # The measurement only means something if the LLM queue was actually backed up
+    assert max_queue_depth > MAX_QUEUE // 2
+    assert len(during) >= 10
+    assert statistics.median(during) < statistics.median(baseline) + 0.05
+    assert max(during) < 0.5
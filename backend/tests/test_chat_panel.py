@@ -0,0 +1,111 @@
+import asyncio
+import json
+import pytest
+
+from app.services.ai_service import AIServiceError, ai_service
+
+pytestmark = pytest.mark.anyio
+
+# Persona name -> seconds before it answers; None fails instead
+PERSONAS = {"mom": 0.15, "doctor": 0.0, "teacher": 0.3}
+
+
+@pytest.fixture
+def mode_ids(asgi_app) -> dict:
+    from app.core.database import SessionLocal
+    from app.models import AIMode
+
+    with SessionLocal() as db:
+        for name in PERSONAS:
+            if db.query(AIMode).filter(AIMode.name == name).first() is None:
+                db.add(AIMode(name=name))
+        db.commit()
+        return {ai_mode.name: ai_mode.id for ai_mode in db.query(AIMode).filter(AIMode.name.in_(PERSONAS))}
+
+
+@pytest.fixture
+def personas(monkeypatch):
+    """Replace generate_response with per-persona delays; returns the mapping to edit"""
+    delays = dict(PERSONAS)
+
+    async def generate_response(message, ai_mode, **kwargs):
+        delay = delays[ai_mode]
+        if delay is None:
+            raise AIServiceError(f"{ai_mode} unavailable")
+        await asyncio.sleep(delay)
+        return f"{ai_mode}: {message}"
+
+    monkeypatch.setattr(ai_service, "generate_response", generate_response)
+    return delays
+
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+async def ask_panel(client, headers, session_id, mode_ids, names):
+    response = await client.post(
+        f"/api/v1/chat/sessions/{session_id}/panel",
+        json={"content": "열이 나요", "ai_mode_ids": [mode_ids[name] for name in names]},
+        headers=headers
+    )
+    return response
+
+
+async def stored_messages(client, headers, session_id):
+    response = await client.get(f"/api/v1/chat/sessions/{session_id}/messages", headers=headers)
+    return [(message["sender"], message["content"]) for message in response.json()["messages"]]
+
+
+async def test_answers_stream_in_completion_order(client, headers, session_id, mode_ids, personas):
+    response = await ask_panel(client, headers, session_id, mode_ids, ["teacher", "mom", "doctor"])
+
+    assert response.status_code == 200
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["answer", "answer", "answer", "done"]
+    id_to_name = {mode_id: name for name, mode_id in mode_ids.items()}
+    assert [id_to_name[data["ai_mode_id"]] for _, data in events[:3]] == ["doctor", "mom", "teacher"]
+    assert events[-1][1] == {"answered": 3, "failed": 0}
+    assert len(await stored_messages(client, headers, session_id)) == 4
+
+
+async def test_failed_persona_does_not_sink_the_others(client, headers, session_id, mode_ids, personas):
+    personas["mom"] = None
+
+    response = await ask_panel(client, headers, session_id, mode_ids, ["mom", "doctor", "teacher"])
+
+    events = parse_events(response.text)
+    errors = [data for event, data in events if event == "error"]
+    assert [error["ai_mode_id"] for error in errors] == [mode_ids["mom"]]
+    assert errors[0]["detail"] == "mom unavailable"
+    assert events[-1] == ("done", {"answered": 2, "failed": 1})
+    messages = await stored_messages(client, headers, session_id)
+    assert [sender for sender, _ in messages] == ["user", "ai", "ai"]
+    assert not any(content.startswith("mom:") for _, content in messages)
+
+
+async def test_all_personas_failing_discards_the_question(client, headers, session_id, mode_ids, personas):
+    for name in personas:
+        personas[name] = None
+
+    response = await ask_panel(client, headers, session_id, mode_ids, list(PERSONAS))
+
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["error", "error", "error", "done"]
+    assert events[-1][1] == {"answered": 0, "failed": 3}
+    assert await stored_messages(client, headers, session_id) == []
+
+
+async def test_admission_counts_a_slot_per_persona(client, headers, session_id, mode_ids, fake_llm):
+    fake_llm(max_concurrency=1, max_queued_per_user=1)
+
+    response = await ask_panel(client, headers, session_id, mode_ids, list(PERSONAS))
+
+    # One running plus one queued fits the limits, the third persona doesn't
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert await stored_messages(client, headers, session_id) == []
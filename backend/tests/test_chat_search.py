@@ -0,0 +1,100 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+def add_messages(session_id: int, *contents: str) -> list:
+    from app.core.database import SessionLocal
+    from app.models import ChatMessage, SenderTypeEnum
+
+    with SessionLocal() as db:
+        messages = [ChatMessage(session_id=session_id, sender=SenderTypeEnum.user, content=c) for c in contents]
+        db.add_all(messages)
+        db.commit()
+        return [message.id for message in messages]
+
+
+async def search(client, headers, q: str, **params) -> dict:
+    response = await client.get("/api/v1/chat/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_closer_matches_rank_first(client, headers, session_id):
+    long_id, short_id, _ = add_messages(
+        session_id,
+        "어제 밤에 해열제 먹이고 재웠는데 아침까지 푹 잤어요",
+        "해열제 간격",
+        "이유식을 잘 안 먹어요",
+    )
+
+    result = await search(client, headers, "해열제")
+
+    assert [hit["message_id"] for hit in result["results"]] == [short_id, long_id]
+    assert result["total"] == 2
+    assert result["results"][0]["score"] > result["results"][1]["score"]
+    assert "해열제" in result["results"][1]["snippet"]
+
+
+async def test_results_are_scoped_to_the_callers_sessions(client, headers, other_headers, session_id):
+    response = await client.post(
+        "/api/v1/kids/", json={"name": "other", "birth_date": "2025-01-01", "gender": "female"},
+        headers=other_headers
+    )
+    other_kid = response.json()["id"]
+    response = await client.post("/api/v1/chat/sessions", json={"kid_id": other_kid}, headers=other_headers)
+    other_session = response.json()["id"]
+    [own_id] = add_messages(session_id, "기저귀 발진이 생겼어요")
+    [other_id] = add_messages(other_session, "기저귀 발진 연고 추천")
+
+    assert [hit["message_id"] for hit in (await search(client, headers, "발진"))["results"]] == [own_id]
+    assert [hit["message_id"] for hit in (await search(client, other_headers, "발진"))["results"]] == [other_id]
+
+    # Another user's kid is not found rather than searched
+    response = await client.get(
+        "/api/v1/chat/search", params={"q": "발진", "kid_id": other_kid}, headers=headers
+    )
+    assert response.status_code == 404
+
+
+async def test_index_catches_up_on_new_and_deleted_messages(client, headers, session_id):
+    from app.core.database import SessionLocal
+    from app.models import ChatMessage
+    from app.services.chat_search import chat_search
+
+    add_messages(session_id, "분유 온도는 몇 도가 좋아요")
+    assert (await search(client, headers, "분유온도"))["total"] == 0
+
+    [new_id] = add_messages(session_id, "분유온도 맞추기 팁")
+    result = await search(client, headers, "분유온도")
+    assert [hit["message_id"] for hit in result["results"]] == [new_id]
+    assert chat_search.stats()["last_id"] >= new_id
+
+    with SessionLocal() as db:
+        db.query(ChatMessage).filter(ChatMessage.id == new_id).delete()
+        db.commit()
+    assert (await search(client, headers, "분유온도"))["total"] == 0
+
+    # SQLite gives the deleted (highest) id to the next message
+    [reused_id] = add_messages(session_id, "분유온도 다시 질문")
+    result = await search(client, headers, "분유온도")
+    assert [hit["message_id"] for hit in result["results"]] == [reused_id]
+
+
+async def test_pages_partition_the_matches(client, headers, session_id):
+    ids = add_messages(session_id, *(f"낮잠 기록 {i}" for i in range(5)))
+
+    pages = [await search(client, headers, "낮잠", page=page, limit=2) for page in (1, 2, 3)]
+
+    assert [page["total"] for page in pages] == [5, 5, 5]
+    assert [len(page["results"]) for page in pages] == [2, 2, 1]
+    found = [hit["message_id"] for page in pages for hit in page["results"]]
+    assert sorted(found) == sorted(ids)
+    # Equal scores fall back to newest first
+    assert found == sorted(ids, reverse=True)
+
+
+async def test_empty_query_is_rejected(client, headers):
+    response = await client.get("/api/v1/chat/search", params={"q": "?!"}, headers=headers)
+
+    assert response.status_code == 400
@@ -0,0 +1,83 @@
+import asyncio
+import json
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def post_stream(app, path: str, body: dict, headers: dict, disconnect_after_deltas: int = 0) -> bytes:
+    """POST to a streaming endpoint through the raw ASGI interface.
+
+    httpx's ASGI transport buffers whole responses, so it can't hang up
+    mid-stream. With `disconnect_after_deltas`, the client reports
+    http.disconnect once that many `delta` events have been sent.
+    """
+    sent = []
+    disconnected = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": json.dumps(body).encode(), "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            sent.append(message["body"])
+            deltas = sum(chunk.count(b"event: delta") for chunk in sent)
+            if disconnect_after_deltas and deltas >= disconnect_after_deltas:
+                disconnected.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"authorization", headers["Authorization"].encode()),
+        ],
+        "client": ("testclient", 50000),
+        "server": ("test", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), 10)
+    return b"".join(sent)
+
+
+async def stored_messages(client, headers, session_id):
+    response = await client.get(f"/api/v1/chat/sessions/{session_id}/messages", headers=headers)
+    return [(message["sender"], message["content"]) for message in response.json()["messages"]]
+
+
+async def test_completed_stream_stores_question_and_answer(asgi_app, client, headers, session_id):
+    body = await post_stream(
+        asgi_app, f"/api/v1/chat/sessions/{session_id}/messages/stream", {"content": "밤에 자주 깨요"}, headers
+    )
+
+    assert b"event: done" in body
+    messages = await stored_messages(client, headers, session_id)
+    assert [sender for sender, _ in messages] == ["user", "ai"]
+
+
+async def test_disconnect_mid_stream_discards_user_message(asgi_app, client, headers, session_id):
+    body = await post_stream(
+        asgi_app, f"/api/v1/chat/sessions/{session_id}/messages/stream", {"content": "이유식 거부"}, headers,
+        disconnect_after_deltas=1
+    )
+
+    assert b"event: delta" in body
+    assert b"event: done" not in body
+    # The discard is shielded from the cancellation and may finish just after the response
+    for _ in range(50):
+        if not await stored_messages(client, headers, session_id):
+            break
+        await asyncio.sleep(0.02)
+    assert await stored_messages(client, headers, session_id) == []
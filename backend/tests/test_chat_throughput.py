@@ -0,0 +1,107 @@
+"""Throughput and tail latency of the chat pipeline against the offline fake provider.
+
+These go through the whole send path (auth, history, DB writes, kid
+context, scheduler, breaker and retries) with the model replaced by
+FakeProvider, so they need no network and run in CI.
+"""
+import asyncio
+import statistics
+import time
+import pytest
+from app.services.llm_provider import FakeProvider
+
+pytestmark = pytest.mark.anyio
+
+LATENCY_MS = 100
+CONCURRENCY = 8
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run_clients(client, headers, kid_id, clients: int, requests_per_client: int):
+    """Closed loop: each client sends its next message as soon as the last reply arrives.
+
+    Each client has its own chat session, short enough that no history gets
+    summarized. Returns (latencies of successful sends in seconds, status
+    codes, wall time).
+    """
+    latencies, statuses = [], []
+
+    async def run(client_index: int):
+        session_id = (await client.post(
+            "/api/v1/chat/sessions", json={"kid_id": kid_id}, headers=headers
+        )).json()["id"]
+        for i in range(requests_per_client):
+            started = time.perf_counter()
+            response = await client.post(
+                f"/api/v1/chat/sessions/{session_id}/messages",
+                json={"content": f"질문 {client_index}-{i}"}, headers=headers
+            )
+            statuses.append(response.status_code)
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(index) for index in range(clients)))
+    return latencies, statuses, time.perf_counter() - started
+
+
+def test_fake_provider_is_deterministic():
+    first = FakeProvider(latency_ms=100, seed=7)
+    second = FakeProvider(latency_ms=100, seed=7)
+    assert [first.sample_latency() for _ in range(20)] == [second.sample_latency() for _ in range(20)]
+    assert first.reply_chunks("열이 나요") == second.reply_chunks("열이 나요")
+    assert first.reply_chunks("열이 나요") != first.reply_chunks("기침해요")
+
+
+async def test_throughput(fake_llm, client, headers, kid_id):
+    fake_llm(
+        max_concurrency=CONCURRENCY,
+        latency_ms=LATENCY_MS, latency_distribution="fixed", chunk_interval_ms=0, reply_tokens=16
+    )
+    latencies, statuses, elapsed = await run_clients(client, headers, kid_id, CONCURRENCY, 10)
+    throughput = len(latencies) / elapsed
+
+    assert statuses == [200] * CONCURRENCY * 10
+    # The model bounds it at CONCURRENCY / latency; the rest of the pipeline (auth,
+    # two commits per send on SQLite) may cost at most 60% of that
+    assert throughput >= 0.4 * CONCURRENCY / (LATENCY_MS / 1000), (
+        f"throughput {throughput:.1f}/s, p50 {statistics.median(latencies) * 1000:.0f}ms"
+    )
+
+
+async def test_tail_latency(fake_llm, client, headers, kid_id):
+    fake_llm(
+        max_concurrency=CONCURRENCY,
+        latency_ms=LATENCY_MS, latency_distribution="lognormal", latency_sigma=0.5,
+        chunk_interval_ms=0, reply_tokens=16, seed=1
+    )
+    reference = FakeProvider(latency_ms=LATENCY_MS, latency_sigma=0.5, seed=1)
+    model_p99 = percentile([reference.sample_latency() for _ in range(1000)], 0.99)
+
+    latencies, statuses, _ = await run_clients(client, headers, kid_id, CONCURRENCY, 15)
+    p50, p95, p99 = (percentile(latencies, q) for q in (0.5, 0.95, 0.99))
+
+    assert statuses == [200] * CONCURRENCY * 15
+    # Nothing queues at this load, so the tail is the model's tail plus a bounded overhead
+    assert p99 < model_p99 + 0.25, (
+        f"p50 {p50 * 1000:.0f}ms p95 {p95 * 1000:.0f}ms p99 {p99 * 1000:.0f}ms (model p99 {model_p99 * 1000:.0f}ms)"
+    )
+
+
+async def test_retries_absorb_transient_errors(fake_llm, client, headers, kid_id, monkeypatch):
+    service = fake_llm(
+        max_concurrency=CONCURRENCY,
+        latency_ms=20, latency_distribution="fixed", chunk_interval_ms=0, reply_tokens=16,
+        error_rate=0.2, seed=3
+    )
+    monkeypatch.setattr(service, "retry_base_delay", 0.01)
+
+    latencies, statuses, _ = await run_clients(client, headers, kid_id, CONCURRENCY, 10)
+
+    # Two retries: a send only fails if three calls in a row do (0.2^3 = 0.8%)
+    assert statuses.count(200) >= 0.95 * len(statuses)
+    assert set(statuses) <= {200, 503}
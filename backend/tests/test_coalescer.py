@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from app.services.coalescer import RequestCoalescer
+
+pytestmark = pytest.mark.anyio
+
+
+def make_work(log: list, gate: asyncio.Event):
+    """Work that 'stores' a row once per context, then waits on `gate`"""
+    async def work(context: dict) -> str:
+        if "row" not in context:
+            context["row"] = len(log)
+            log.append("stored")
+        await gate.wait()
+        return f"reply to row {context['row']}"
+    return work
+
+
+async def test_waiting_duplicate_takes_over_with_the_same_context():
+    coalescer = RequestCoalescer(ttl=60)
+    log, gate = [], asyncio.Event()
+    abandoned = []
+
+    async def abandon(context):
+        abandoned.append(context)
+
+    leader = asyncio.ensure_future(coalescer.run("key", make_work(log, gate), abandon=abandon))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(coalescer.run("key", make_work(log, gate), abandon=abandon))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert await follower == "reply to row 0"
+    assert leader.cancelled()
+    assert log == ["stored"]
+    assert abandoned == []
+    assert coalescer.stats()["taken_over"] == 1
+
+
+async def test_cancelled_with_nobody_waiting_is_abandoned():
+    coalescer = RequestCoalescer(ttl=60)
+    log, gate = [], asyncio.Event()
+    abandoned = asyncio.Queue()
+
+    async def abandon(context):
+        await abandoned.put(context)
+
+    leader = asyncio.ensure_future(coalescer.run("key", make_work(log, gate), abandon=abandon))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await asyncio.wait_for(abandoned.get(), 1) == {"row": 0}
+
+
+async def test_last_waiter_leaving_abandons_the_handoff():
+    coalescer = RequestCoalescer(ttl=60)
+    log, gate = [], asyncio.Event()
+    abandoned = asyncio.Queue()
+
+    async def abandon(context):
+        await abandoned.put(context)
+
+    leader = asyncio.ensure_future(coalescer.run("key", make_work(log, gate), abandon=abandon))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(coalescer.run("key", make_work(log, gate), abandon=abandon))
+    await asyncio.sleep(0)
+    # Both clients go away at once: nobody takes over, so the stored row is undone
+    leader.cancel()
+    follower.cancel()
+
+    assert await asyncio.wait_for(abandoned.get(), 1) == {"row": 0}
+    assert log == ["stored"]
+
+
+async def messages(client, headers, session_id):
+    response = await client.get(f"/api/v1/chat/sessions/{session_id}/messages", headers=headers)
+    return [(message["sender"], message["content"]) for message in response.json()["messages"]]
+
+
+async def test_send_taken_over_after_leader_cancel_stores_one_question(
+    fake_llm, client, headers, session_id
+):
+    fake_llm(latency_ms=500, latency_distribution="fixed", chunk_interval_ms=0, reply_tokens=8)
+    path = f"/api/v1/chat/sessions/{session_id}/messages"
+
+    leader = asyncio.ensure_future(client.post(path, json={"content": "분유 양"}, headers=headers))
+    await asyncio.sleep(0.2)
+    follower = asyncio.ensure_future(client.post(path, json={"content": "분유 양"}, headers=headers))
+    await asyncio.sleep(0.1)
+    leader.cancel()
+
+    response = await follower
+    assert response.status_code == 200
+    assert [sender for sender, _ in await messages(client, headers, session_id)] == ["user", "ai"]
+
+
+async def test_cancelled_send_with_no_duplicate_leaves_nothing(fake_llm, client, headers, session_id):
+    fake_llm(latency_ms=500, latency_distribution="fixed", chunk_interval_ms=0, reply_tokens=8)
+
+    send = asyncio.ensure_future(client.post(
+        f"/api/v1/chat/sessions/{session_id}/messages", json={"content": "낮잠"}, headers=headers
+    ))
+    await asyncio.sleep(0.2)
+    send.cancel()
+
+    for _ in range(50):
+        if not await messages(client, headers, session_id):
+            break
+        await asyncio.sleep(0.02)
+    assert await messages(client, headers, session_id) == []
@@ -0,0 +1,129 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_sleeps_are_counted_on_their_start_day_and_minutes_split_at_midnight(client, headers, kid_id):
+    sleeps = [
+        ("2026-01-01T13:00:00", "2026-01-01T14:30:00"),
+        ("2026-01-01T21:00:00", "2026-01-02T06:00:00"),
+    ]
+    for start, end in sleeps:
+        response = await client.post(
+            f"/api/v1/kids/{kid_id}/records/sleep",
+            json={"start_datetime": start, "end_datetime": end, "sleep_quality": "good"}, headers=headers
+        )
+        assert response.status_code == 201
+
+    response = await client.get(
+        f"/api/v1/kids/{kid_id}/records/stats/daily",
+        params={"date_from": "2026-01-01", "date_to": "2026-01-02"}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert [(day["day"], day["sleep_count"], day["sleep_minutes"]) for day in response.json()] == [
+        ("2026-01-01", 2, 90 + 180),
+        ("2026-01-02", 0, 360),
+    ]
+
+
+def test_every_record_type_is_bucketed_on_the_stats_timezone_day():
+    from datetime import date, datetime
+    from types import SimpleNamespace
+    from app.services.daily_stats import STATS_TIMEZONE, record_contributions
+
+    assert str(STATS_TIMEZONE) == "Asia/Seoul"
+    # created_at is stored as naive UTC: 15:30Z is 00:30 the next day in Seoul
+    meal = SimpleNamespace(meal_type="formula")
+    assert list(record_contributions("meal", datetime(2026, 1, 1, 15, 30), meal)) == [
+        (date(2026, 1, 2), "feeds_formula", 1)
+    ]
+    assert list(record_contributions("meal", datetime(2026, 1, 1, 14, 59), meal)) == [
+        (date(2026, 1, 1), "feeds_formula", 1)
+    ]
+    stool = SimpleNamespace(condition="normal", color="yellow")
+    assert {day for day, _, _ in record_contributions("stool", datetime(2026, 1, 1, 15, 30), stool)} == {
+        date(2026, 1, 2)
+    }
+
+    # A sleep sent with an offset lands on the same day as the meal above
+    sleep = SimpleNamespace(
+        start_datetime=datetime.fromisoformat("2026-01-01T15:10:00+00:00"),
+        end_datetime=datetime.fromisoformat("2026-01-01T16:10:00+00:00"),
+    )
+    assert list(record_contributions("sleep", None, sleep)) == [
+        (date(2026, 1, 2), "sleep_count", 1),
+        (date(2026, 1, 2), "sleep_minutes", 60),
+    ]
+
+
+async def post_records(client, headers, kid_id):
+    path = f"/api/v1/kids/{kid_id}/records"
+    ids = {}
+    for name, kind, body in [
+        ("feed1", "meal", {"meal_type": "formula"}),
+        ("feed2", "meal", {"meal_type": "formula"}),
+        ("fever", "health", {"temperature": "38.5", "symptom": "fever"}),
+        ("mild", "health", {"temperature": "37.2", "symptom": "fever"}),
+        ("stool", "stool", {"amount": "medium", "condition": "normal", "color": "yellow"}),
+    ]:
+        response = await client.post(f"{path}/{kind}", json=body, headers=headers)
+        assert response.status_code == 201, response.text
+        ids[name] = response.json()["id"]
+    return ids
+
+
+async def todays_stats(client, headers, kid_id) -> dict:
+    response = await client.get(f"/api/v1/kids/{kid_id}/records/stats/daily", headers=headers)
+    assert response.status_code == 200
+    days = response.json()
+    assert len(days) == 1
+    return days[0]
+
+
+async def test_deleting_records_decrements_counts_and_recomputes_max_temperature(client, headers, kid_id):
+    ids = await post_records(client, headers, kid_id)
+    before = await todays_stats(client, headers, kid_id)
+    assert before["feeds"]["formula"] == 2
+    assert before["max_temperature"] == "38.5"
+
+    for name in ("feed1", "fever", "stool"):
+        response = await client.delete(f"/api/v1/kids/{kid_id}/records/{ids[name]}", headers=headers)
+        assert response.status_code == 204
+
+    after = await todays_stats(client, headers, kid_id)
+    assert after["feeds"]["formula"] == 1
+    assert after["max_temperature"] == "37.2"
+    assert after["stool_conditions"]["normal"] == 0
+
+
+async def test_backfill_rebuild_matches_incremental_rollup(client, headers, kid_id):
+    from datetime import timedelta
+    from app.core.database import engine
+    from app.services.daily_stats import daily_stats, stats_today
+
+    today = stats_today()
+    yesterday = today - timedelta(days=1)
+    await post_records(client, headers, kid_id)
+    response = await client.post(
+        f"/api/v1/kids/{kid_id}/records/sleep",
+        json={
+            "start_datetime": f"{yesterday}T21:00:00", "end_datetime": f"{today}T06:00:00",
+            "sleep_quality": "good"
+        },
+        headers=headers
+    )
+    assert response.status_code == 201
+    params = {"date_from": str(yesterday), "date_to": str(today)}
+    incremental = (await client.get(
+        f"/api/v1/kids/{kid_id}/records/stats/daily", params=params, headers=headers
+    )).json()
+
+    with engine.begin() as conn:
+        days = daily_stats.rebuild(conn, kid_id)
+
+    rebuilt = (await client.get(
+        f"/api/v1/kids/{kid_id}/records/stats/daily", params=params, headers=headers
+    )).json()
+    assert days == len(incremental)
+    assert rebuilt == incremental
@@ -0,0 +1,107 @@
+import asyncio
+import time
+import pytest
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.models import ChatMessage, ChatSession, SenderTypeEnum
+from app.services.ai_service import ai_service
+from app.services.history_service import history_manager
+
+pytestmark = pytest.mark.anyio
+
+
+def add_messages(session_id: int, count: int) -> list:
+    """Insert `count` alternating user/AI messages, oldest first; returns their ids"""
+    with SessionLocal() as db:
+        messages = [
+            ChatMessage(
+                session_id=session_id,
+                sender=SenderTypeEnum.user if i % 2 == 0 else SenderTypeEnum.ai,
+                content=f"message {i}"
+            )
+            for i in range(count)
+        ]
+        db.add_all(messages)
+        db.commit()
+        return [message.id for message in messages]
+
+
+async def build_history(session_id: int):
+    async with AsyncSessionLocal() as db:
+        session = await db.get(ChatSession, session_id)
+        return await history_manager.build_history(session, db)
+
+
+async def wait_for_summary(session_id: int) -> ChatSession:
+    task = history_manager.tasks.get(session_id)
+    if task is not None:
+        await task
+    async with AsyncSessionLocal() as db:
+        return await db.get(ChatSession, session_id)
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    """Records the transcripts it is asked to fold; set `fail_on` to fail a call"""
+    calls = []
+
+    async def summarize(previous_summary, conversation):
+        calls.append((previous_summary, [message["message"] for message in conversation]))
+        if len(calls) == summarize.fail_on:
+            raise RuntimeError("summarizer down")
+        return f"summary {len(calls)}"
+
+    summarize.fail_on = None
+    summarize.calls = calls
+    monkeypatch.setattr(ai_service, "summarize_conversation", summarize)
+    return summarize
+
+
+async def test_legacy_session_is_folded_in_pages(summarizer, session_id):
+    ids = add_messages(session_id, 100)
+    window = history_manager.max_messages
+
+    history, _ = await build_history(session_id)
+    session = await wait_for_summary(session_id)
+
+    assert [message["message"] for message in history] == [f"message {i}" for i in range(100 - window, 100)]
+    # Every message before the window is summarized exactly once, oldest first
+    folded = [text for _, transcript in summarizer.calls for text in transcript]
+    assert folded == [f"message {i}" for i in range(100 - window)]
+    assert [previous for previous, _ in summarizer.calls] == [None] + [
+        f"summary {n}" for n in range(1, len(summarizer.calls))
+    ]
+    assert session.summarized_until_id == ids[100 - window - 1]
+    assert session.summary == f"summary {len(summarizer.calls)}"
+
+
+async def test_failed_page_keeps_marker_and_resumes(summarizer, session_id):
+    ids = add_messages(session_id, 100)
+    window = history_manager.max_messages
+    summarizer.fail_on = 2
+
+    await build_history(session_id)
+    session = await wait_for_summary(session_id)
+    # Only the first page made it; nothing after it is marked as summarized
+    assert session.summarized_until_id == ids[window - 1]
+    assert session.summary == "summary 1"
+
+    summarizer.fail_on = None
+    await build_history(session_id)
+    session = await wait_for_summary(session_id)
+    assert session.summarized_until_id == ids[100 - window - 1]
+    folded = [text for _, transcript in summarizer.calls[2:] for text in transcript]
+    assert folded == [f"message {i}" for i in range(window, 100 - window)]
+
+
+async def test_summarizing_is_off_the_request_path(monkeypatch, session_id):
+    add_messages(session_id, 100)
+
+    async def slow_summarize(previous_summary, conversation):
+        await asyncio.sleep(1)
+        return "summary"
+
+    monkeypatch.setattr(ai_service, "summarize_conversation", slow_summarize)
+    started = time.perf_counter()
+    await build_history(session_id)
+    assert time.perf_counter() - started < 0.5
+    await wait_for_summary(session_id)
@@ -0,0 +1,48 @@
+import pytest
+from app.services.response_cache import response_cache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def prompts(fake_llm, monkeypatch) -> list:
+    """System prompts the model is sent, in order"""
+    service = fake_llm(latency_ms=0, latency_distribution="fixed", chunk_interval_ms=0)
+    # Cached answers are built from the key fields only; this is about the full prompt
+    monkeypatch.setattr(response_cache, "enabled", False)
+    sent = []
+    generate = service.provider.generate
+
+    async def recording_generate(history, message):
+        sent.append(history[0]["parts"][0])
+        return await generate(history, message)
+
+    monkeypatch.setattr(service.provider, "generate", recording_generate)
+    return sent
+
+
+async def ask(client, headers, session_id) -> None:
+    response = await client.post(
+        f"/api/v1/chat/sessions/{session_id}/messages", json={"content": "요즘 어때요?"}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.parametrize("path, body, expected", [
+    ("growth", {"height_cm": "70.5", "weight_kg": "8.2"}, "- 최근 키: 70.50cm"),
+    (
+        "sleep",
+        {"start_datetime": "2026-01-01T21:00:00", "end_datetime": "2026-01-02T06:00:00", "sleep_quality": "good"},
+        "- 평균 수면시간: 9.0시간"
+    ),
+    ("health", {"temperature": "38.5", "symptom": "fever"}, "- 최근 증상: fever"),
+])
+async def test_record_write_refreshes_the_next_prompt(client, headers, kid_id, session_id, prompts, path, body, expected):
+    await ask(client, headers, session_id)
+    assert expected not in prompts[-1]
+
+    response = await client.post(f"/api/v1/kids/{kid_id}/records/{path}", json=body, headers=headers)
+    assert response.status_code == 201
+
+    await ask(client, headers, session_id)
+    assert expected in prompts[-1]
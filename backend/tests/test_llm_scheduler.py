@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+from app.services.llm_scheduler import PRIORITY_HIGH, PRIORITY_NORMAL, LLMScheduler, QueueFullError
+
+pytestmark = pytest.mark.anyio
+
+
+class Harness:
+    """One scheduler slot held by a blocker, so later requests queue up and
+    are served, in order, once it's released"""
+
+    def __init__(self, **limits):
+        self.scheduler = LLMScheduler(max_concurrency=1, **{"max_queue": 100, "max_queued_per_user": 100, **limits})
+        self.served = []
+        self.gate = asyncio.Event()
+        self.tasks = []
+
+    async def block(self):
+        async def blocker():
+            async with self.scheduler.slot("blocker"):
+                await self.gate.wait()
+
+        self.tasks.append(asyncio.ensure_future(blocker()))
+        await asyncio.sleep(0)
+
+    async def request(self, name: str, user_id=None, priority: int = PRIORITY_NORMAL) -> asyncio.Future:
+        async def run():
+            async with self.scheduler.slot(user_id, priority):
+                self.served.append(name)
+
+        task = asyncio.ensure_future(run())
+        self.tasks.append(task)
+        await asyncio.sleep(0)
+        return task
+
+    async def drain(self) -> list:
+        self.gate.set()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        return self.served
+
+
+async def test_high_priority_lane_is_served_first():
+    harness = Harness()
+    await harness.block()
+    await harness.request("normal-1", "a")
+    await harness.request("normal-2", "b")
+    await harness.request("high", "c", PRIORITY_HIGH)
+
+    assert harness.scheduler.stats()["queue_depth_high_priority"] == 1
+    assert await harness.drain() == ["high", "normal-1", "normal-2"]
+
+
+async def test_one_users_burst_does_not_starve_another():
+    harness = Harness()
+    await harness.block()
+    for i in range(5):
+        await harness.request(f"burst-{i}", "burst")
+    await harness.request("other", "other")
+
+    served = await harness.drain()
+
+    # Users take turns within a lane: the other user is second, not sixth
+    assert served == ["burst-0", "other", "burst-1", "burst-2", "burst-3", "burst-4"]
+
+
+async def test_chat_overtakes_queued_summaries():
+    # Summaries run without a user at normal priority; a doctor symptom
+    # question is high priority and an ordinary chat takes turns with them
+    harness = Harness()
+    await harness.block()
+    for i in range(3):
+        await harness.request(f"summary-{i}")
+    await harness.request("chat", 1)
+    await harness.request("symptom", 2, PRIORITY_HIGH)
+
+    assert await harness.drain() == ["symptom", "summary-0", "chat", "summary-1", "summary-2"]
+
+
+async def test_per_user_and_total_queue_caps():
+    harness = Harness(max_queue=3, max_queued_per_user=2)
+    await harness.block()
+    await harness.request("a-1", "a")
+    await harness.request("a-2", "a")
+
+    with pytest.raises(QueueFullError) as rejected:
+        harness.scheduler.check_admission("a")
+    assert rejected.value.reason == "too many pending requests for user"
+    # Rejected requests fail fast instead of queueing
+    third = await harness.request("a-3", "a")
+    assert isinstance(third.exception(), QueueFullError)
+
+    await harness.request("b-1", "b")
+    with pytest.raises(QueueFullError) as rejected:
+        harness.scheduler.check_admission("c")
+    assert rejected.value.reason == "queue full"
+    assert rejected.value.retry_after >= 1
+
+    assert await harness.drain() == ["a-1", "b-1", "a-2"]
+    assert harness.scheduler.stats()["rejected"] == 3
+
+
+async def test_admission_counts_every_requested_slot():
+    scheduler = LLMScheduler(max_concurrency=2, max_queue=10, max_queued_per_user=1)
+
+    # Two run now and one waits: within the user's share of the queue
+    scheduler.check_admission("a", slots=3)
+    with pytest.raises(QueueFullError):
+        scheduler.check_admission("a", slots=4)
+
+
+async def test_cancelled_waiter_leaves_no_trace():
+    harness = Harness()
+    await harness.block()
+    cancelled = await harness.request("cancelled", "a")
+    await harness.request("kept", "b")
+    assert harness.scheduler.stats()["queue_depth"] == 2
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    stats = harness.scheduler.stats()
+    assert stats["queue_depth"] == 1
+    assert "a" not in harness.scheduler._queued_per_user
+    assert await harness.drain() == ["kept"]
+    assert harness.scheduler.stats()["active"] == 0
+
+
+async def test_slot_granted_to_a_cancelled_waiter_is_handed_on():
+    harness = Harness()
+    await harness.block()
+    granted = await harness.request("granted", "a")
+    await harness.request("next", "b")
+
+    harness.gate.set()
+    await asyncio.sleep(0)
+    # The blocker released its slot to "granted", which is cancelled before it runs
+    assert harness.scheduler.stats()["queue_depth"] == 1
+    granted.cancel()
+
+    assert await harness.drain() == ["next"]
+    assert granted.cancelled()
+    assert harness.scheduler.stats()["active"] == 0
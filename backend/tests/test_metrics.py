@@ -0,0 +1,24 @@
+import pytest
+from app.core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_metrics_are_disabled_without_a_token(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+
+    response = await client.get("/api/v1/metrics/", headers=headers)
+
+    assert response.status_code == 404
+
+
+async def test_metrics_need_the_shared_token(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+
+    # A signed-in user is not enough
+    assert (await client.get("/api/v1/metrics/", headers=headers)).status_code == 403
+    assert (await client.get("/api/v1/metrics/", headers={"X-Metrics-Token": "wrong"})).status_code == 403
+
+    response = await client.get("/api/v1/metrics/", headers={"X-Metrics-Token": "s3cret"})
+    assert response.status_code == 200
+    assert "llm_scheduler" in response.json()
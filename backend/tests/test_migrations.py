@@ -0,0 +1,50 @@
+import os
+import pytest
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def alembic_config(url: str) -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def create_all_era_database(tmp_path, revision: str) -> str:
+    """A database with the schema of `revision` but no alembic_version, as
+    Base.metadata.create_all left it before migrations existed"""
+    url = f"sqlite:///{tmp_path}/legacy.db"
+    command.upgrade(alembic_config(url), revision)
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(text("INSERT INTO users (username, password_hash) VALUES ('parent', '!')"))
+    engine.dispose()
+    return url
+
+
+@pytest.mark.parametrize("revision", ["0001", "0002"])
+def test_create_all_database_upgrades_without_a_manual_stamp(tmp_path, revision):
+    url = create_all_era_database(tmp_path, revision)
+    config = alembic_config(url)
+
+    command.upgrade(config, "head")
+
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        version = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        users = connection.execute(text("SELECT username FROM users")).scalars().all()
+        columns = {column["name"] for column in inspect(connection).get_columns("chat_sessions")}
+    engine.dispose()
+    assert version == ScriptDirectory.from_config(config).get_current_head()
+    assert users == ["parent"]
+    assert {"summary", "summarized_until_id"} <= columns
+
+
+def test_offline_sql_still_renders(tmp_path, capsys):
+    command.upgrade(alembic_config(f"sqlite:///{tmp_path}/offline.db"), "0002", sql=True)
+    assert "CREATE TABLE users" in capsys.readouterr().out
@@ -0,0 +1,115 @@
+import pytest
+from sqlalchemy import text
+
+pytestmark = pytest.mark.anyio
+
+
+def set_created_at(table: str, ids: list, created_at: str) -> None:
+    """Give rows the same timestamp, as rows written in the same second get"""
+    from app.core.database import SessionLocal
+
+    with SessionLocal() as db:
+        db.execute(
+            text(f"UPDATE {table} SET created_at = :created_at WHERE id = :id"),
+            [{"created_at": created_at, "id": id} for id in ids]
+        )
+        db.commit()
+
+
+async def walk(client, headers, path: str, limit: int, key: str) -> list:
+    """Every item id across all pages, in page order"""
+    seen, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(path, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        seen.append([item["id"] for item in page[key]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+@pytest.fixture
+async def tied_records(client, headers, kid_id) -> dict:
+    """Meals and sleeps in two groups of identical created_at; returns ids per type"""
+    items = [{"record_type": "meal", "meal_type": "formula"} for _ in range(7)] + [
+        {
+            "record_type": "sleep", "start_datetime": "2026-01-01T21:00:00",
+            "end_datetime": "2026-01-02T06:00:00", "sleep_quality": "good"
+        }
+        for _ in range(4)
+    ]
+    response = await client.post(f"/api/v1/kids/{kid_id}/records/batch", json={"records": items}, headers=headers)
+    assert response.status_code == 200, response.text
+    created = response.json()["created"]
+    ids = [record["id"] for record in created]
+    set_created_at("records", ids[:5], "2026-01-01 00:00:00")
+    set_created_at("records", ids[5:], "2026-01-02 00:00:00")
+    return {
+        "all": ids,
+        "meal": [record["id"] for record in created if record["record_type"] == "meal"],
+        "sleep": [record["id"] for record in created if record["record_type"] == "sleep"],
+    }
+
+
+def newest_first(ids: list, older: list) -> list:
+    """Expected (created_at, id) descending order: the later group, then by id"""
+    newer = [id for id in ids if id not in older]
+    return sorted(newer, reverse=True) + sorted(set(ids) & set(older), reverse=True)
+
+
+@pytest.mark.parametrize("limit", [1, 3, 4])
+async def test_record_pages_have_no_gaps_or_duplicates_across_ties(client, headers, kid_id, tied_records, limit):
+    pages = await walk(client, headers, f"/api/v1/kids/{kid_id}/records/", limit, "records")
+
+    flat = [id for page in pages for id in page]
+    assert flat == newest_first(tied_records["all"], tied_records["all"][:5])
+    assert all(len(page) <= limit for page in pages)
+
+
+async def test_meal_and_timeline_pages_walk_the_same_order(client, headers, kid_id, tied_records):
+    older = tied_records["all"][:5]
+
+    meal_pages = await walk(client, headers, f"/api/v1/kids/{kid_id}/records/meal", 2, "records")
+    assert [id for page in meal_pages for id in page] == newest_first(tied_records["meal"], older)
+
+    timeline_pages = await walk(client, headers, f"/api/v1/kids/{kid_id}/records/timeline", 3, "records")
+    assert [id for page in timeline_pages for id in page] == newest_first(tied_records["all"], older)
+
+
+@pytest.mark.parametrize("path", ["", "meal", "timeline"])
+async def test_invalid_record_cursor_is_rejected(client, headers, kid_id, path):
+    response = await client.get(
+        f"/api/v1/kids/{kid_id}/records/{path}", params={"cursor": "not-a-cursor"}, headers=headers
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+async def test_message_history_pages_back_through_ties(client, headers, session_id):
+    from app.core.database import SessionLocal
+    from app.models import ChatMessage, SenderTypeEnum
+
+    with SessionLocal() as db:
+        messages = [
+            ChatMessage(session_id=session_id, sender=SenderTypeEnum.user, content=f"message {i}")
+            for i in range(9)
+        ]
+        db.add_all(messages)
+        db.commit()
+        ids = [message.id for message in messages]
+    set_created_at("chat_messages", ids[:4], "2026-01-01 00:00:00")
+    set_created_at("chat_messages", ids[4:], "2026-01-01 00:00:01")
+
+    pages = await walk(client, headers, f"/api/v1/chat/sessions/{session_id}/messages", 2, "messages")
+
+    # Each page is oldest first; pages go back in time
+    assert [id for page in reversed(pages) for id in page] == sorted(ids)
+    assert all(page == sorted(page) for page in pages)
+
+    response = await client.get(
+        f"/api/v1/chat/sessions/{session_id}/messages", params={"cursor": "%%%"}, headers=headers
+    )
+    assert response.status_code == 400
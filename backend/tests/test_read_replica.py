@@ -0,0 +1,117 @@
+import sqlite3
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.api import deps
+from app.core.config import settings
+from app.core.database import async_engine, recent_writers
+
+pytestmark = pytest.mark.anyio
+
+PRIMARY_PATH = make_url(settings.DATABASE_URL).database
+REPLICA_PATH = PRIMARY_PATH.replace("primary.db", "replica.db")
+
+
+@pytest.fixture
+async def replica(asgi_app, monkeypatch):
+    """A second SQLite file as the read replica; call it to copy the primary over"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{REPLICA_PATH}")
+    monkeypatch.setattr(deps, "replica_async_engine", engine)
+    monkeypatch.setattr(deps, "AsyncReadSessionLocal", async_sessionmaker(
+        bind=engine, autoflush=False, expire_on_commit=False
+    ))
+
+    async def replicate():
+        await engine.dispose()
+        with sqlite3.connect(PRIMARY_PATH) as source, sqlite3.connect(REPLICA_PATH) as target:
+            source.backup(target)
+
+    yield replicate
+    await engine.dispose()
+
+
+def rename_kids_on_replica(name: str) -> None:
+    """Make the replica diverge so a response shows which database served it"""
+    with sqlite3.connect(REPLICA_PATH) as replica_db:
+        replica_db.execute("UPDATE kids SET name = ?", (name,))
+
+
+async def kid_names(client, headers) -> list:
+    response = await client.get("/api/v1/kids/", headers=headers)
+    assert response.status_code == 200
+    return sorted(kid["name"] for kid in response.json())
+
+
+async def test_reads_go_to_the_replica_and_a_writer_reads_the_primary(client, headers, kid_id, replica):
+    await replica()
+    rename_kids_on_replica("replica")
+    recent_writers.clear()
+
+    primary_in_use = []
+
+    def remember(conn, cursor, statement, parameters, context, executemany):
+        primary_in_use.append(async_engine.sync_engine.pool.checkedout())
+
+    replica_engine = deps.replica_async_engine.sync_engine
+    event.listen(replica_engine, "before_cursor_execute", remember)
+    try:
+        routed = dict(deps.read_routing)
+        assert await kid_names(client, headers) == ["replica"]
+    finally:
+        event.remove(replica_engine, "before_cursor_execute", remember)
+    assert deps.read_routing["replica"] == routed["replica"] + 1
+    # The user lookup's primary connection was handed back before the replica read
+    assert primary_in_use and set(primary_in_use) == {0}
+
+    response = await client.post(
+        "/api/v1/kids/", json={"name": "second", "birth_date": "2025-06-01", "gender": "female"}, headers=headers
+    )
+    assert response.status_code == 201
+
+    # The replica hasn't caught up, so the writer's next read must come from the primary
+    routed = dict(deps.read_routing)
+    assert await kid_names(client, headers) == ["second", "test"]
+    assert deps.read_routing["primary"] == routed["primary"] + 1
+
+
+async def test_other_users_keep_reading_the_replica(client, headers, other_headers, kid_id, replica):
+    await replica()
+    rename_kids_on_replica("replica")
+    recent_writers.clear()
+
+    response = await client.post(
+        "/api/v1/kids/", json={"name": "other", "birth_date": "2025-06-01", "gender": "male"}, headers=other_headers
+    )
+    assert response.status_code == 201
+
+    # Only the writer is pinned to the primary
+    assert await kid_names(client, headers) == ["replica"]
+    assert await kid_names(client, other_headers) == ["other"]
+
+
+async def test_write_marker_cookie_keeps_the_writer_on_the_primary_across_workers(
+    client, headers, other_headers, kid_id, replica
+):
+    from app.core.config import settings
+
+    await replica()
+    rename_kids_on_replica("replica")
+
+    response = await client.post(
+        "/api/v1/kids/", json={"name": "second", "birth_date": "2025-06-01", "gender": "female"}, headers=headers
+    )
+    assert response.status_code == 201
+    marker = response.cookies[settings.READ_YOUR_WRITES_COOKIE]
+
+    # Another worker never saw the write, only the cookie the client sends back
+    recent_writers.clear()
+    assert await kid_names(client, headers) == ["second", "test"]
+
+    # The marker only pins the user it was issued for
+    client.cookies.clear()
+    assert await kid_names(client, headers) == ["replica"]
+    client.cookies.set(settings.READ_YOUR_WRITES_COOKIE, marker)
+    routed = dict(deps.read_routing)
+    await kid_names(client, other_headers)
+    assert deps.read_routing["replica"] == routed["replica"] + 1
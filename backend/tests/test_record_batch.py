@@ -0,0 +1,73 @@
+import pytest
+from app.core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+MEAL = {"record_type": "meal", "title": "아침", "meal_type": "formula", "meal_detail": "120ml", "burp": True}
+SLEEP = {
+    "record_type": "sleep", "start_datetime": "2026-01-01T13:00:00", "end_datetime": "2026-01-01T14:00:00",
+    "sleep_quality": "good",
+}
+HEALTH = {"record_type": "health", "temperature": "38.2", "symptom": "fever"}
+
+
+def batch_path(kid_id: int) -> str:
+    return f"/api/v1/kids/{kid_id}/records/batch"
+
+
+async def test_invalid_items_are_reported_and_valid_ones_created(client, headers, kid_id):
+    records = [
+        MEAL,
+        {"record_type": "meal", "meal_type": "pizza"},
+        SLEEP,
+        {"record_type": "nap"},
+        {**HEALTH, "temperature": "45"},
+        HEALTH,
+        {"record_type": "stool", "amount": "low"},
+    ]
+    response = await client.post(batch_path(kid_id), json={"records": records}, headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(item["index"], item["record_type"]) for item in body["created"]] == [
+        (0, "meal"), (2, "sleep"), (5, "health")
+    ]
+    errors = {error["index"]: error["errors"] for error in body["errors"]}
+    assert sorted(errors) == [1, 3, 4, 6]
+    assert errors[1][0]["loc"][-1] == "meal_type"
+    assert errors[4][0]["loc"][-1] == "temperature"
+    assert {error["loc"][-1] for error in errors[6]} == {"condition", "color"}
+
+    # Each created id carries its own item's subtype row
+    ids = {item["record_type"]: item["id"] for item in body["created"]}
+    meals = (await client.get(f"/api/v1/kids/{kid_id}/records/meal", headers=headers)).json()["records"]
+    assert [(meal["id"], meal["meal_type"], meal["meal_detail"]) for meal in meals] == [
+        (ids["meal"], "formula", "120ml")
+    ]
+    health = (await client.get(f"/api/v1/kids/{kid_id}/records/health", headers=headers)).json()["records"]
+    assert [(row["id"], row["symptom"]) for row in health] == [(ids["health"], "fever")]
+    listed = (await client.get(f"/api/v1/kids/{kid_id}/records/", headers=headers)).json()["records"]
+    assert sorted(record["id"] for record in listed) == sorted(ids.values())
+
+
+async def test_batch_with_only_invalid_items_creates_nothing(client, headers, kid_id):
+    response = await client.post(
+        batch_path(kid_id), json={"records": [{"record_type": "meal"}, {"title": "no type"}]}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["created"] == []
+    assert [error["index"] for error in response.json()["errors"]] == [0, 1]
+    listed = (await client.get(f"/api/v1/kids/{kid_id}/records/", headers=headers)).json()["records"]
+    assert listed == []
+
+
+async def test_oversized_batch_is_rejected(client, headers, kid_id, monkeypatch):
+    monkeypatch.setattr(settings, "RECORD_BATCH_MAX_ITEMS", 2)
+    response = await client.post(batch_path(kid_id), json={"records": [MEAL] * 3}, headers=headers)
+    assert response.status_code == 413
+
+
+async def test_other_users_kid_is_not_found(client, other_headers, kid_id):
+    response = await client.post(batch_path(kid_id), json={"records": [MEAL]}, headers=other_headers)
+    assert response.status_code == 404
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+MEAL = {"record_type": "meal", "meal_type": "formula", "meal_detail": "120ml"}
+HEALTH = {"record_type": "health", "temperature": "38.2", "symptom": "fever"}
+
+
+@pytest.fixture
+async def records(client, headers, kid_id) -> list:
+    response = await client.post(
+        f"/api/v1/kids/{kid_id}/records/batch", json={"records": [MEAL, HEALTH] * 5}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return [record["id"] for record in response.json()["created"]]
+
+
+@pytest.fixture
+def export_sessions(monkeypatch):
+    """Record each session the export body opens, with the primary pool's
+    checked-out connections at that moment; small batches so rows stream in
+    several round trips"""
+    from app.api.v1 import records as records_api
+    from app.core.database import AsyncSessionLocal, async_engine
+    from app.services import record_export
+
+    opened = []
+
+    class TrackedSession:
+        def __init__(self):
+            self.session = AsyncSessionLocal()
+
+        async def __aenter__(self):
+            opened.append({"checked_out": async_engine.sync_engine.pool.checkedout(), "closed": False})
+            return self.session
+
+        async def __aexit__(self, *exc_info):
+            await self.session.close()
+            opened[-1]["closed"] = True
+
+    monkeypatch.setattr(records_api, "read_sessionmaker", lambda user_id, request=None: TrackedSession)
+    monkeypatch.setattr(record_export, "EXPORT_BATCH_SIZE", 3)
+    return opened
+
+
+async def test_ndjson_export_streams_from_its_own_session(client, headers, kid_id, records, export_sessions):
+    response = await client.get(f"/api/v1/kids/{kid_id}/records/export", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == records
+    assert rows[0]["meal_record"]["meal_detail"] == "120ml"
+    assert rows[1]["health_record"]["temperature"] == "38.2"
+    # The request's session was already closed when the body started
+    assert export_sessions == [{"checked_out": 0, "closed": True}]
+
+
+async def test_csv_export_filters_by_type(client, headers, kid_id, records, export_sessions):
+    response = await client.get(
+        f"/api/v1/kids/{kid_id}/records/export", params={"format": "csv", "record_type": "health"}, headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-disposition"] == f'attachment; filename="kid-{kid_id}-records.csv"'
+    assert response.text.startswith("\ufeff")
+    rows = list(csv.DictReader(io.StringIO(response.text[1:])))
+    assert [int(row["id"]) for row in rows] == records[1::2]
+    assert {row["temperature"] for row in rows} == {"38.2"}
+    assert export_sessions[0]["closed"]
+
+
+async def test_other_users_kid_is_not_exported(client, other_headers, kid_id):
+    response = await client.get(f"/api/v1/kids/{kid_id}/records/export", headers=other_headers)
+
+    assert response.status_code == 404
@@ -0,0 +1,185 @@
+import csv
+import io
+import os
+from datetime import date, datetime
+import pytest
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine
+from app.services import record_import
+from app.services.ai_service import KidContext, kid_context_cache
+from app.services.record_import import RecordImporter, _copy, record_importer
+from app.services.record_index import record_index
+
+pytestmark = pytest.mark.anyio
+
+
+def meal_csv(count: int, bad_rows=()) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["record_type", "created_at", "title", "meal_type", "meal_detail"])
+    for i in range(count):
+        meal_type = "pizza" if i in bad_rows else "formula"
+        writer.writerow(["meal", f"2026-01-01T{i:02d}:00:00", f"수유 {i}", meal_type, f"{100 + i}ml"])
+    return buffer.getvalue().encode()
+
+
+async def upload(client, headers, kid_id: int, content: bytes) -> dict:
+    response = await client.post(
+        f"/api/v1/kids/{kid_id}/records/imports/", files={"file": ("records.csv", content, "text/csv")},
+        headers=headers
+    )
+    assert response.status_code == 202, response.text
+    return response.json()
+
+
+async def get_job(client, headers, kid_id: int, job_id: int) -> dict:
+    response = await client.get(f"/api/v1/kids/{kid_id}/records/imports/{job_id}", headers=headers)
+    return response.json()
+
+
+def imported_titles(kid_id: int) -> list:
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT title FROM records WHERE kid_id = :kid_id ORDER BY created_at"), {"kid_id": kid_id}
+        ).scalars().all()
+
+
+def cache_kid_context(kid_id: int) -> None:
+    kid_context_cache.set(kid_id, KidContext(text="stale", birth_date=date(2025, 1, 1)))
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(record_importer, "chunk_rows", 2)
+
+
+async def test_failed_chunk_keeps_committed_ones_and_resume_finishes(
+    client, headers, kid_id, small_chunks, monkeypatch
+):
+    load = RecordImporter._load
+    calls = []
+
+    def failing_load(self, conn, kid, items):
+        calls.append(len(items))
+        if len(calls) == 2:
+            raise RuntimeError("database went away")
+        return load(self, conn, kid, items)
+
+    invalidated = []
+    monkeypatch.setattr(RecordImporter, "_load", failing_load)
+    monkeypatch.setattr(RecordImporter, "_invalidate", lambda self, kid: invalidated.append(kid))
+
+    job = await upload(client, headers, kid_id, meal_csv(5, bad_rows={1}))
+    job = await get_job(client, headers, kid_id, job["id"])
+
+    # The first chunk committed (one bad row reported); the second rolled back whole
+    assert job["status"] == "failed"
+    assert "database went away" in job["error"]
+    assert (job["processed_rows"], job["imported_rows"], job["error_rows"]) == (2, 1, 1)
+    assert [error["row"] for error in job["errors"]] == [2]
+    assert imported_titles(kid_id) == ["수유 0"]
+    # Caches were dropped for the committed chunk, before the job finished
+    assert invalidated and set(invalidated) == {kid_id}
+
+    monkeypatch.setattr(RecordImporter, "_load", load)
+    response = await client.post(f"/api/v1/kids/{kid_id}/records/imports/{job['id']}/resume", headers=headers)
+    assert response.status_code == 202
+    job = await get_job(client, headers, kid_id, job["id"])
+
+    assert job["status"] == "completed"
+    assert (job["processed_rows"], job["imported_rows"], job["error_rows"]) == (5, 4, 1)
+    # Resumed at the first uncommitted row: nothing twice, nothing skipped
+    assert imported_titles(kid_id) == ["수유 0", "수유 2", "수유 3", "수유 4"]
+
+
+async def test_each_committed_chunk_invalidates_the_kids_caches(client, headers, kid_id, small_chunks, monkeypatch):
+    load = RecordImporter._load
+    seen = []
+
+    def checking_load(self, conn, kid, items):
+        # Whatever was cached before this chunk must be gone once the previous one committed
+        seen.append(kid_context_cache.get(kid) is None and record_index._get(kid) is None)
+        cache_kid_context(kid)
+        return load(self, conn, kid, items)
+
+    monkeypatch.setattr(RecordImporter, "_load", checking_load)
+    cache_kid_context(kid_id)
+
+    job = await upload(client, headers, kid_id, meal_csv(6))
+
+    assert (await get_job(client, headers, kid_id, job["id"]))["status"] == "completed"
+    assert seen == [False, True, True]
+    assert kid_context_cache.get(kid_id) is None
+
+
+async def test_resume_claims_only_failed_or_stale_jobs(client, headers, kid_id, monkeypatch):
+    monkeypatch.setattr(record_importer, "run", lambda job_id: None)
+    job = await upload(client, headers, kid_id, meal_csv(1))
+    path = f"/api/v1/kids/{kid_id}/records/imports/{job['id']}/resume"
+
+    # Still running and recently updated: another worker owns it
+    assert (await client.post(path, headers=headers)).status_code == 409
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE record_import_jobs SET updated_at = datetime('now', '-1 hour') WHERE id = :id"
+        ), {"id": job["id"]})
+    assert (await client.post(path, headers=headers)).status_code == 202
+    # The claim refreshed updated_at, so a second resume is turned away
+    assert (await client.post(path, headers=headers)).status_code == 409
+
+
+def test_copy_writes_csv_that_copy_reads_as_typed_values():
+    class Cursor:
+        def copy_expert(self, sql, buffer):
+            self.sql = sql
+            self.rows = list(csv.reader(buffer))
+
+        def close(self):
+            pass
+
+    cursor = Cursor()
+
+    class Conn:
+        class connection:
+            class driver_connection:
+                @staticmethod
+                def cursor():
+                    return cursor
+
+    rows = [
+        {"id": 1, "meal_type": record_import.RecordTypeEnum.meal, "burp": True, "memo": None,
+         "created_at": datetime(2026, 1, 1, 8, 30)},
+        {"id": 2, "meal_type": "formula", "burp": False, "memo": 'say "hi", twice', "created_at": None},
+    ]
+    _copy(Conn, "meal_records", ["id", "meal_type", "burp", "memo", "created_at"], rows)
+
+    assert cursor.sql == "COPY meal_records (id, meal_type, burp, memo, created_at) FROM STDIN WITH (FORMAT csv)"
+    assert cursor.rows == [
+        ["1", "meal", "t", "", "2026-01-01T08:30:00"],
+        ["2", "formula", "f", 'say "hi", twice', ""],
+    ]
+
+
+async def test_blank_lines_are_not_counted_as_rows(client, headers, kid_id):
+    lines = meal_csv(3).decode().splitlines()
+    content = "\r\n".join([lines[0], "", lines[1], "", "", lines[2], lines[3], ""]).encode()
+
+    job = await get_job(client, headers, kid_id, (await upload(client, headers, kid_id, content))["id"])
+
+    assert job["status"] == "completed"
+    assert job["total_rows"] == job["processed_rows"] == job["imported_rows"] == 3
+
+
+async def test_oversized_upload_is_rejected_and_removed(client, headers, kid_id, monkeypatch):
+    monkeypatch.setattr(settings, "RECORD_IMPORT_MAX_BYTES", 100)
+    before = set(os.listdir(settings.RECORD_IMPORT_DIR)) if os.path.isdir(settings.RECORD_IMPORT_DIR) else set()
+
+    response = await client.post(
+        f"/api/v1/kids/{kid_id}/records/imports/", files={"file": ("records.csv", meal_csv(20), "text/csv")},
+        headers=headers
+    )
+
+    assert response.status_code == 413
+    assert set(os.listdir(settings.RECORD_IMPORT_DIR)) == before
@@ -0,0 +1,59 @@
+import threading
+import pytest
+from sqlalchemy import event
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services import record_index as record_index_module
+from app.services.record_index import record_index
+
+pytestmark = pytest.mark.anyio
+
+SLEEP = {
+    "title": "낮잠", "start_datetime": "2026-01-01T13:00:00", "end_datetime": "2026-01-01T14:30:00",
+    "sleep_quality": "good",
+}
+
+
+async def test_load_embeds_off_the_event_loop(client, headers, kid_id, monkeypatch):
+    for _ in range(3):
+        response = await client.post(f"/api/v1/kids/{kid_id}/records/sleep", json=SLEEP, headers=headers)
+        assert response.status_code == 201
+    record_index.invalidate(kid_id)
+
+    threads = []
+    embed = record_index_module.embed
+
+    def tracking_embed(text, dim):
+        threads.append(threading.get_ident())
+        return embed(text, dim)
+
+    monkeypatch.setattr(record_index_module, "embed", tracking_embed)
+    async with AsyncSessionLocal() as db:
+        await record_index.load(kid_id, db)
+
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
+    # Loaded, so searching needs no session
+    assert len(record_index.search(kid_id, "낮잠 수면", None, k=5, min_score=0)) == 3
+
+
+async def test_new_record_is_indexed_without_loading_other_subtypes(client, headers, kid_id):
+    async with AsyncSessionLocal() as db:
+        await record_index.load(kid_id, db)
+
+    statements = []
+
+    def remember(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", remember)
+    try:
+        response = await client.post(f"/api/v1/kids/{kid_id}/records/sleep", json=SLEEP, headers=headers)
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", remember)
+
+    assert response.status_code == 201
+    for table in ("meal_records", "health_records", "growth_records", "stool_records"):
+        assert not any(f"FROM {table}" in statement for statement in statements), table
+    [(record_id, _, text)] = record_index.search(kid_id, "낮잠", None, k=5, min_score=0)
+    assert record_id == response.json()["id"]
+    assert "1.5시간 수면" in text
@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import event
+
+pytestmark = pytest.mark.anyio
+
+RECORDS = [
+    {"record_type": "meal", "meal_type": "formula", "meal_detail": "120ml"},
+    {
+        "record_type": "sleep", "start_datetime": "2026-01-01T13:00:00", "end_datetime": "2026-01-01T14:00:00",
+        "sleep_quality": "good"
+    },
+    {"record_type": "health", "temperature": "38.2", "symptom": "fever"},
+    {"record_type": "growth", "height_cm": "70.5", "weight_kg": "8.2"},
+    {"record_type": "stool", "amount": "medium", "condition": "normal", "color": "yellow"},
+]
+
+
+@pytest.fixture
+async def records(client, headers, kid_id) -> list:
+    """Four of each record type; returns the created entries"""
+    response = await client.post(
+        f"/api/v1/kids/{kid_id}/records/batch", json={"records": RECORDS * 4}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["created"]
+
+
+class StatementCounter:
+    def __init__(self):
+        from app.core.database import async_engine
+
+        self.engine = async_engine.sync_engine
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self.count_statement)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self.count_statement)
+
+    def count_statement(self, *args):
+        self.count += 1
+
+
+async def timeline(client, headers, kid_id, **params) -> list:
+    response = await client.get(f"/api/v1/kids/{kid_id}/records/timeline", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["records"]
+
+
+async def test_statements_do_not_grow_with_page_size(client, headers, kid_id, records):
+    counts = {}
+    for limit in (2, 20):
+        with StatementCounter() as counter:
+            page = await timeline(client, headers, kid_id, limit=limit)
+        assert len(page) == limit
+        counts[limit] = counter.count
+
+    with StatementCounter() as filtered:
+        await timeline(client, headers, kid_id, limit=20, record_type="meal")
+
+    assert counts[2] == counts[20]
+    # One subtype query instead of five
+    assert filtered.count == counts[20] - 4
+
+
+async def test_subtype_fields_are_inline(client, headers, kid_id, records):
+    page = await timeline(client, headers, kid_id, limit=5)
+
+    subtypes = ("meal_record", "sleep_record", "health_record", "growth_record", "stool_record")
+    for record in page:
+        present = [name for name in subtypes if record[name] is not None]
+        assert present == [f"{record['record_type']}_record"]
+    by_type = {record["record_type"]: record for record in page}
+    assert by_type["meal"]["meal_record"]["meal_detail"] == "120ml"
+    assert by_type["health"]["health_record"]["temperature"] == "38.2"
+
+
+async def test_type_filters_combine(client, headers, kid_id, records):
+    page = await timeline(client, headers, kid_id, limit=100, record_type=["sleep", "stool"])
+
+    assert len(page) == 8
+    assert {record["record_type"] for record in page} == {"sleep", "stool"}
+    assert all(record["sleep_record"] or record["stool_record"] for record in page)
+
+
+async def test_misc_record_without_subtype_can_be_deleted(client, headers, kid_id):
+    from app.core.database import SessionLocal
+    from app.models import Record, RecordTypeEnum
+
+    with SessionLocal() as db:
+        record = Record(kid_id=kid_id, record_type=RecordTypeEnum.misc, title="메모")
+        db.add(record)
+        db.commit()
+        record_id = record.id
+
+    page = await timeline(client, headers, kid_id)
+    assert [(record["id"], record["meal_record"]) for record in page] == [(record_id, None)]
+
+    response = await client.delete(f"/api/v1/kids/{kid_id}/records/{record_id}", headers=headers)
+    assert response.status_code == 204
+    assert await timeline(client, headers, kid_id) == []
@@ -0,0 +1,154 @@
+import asyncio
+import pytest
+from app.services.ai_service import AIService, AIServiceError
+from app.services.llm_provider import LLMProvider
+from app.services.llm_scheduler import LLMScheduler
+from app.services.resilience import STATE_CLOSED, STATE_HALF_OPEN, CircuitBreaker
+
+pytestmark = pytest.mark.anyio
+
+
+class ScriptedProvider(LLMProvider):
+    """Replies after `delay` seconds; streams raise `stream_error` after the first chunk"""
+
+    name = "scripted"
+
+    def __init__(self, delay: float = 0.0, stream_error: Exception = None):
+        self.delay = delay
+        self.stream_error = stream_error
+        self.calls = 0
+        self.closed = 0
+
+    async def generate(self, history, message):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return "answer"
+
+    async def stream(self, history, message):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+            yield "first "
+            if self.stream_error is not None:
+                raise self.stream_error
+            yield "second"
+        finally:
+            self.closed += 1
+
+
+def make_service(provider: LLMProvider, max_concurrency: int = 4) -> AIService:
+    service = AIService(provider)
+    service.scheduler = LLMScheduler(max_concurrency=max_concurrency, max_queue=10, max_queued_per_user=10)
+    service.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    service.retry_base_delay = 0
+    return service
+
+
+def half_open(service: AIService) -> None:
+    service.breaker.record_failure()
+    assert service.breaker.before_call() is True
+    service.breaker.release(True)
+    assert service.breaker.state == STATE_HALF_OPEN
+
+
+async def test_cancelled_trial_call_releases_the_half_open_slot():
+    service = make_service(ScriptedProvider(delay=1))
+    half_open(service)
+
+    call = asyncio.ensure_future(service.generate_response("q", "mom", []))
+    await asyncio.sleep(0.05)
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    # Not counted either way, and the next call gets to be the trial
+    assert service.breaker.state == STATE_HALF_OPEN
+    service.provider.delay = 0
+    assert await service.generate_response("q2", "mom", []) == "answer"
+    assert service.breaker.state == STATE_CLOSED
+
+
+async def test_closed_stream_releases_the_half_open_slot():
+    provider = ScriptedProvider()
+    service = make_service(provider)
+    half_open(service)
+
+    stream = service.generate_response_stream("q", "mom", [])
+    assert await stream.__anext__() == "first "
+    await stream.aclose()
+
+    assert service.breaker.state == STATE_HALF_OPEN
+    assert provider.closed == 1
+    assert [chunk async for chunk in service.generate_response_stream("q2", "mom", [])] == ["first ", "second"]
+    assert service.breaker.state == STATE_CLOSED
+
+
+async def test_hedge_takes_a_spare_scheduler_slot():
+    provider = ScriptedProvider(delay=0.2)
+    service = make_service(provider, max_concurrency=2)
+    service.hedge_enabled = True
+    service.hedge_min_samples = 1
+    service.latency.record(0.05)
+
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while True:
+            peak = max(peak, service.scheduler.stats()["active"])
+            await asyncio.sleep(0.01)
+
+    watcher = asyncio.ensure_future(watch())
+    assert await service.generate_response("q", "mom", []) == "answer"
+    assert provider.calls == 2
+    assert peak == 2
+
+    # With every slot taken, the slow call just runs on without a hedge
+    provider.calls = 0
+    await asyncio.gather(*(service.generate_response(f"q{i}", "mom", []) for i in range(2)))
+    watcher.cancel()
+    assert provider.calls == 2
+    assert peak == 2
+
+
+async def test_stream_first_token_latency_does_not_feed_the_hedge_delay():
+    service = make_service(ScriptedProvider())
+    [chunk async for chunk in service.generate_response_stream("q", "mom", [])]
+
+    assert len(service.first_token_latency) == 1
+    assert len(service.latency) == 0
+
+
+async def test_non_transient_mid_stream_error_does_not_open_the_circuit():
+    provider = ScriptedProvider(stream_error=ValueError("bad chunk"))
+    service = make_service(provider)
+
+    with pytest.raises(AIServiceError):
+        [chunk async for chunk in service.generate_response_stream("q", "mom", [])]
+    assert service.breaker.state == STATE_CLOSED
+
+    provider.stream_error = ConnectionError("reset")
+    with pytest.raises(AIServiceError):
+        [chunk async for chunk in service.generate_response_stream("q2", "mom", [])]
+    assert service.breaker.state != STATE_CLOSED
+    assert provider.closed == 2
+
+
+async def test_failed_stream_attempts_are_closed():
+    class FlakyProvider(ScriptedProvider):
+        async def stream(self, history, message):
+            self.calls += 1
+            try:
+                if self.calls == 1:
+                    raise ConnectionError("reset")
+                yield "ok"
+            finally:
+                self.closed += 1
+
+    provider = FlakyProvider()
+    service = make_service(provider)
+    service.breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0)
+
+    assert [chunk async for chunk in service.generate_response_stream("q", "mom", [])] == ["ok"]
+    assert provider.calls == 2
+    assert provider.closed == 2
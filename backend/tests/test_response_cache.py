@@ -0,0 +1,80 @@
+from datetime import date
+import pytest
+from app.services.ai_service import AIService, KidContext
+from app.services.llm_provider import LLMProvider
+from app.services.llm_scheduler import LLMScheduler
+from app.services.response_cache import response_cache
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingProvider(LLMProvider):
+    """Answers with a counter and keeps the system prompt of every call"""
+
+    name = "recording"
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, history, message):
+        self.prompts.append(history[0]["parts"][0])
+        return f"answer {len(self.prompts)}"
+
+    async def stream(self, history, message):
+        yield await self.generate(history, message)
+
+
+def kid(name: str, birth_date=date(2025, 3, 1), related_records=()) -> KidContext:
+    return KidContext(
+        text=f"- 이름: {name}\n- 최근 키: 80cm\n- 최근 체중: 10kg",
+        birth_date=birth_date,
+        recent_symptoms=("fever",),
+        related_records=related_records
+    )
+
+
+@pytest.fixture
+def service():
+    response_cache.clear()
+    service = AIService(RecordingProvider())
+    service.scheduler = LLMScheduler(max_concurrency=4, max_queue=10, max_queued_per_user=10)
+    yield service
+    response_cache.clear()
+
+
+async def test_same_question_in_the_same_bucket_is_answered_once(service):
+    first = await service.generate_response("열이 나요!", "doctor", [], kid_context=kid("민수"))
+    second = await service.generate_response("열이 나요", "doctor", [], kid_context=kid("민수"))
+    streamed = [chunk async for chunk in service.generate_response_stream(
+        "열이 나요", "doctor", [], kid_context=kid("민수")
+    )]
+
+    assert first == second == "answer 1"
+    assert streamed == ["answer 1"]
+    assert len(service.provider.prompts) == 1
+    # Another persona or age band is a different answer
+    await service.generate_response("열이 나요", "mom", [], kid_context=kid("민수"))
+    await service.generate_response("열이 나요", "doctor", [], kid_context=kid("민수", birth_date=date(2020, 1, 1)))
+    assert len(service.provider.prompts) == 3
+
+
+async def test_cached_answer_holds_nothing_from_one_kid(service):
+    records = ("2026-01-01 / 건강 / 체온 38.5도 / 민수 해열제",)
+    await service.generate_response("열이 나요", "doctor", [], kid_context=kid("민수", related_records=records))
+    answer = await service.generate_response("열이 나요", "doctor", [], kid_context=kid("지우"))
+
+    assert answer == "answer 1"
+    [prompt] = service.provider.prompts
+    for private in ("민수", "80cm", "10kg", "해열제"):
+        assert private not in prompt
+    assert "fever" in prompt
+
+
+async def test_follow_up_questions_bypass_the_cache_and_keep_the_kid_context(service):
+    history = [{"sender": "user", "message": "열이 나요"}, {"sender": "ai", "message": "언제부터요?"}]
+    await service.generate_response("열이 나요", "doctor", history, kid_context=kid("민수"))
+    await service.generate_response("열이 나요", "doctor", history, kid_context=kid("민수"))
+    await service.generate_response("열이 나요", "doctor", [], kid_context=kid("민수"), summary="이전에 열")
+
+    assert len(service.provider.prompts) == 3
+    assert all("민수" in prompt for prompt in service.provider.prompts)